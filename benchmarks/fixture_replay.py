@@ -0,0 +1,330 @@
+'''
+Replays the recorded fixtures under tests/scrapers/*/data through request (HTTP stubbed out) -> scrape -> parse
+and reports rows/sec, per row latency percentiles and peak memory of every source. Each fixture is also
+scaled up (rows repeated) to see how a source behaves at storm volume. A fixture that yields no rows is
+reported as an error, it would only measure request and parse overhead.
+
+    python -m benchmarks.fixture_replay [--repeat 5] [--scale 1 10 100] [--source FPLPowerOutages] [--json out.json]
+
+Every run happens in a fresh process, peak_rss_kb is how far it grew above its baseline (ru_maxrss).
+'''
+import argparse
+import json
+import os
+import platform
+import re
+import resource
+import subprocess
+import sys
+import timeit
+from multiprocessing import Pool
+
+from event_indexing.scrapers.ems.clark_county_fd_cad import ClarkCountyFDCad
+from event_indexing.scrapers.ems.escambia_county_so_cad import EscambiaCountySOCad, INCIDENTS_PATTERN
+from event_indexing.scrapers.ems.fayetteville_911_cad import Fayetteville911Cad
+from event_indexing.scrapers.ems.lafayette_911_cad import Lafayette911Cad
+from event_indexing.scrapers.power_outages.ace_power_outages import ACEPowerOutages
+from event_indexing.scrapers.power_outages.ap_power_outages import APPowerOutages
+from event_indexing.scrapers.power_outages.au_power_outages import AUPowerOutages
+from event_indexing.scrapers.power_outages.cec_power_outages import CECPowerOutages
+from event_indexing.scrapers.power_outages.fpl_power_outages import FPLPowerOutages
+from event_indexing.scrapers.power_outages.lu_power_outages import LUPowerOutages
+from event_indexing.util.json_utils import loads, dumps, get_backend
+
+ROOT = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+DATA_DIR = os.path.join(ROOT, 'tests', 'scrapers')
+SCALES = (1, 10, 100)
+PERCENTILES = (50, 90, 99)
+
+CLARK_ROW_PATTERN = re.compile(r'<tr style="color:Black.*?</tr>', re.DOTALL)
+LAFAYETTE_ROW_PATTERN = re.compile(r'<tr bgcolor="#[^"]*">.*?</tr>', re.DOTALL)
+SIENA_OUTAGES_PATTERN = re.compile(r'<outages>\s*</outages>')
+SIENA_OUTAGE_FIXTURE = 'power_outages/data/irea_power_outages.json'  # a recorded <outage> under raw_incident
+
+
+def scale_rows(pattern):
+    '''
+    Scales markup by repeating every row matching pattern.
+    '''
+    def scale(content, n):
+        return pattern.sub(lambda match: match.group(0) * n, content)
+
+    return scale
+
+
+def scale_items(*path):
+    '''
+    Scales JSON response by repeating items of the array at path (response itself if empty).
+    '''
+    def scale(content, n):
+        document = loads(content)
+        parent = None
+        items = document
+
+        for key in path:
+            parent, items = items, items[key]
+
+        items = items * n
+
+        if parent is None:
+            return dumps(items)
+
+        parent[path[-1]] = items
+
+        return dumps(document)
+
+    return scale
+
+
+def scale_lafayette(content, n):
+    document = loads(content)
+    document['d'] = scale_rows(LAFAYETTE_ROW_PATTERN)(document['d'], n)
+
+    return dumps(document)
+
+
+def scale_siena(content, n):
+    '''
+    The recorded CEC feed was taken with no outages, fills its empty <outages> with n copies of an outage
+    recorded from another Siena feed (IREA, same format).
+    '''
+    with open(os.path.join(DATA_DIR, SIENA_OUTAGE_FIXTURE)) as f:
+        row = loads(f.read())['raw_incident'].encode('utf-8')
+
+    return SIENA_OUTAGES_PATTERN.sub(lambda match: '<outages>{}</outages>'.format(row * n), content, count=1)
+
+
+def scale_escambia(content, n):
+    match = INCIDENTS_PATTERN.search(content)
+    incidents = dumps(loads(match.group('incidents')) * n)
+
+    return content[:match.start('incidents')] + incidents + content[match.end('incidents'):]
+
+
+# CEA and IREA are left out, their recorded fixtures are not a feed response (CEA) or missing (IREA)
+FIXTURES = (
+    # scraper, fixture (under tests/scrapers), key of the response in JSON fixtures, scale
+    (ClarkCountyFDCad, 'ems/data/clark_county_fd_cad.html', None, scale_rows(CLARK_ROW_PATTERN)),
+    (EscambiaCountySOCad, 'ems/data/escambia_county_so_cad.html', None, scale_escambia),
+    (Fayetteville911Cad, 'ems/data/fayetteville_911_cad.json', 'response', scale_items()),
+    (Lafayette911Cad, 'ems/data/lafayette_911_cad.json', 'response', scale_lafayette),
+    (ACEPowerOutages, 'power_outages/data/ace_power_outages.json', 'response', scale_items('file_data')),
+    (APPowerOutages, 'power_outages/data/ap_power_outages.json', 'response', scale_items('file_data')),
+    (AUPowerOutages, 'power_outages/data/au_power_outages.json', 'response', scale_items('file_data')),
+    (CECPowerOutages, 'power_outages/data/cec_power_outages.xml', None, scale_siena),
+    (FPLPowerOutages, 'power_outages/data/fpl_power_outages.json', 'response', scale_items('outages')),
+    (LUPowerOutages, 'power_outages/data/lu_power_outages.json', 'response', scale_items('markers')),
+)
+
+
+class StubResponse(object):
+    '''
+    Stands in for a requests response with a recorded body.
+    '''
+    status_code = 200
+    ok = True
+    encoding = None  # application/json without charset
+
+    def __init__(self, content):
+        self.content = content
+        self.text = content.decode('utf-8')
+        self.headers = {}
+
+    def raise_for_status(self):
+        pass
+
+    def iter_content(self, chunk_size=1):
+        for start in range(0, len(self.content), chunk_size):
+            yield self.content[start:start + chunk_size]
+
+    def json(self):
+        return loads(self.content)
+
+    def close(self):
+        pass
+
+
+def get_fixture(name):
+    for fixture in FIXTURES:
+        if fixture[0].name == name:
+            return fixture
+
+    raise KeyError(name)
+
+
+def load_body(path, key):
+    '''
+    Returns recorded response body, JSON fixtures keep it (decoded) under key.
+    '''
+    with open(os.path.join(DATA_DIR, path)) as f:
+        content = f.read()
+
+    if key is None:
+        return content
+
+    return dumps(loads(content)[key])
+
+
+def load_meta(path, key):
+    if key is None:
+        return None
+
+    with open(os.path.join(DATA_DIR, path)) as f:
+        return loads(f.read()).get('meta')
+
+
+def get_scraper(cls, body):
+    scraper = cls(None, None, None)
+
+    # HTTP layer
+    scraper.get_request_args = lambda: {}
+    scraper.send_request = lambda *args, **kwargs: StubResponse(body)
+
+    # recorded incidents are older than max delay, keep them all
+    scraper.get_max_delay = lambda: sys.maxint
+
+    return scraper
+
+
+def replay(scraper, meta=None):
+    '''
+    Runs request -> scrape -> parse once, returns seconds each alert took to come out.
+    '''
+    kwargs = {} if meta is None else {'meta': meta}
+    latencies = []
+
+    start = timeit.default_timer()
+    content = scraper.request()
+
+    for raw_incident in scraper.scrape(content):
+        scraper.parse(raw_incident, **kwargs)
+
+        end = timeit.default_timer()
+        latencies.append(end - start)
+        start = end
+
+    return latencies
+
+
+def get_percentile(values, percentile):
+    if not values:
+        return None
+
+    index = int(round(percentile / 100.0 * (len(values) - 1)))
+
+    return sorted(values)[index]
+
+
+def run(name, scale, repeat):
+    '''
+    Replays a source's fixture (scaled) repeat times, runs in a worker process.
+    '''
+    cls, path, key, scale_body = get_fixture(name)
+
+    # scale 1 is the recorded body as is (CEC: one synthetic outage, see scale_siena)
+    body = scale_body(load_body(path, key), scale)
+
+    meta = load_meta(path, key)
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    latencies = []
+    seconds = 0.0
+
+    for _ in range(repeat):
+        scraper = get_scraper(cls, body)
+
+        start = timeit.default_timer()
+        latencies.extend(replay(scraper, meta))
+        seconds += timeit.default_timer() - start
+
+    if not latencies:
+        raise ValueError('{} yielded no rows'.format(path))
+
+    rows = len(latencies) / repeat
+
+    return {
+        'source': name,
+        'scale': scale,
+        'bytes': len(body),
+        'rows': rows,
+        'seconds': seconds / repeat,
+        'rows_per_sec': len(latencies) / seconds if latencies else 0.0,
+        'latency_ms': dict(('p{}'.format(percentile), get_milliseconds(get_percentile(latencies, percentile)))
+                           for percentile in PERCENTILES + (100,)),
+        'peak_rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - baseline,
+    }
+
+
+def get_milliseconds(seconds):
+    if seconds is None:
+        return None
+
+    return round(seconds * 1000, 4)
+
+
+def run_isolated(name, scale, repeat):
+    pool = Pool(1)
+
+    try:
+        return pool.apply(run, (name, scale, repeat))
+    except Exception as e:
+        return {
+            'source': name,
+            'scale': scale,
+            'error': '{}: {}'.format(e.__class__.__name__, e),
+        }
+    finally:
+        pool.terminate()
+
+
+def get_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', 'HEAD'], cwd=ROOT,
+                                       stderr=open(os.devnull, 'w')).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_results(results):
+    print '{:<22} {:>5} {:>9} {:>7} {:>12} {:>9} {:>9} {:>9} {:>9} {:>9}'.format(
+        'source', 'scale', 'KB', 'rows', 'rows/sec', 'p50 ms', 'p90 ms', 'p99 ms', 'max ms', 'rss KB')
+
+    for result in results:
+        if 'error' in result:
+            print '{:<22} {:>5} {}'.format(result['source'], result['scale'], result['error'])
+            continue
+
+        latency = result['latency_ms']
+
+        print '{:<22} {:>5} {:>9.1f} {:>7} {:>12.0f} {:>9} {:>9} {:>9} {:>9} {:>9}'.format(
+            result['source'], result['scale'], result['bytes'] / 1024.0, result['rows'], result['rows_per_sec'],
+            latency['p50'], latency['p90'], latency['p99'], latency['p100'], result['peak_rss_kb'])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Replays recorded fixtures through every scraper.')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--scale', type=int, nargs='+', default=list(SCALES))
+    parser.add_argument('--source', action='append', help='scraper name, all sources if not set')
+    parser.add_argument('--json', help='writes results to this file')
+    args = parser.parse_args()
+
+    names = args.source or [fixture[0].name for fixture in FIXTURES]
+    results = [run_isolated(name, scale, args.repeat) for name in names for scale in args.scale]
+
+    print_results(results)
+
+    if args.json:
+        # indented and sorted, so results of two commits diff line by line
+        with open(args.json, 'w') as f:
+            json.dump({
+                'commit': get_commit(),
+                'python': platform.python_version(),
+                'json_backend': get_backend(),
+                'repeat': args.repeat,
+                'results': results,
+            }, f, indent=2, sort_keys=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,121 @@
+'''
+Cold start import time of worker profiles: every run is a fresh interpreter that imports the scheduler and
+loads the scraper classes of a profile, through the lazy registry (load_scrapers) or by importing every
+scraper module (discover_scrapers, what workers did before the registry).
+
+    python -m benchmarks.import_time [--repeat 10] [--profile json_cad] [--json out.json]
+
+import_ms is measured inside the child, process_ms is the whole process (interpreter start up included)
+as seen by a cron job. Heavy modules the child ended up loading are listed.
+'''
+import argparse
+import json
+import os
+import subprocess
+import sys
+import timeit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+
+PROFILES = (
+    # name, sources (None: all registered)
+    ('json_cad', ['Fayetteville911Cad']),
+    ('json_outages', ['FPLPowerOutages']),
+    ('dom_cad', ['ClarkCountyFDCad']),
+    ('ifsc', ['ACEPowerOutages']),
+    ('all', None),
+)
+LOADERS = ('registry', 'discover')
+HEAVY_MODULES = ('bs4', 'lxml', 'shapely', 'pyproj', 'numpy', 'multiprocessing', 'ijson', 'ujson')
+
+CHILD_SCRIPT = '''
+import json
+import sys
+import timeit
+
+start = timeit.default_timer()
+
+from event_indexing.scheduler import load_scrapers, discover_scrapers
+
+names = {names!r}
+
+if {loader!r} == 'registry':
+    scrapers = load_scrapers(names)
+else:
+    scrapers = [cls for cls in discover_scrapers() if names is None or cls.name in names]
+
+seconds = timeit.default_timer() - start
+
+sys.stdout.write(json.dumps({{
+    'import_ms': seconds * 1000,
+    'scrapers': len(scrapers),
+    'modules': [name for name in {heavy_modules!r} if name in sys.modules],
+}}))
+'''
+
+
+def run_child(names, loader):
+    script = CHILD_SCRIPT.format(names=names, loader=loader, heavy_modules=HEAVY_MODULES)
+
+    start = timeit.default_timer()
+    output = subprocess.check_output([sys.executable, '-c', script], cwd=ROOT)
+    process_ms = (timeit.default_timer() - start) * 1000
+
+    result = json.loads(output.splitlines()[-1])
+    result['process_ms'] = process_ms
+
+    return result
+
+
+def get_median(values):
+    values = sorted(values)
+    middle = len(values) // 2
+
+    if len(values) % 2:
+        return values[middle]
+
+    return (values[middle - 1] + values[middle]) / 2.0
+
+
+def run(profile, names, loader, repeat):
+    runs = [run_child(names, loader) for _ in range(repeat)]
+
+    return {
+        'profile': profile,
+        'loader': loader,
+        'scrapers': runs[0]['scrapers'],
+        'import_ms': round(get_median([result['import_ms'] for result in runs]), 1),
+        'process_ms': round(get_median([result['process_ms'] for result in runs]), 1),
+        'modules': runs[0]['modules'],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Times cold start imports of worker profiles.')
+    parser.add_argument('--repeat', type=int, default=10)
+    parser.add_argument('--profile', action='append', help='profile name, all profiles if not set')
+    parser.add_argument('--json', help='writes results to this file')
+    args = parser.parse_args()
+
+    profiles = [(name, names) for name, names in PROFILES if not args.profile or name in args.profile]
+    results = []
+
+    print '{:<14} {:<9} {:>8} {:>10} {:>11}  {}'.format('profile', 'loader', 'sources', 'import ms', 'process ms',
+                                                       'heavy modules')
+
+    for profile, names in profiles:
+        for loader in LOADERS:
+            result = run(profile, names, loader, args.repeat)
+            results.append(result)
+
+            print '{:<14} {:<9} {:>8} {:>10} {:>11}  {}'.format(
+                profile, loader, result['scrapers'], result['import_ms'], result['process_ms'],
+                ' '.join(result['modules']))
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'repeat': args.repeat, 'results': results}, f, indent=2, sort_keys=True)
+
+
+if __name__ == '__main__':
+    main()
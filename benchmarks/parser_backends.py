@@ -0,0 +1,48 @@
+'''
+Times BeautifulSoup parser backends over the HTML/XML fixtures under tests/scrapers/*/data.
+
+    python -m benchmarks.parser_backends [--repeat 20]
+'''
+import argparse
+import glob
+import os
+import timeit
+
+from event_indexing.scrapers.base_dom_scraper import get_soup, get_parser_backend, PARSER_HTML, PARSER_LXML
+
+DATA_PATTERNS = ('tests/scrapers/*/data/*.html', 'tests/scrapers/*/data/*.xml')
+BACKENDS = (PARSER_HTML, PARSER_LXML)
+
+
+def get_fixtures(root):
+    paths = []
+    for pattern in DATA_PATTERNS:
+        paths.extend(glob.glob(os.path.join(root, pattern)))
+
+    return sorted(paths)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Times parser backends over the DOM fixtures.')
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    root = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+    backends = [backend for backend in BACKENDS if get_parser_backend(backend) == backend]
+
+    print '{:<32} {:>8} {}'.format('fixture', 'KB', ' '.join('{:>14}'.format(backend) for backend in backends))
+
+    for path in get_fixtures(root):
+        with open(path) as f:
+            content = f.read()
+
+        timings = []
+        for backend in backends:
+            seconds = timeit.timeit(lambda: get_soup(content, backend), number=args.repeat) / args.repeat
+            timings.append('{:>12.2f}ms'.format(seconds * 1000))
+
+        print '{:<32} {:>8.1f} {}'.format(os.path.basename(path), len(content) / 1024.0, ' '.join(timings))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,344 @@
+'''
+Profiles N runs of one scraper's full pipeline (IncidentScraper.run: request -> scrape -> parse -> publish,
+published alerts go to /dev/null) against a recorded fixture or a live URL.
+
+    python -m benchmarks.profile_scraper FPLPowerOutages [--fixture fpl_power_outages.json] [--iterations 20]
+    python -m benchmarks.profile_scraper Lafayette911Cad --url http://... --sampling [--interval 0.001]
+    python -m benchmarks.profile_scraper ClarkCountyFDCad --exclude requests --exclude bs4 --exclude dateutil
+
+cProfile (default) writes pstats (open with python -m pstats, snakeviz, ...), --sampling writes collapsed
+stacks (flamegraph.pl, speedscope). Fixtures are looked up with get_data_path of the source's test package
+(tests/scrapers/<category>), recorded JSON fixtures keep the response body under 'response'.
+
+cProfile only sees the calling thread, IFSC sources parse tiles on a thread pool: use --sampling --all-threads.
+'''
+import argparse
+import cProfile
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from importlib import import_module
+
+from benchmarks.fixture_replay import FIXTURES, ROOT, get_scraper
+from event_indexing.metrics import InMemorySink
+from event_indexing.publisher import StreamPublisher
+from event_indexing.scrapers import registry
+from event_indexing.scrapers.power_outages import base_ifsc_scraper
+from event_indexing.util.json_utils import loads, dumps
+
+ITERATIONS = 10
+INTERVAL = 0.001  # seconds between samples
+LIMIT = 30  # rows of the printed pstats summary
+
+_realpaths = {}
+
+
+def get_scraper_class(name):
+    '''
+    Returns scraper class by class name or source name, registered or replayed by fixture_replay.
+    '''
+    if name in registry.SCRAPERS:
+        return registry.get_scraper_class(name)
+
+    for cls, _, _, _ in FIXTURES:
+        if name in (cls.__name__, cls.name):
+            return cls
+
+    raise KeyError(name)
+
+
+def get_fixture_path(cls, fixture=None):
+    '''
+    Returns path of fixture, a bare file name is looked up in the data directory of the source's test package.
+    Defaults to the fixture fixture_replay uses for the source.
+    '''
+    if fixture is None:
+        for fixture_cls, path, _, _ in FIXTURES:
+            if fixture_cls is cls:
+                fixture = os.path.basename(path)
+                break
+        else:
+            raise KeyError('No recorded fixture for {}, set --fixture or --url'.format(cls.name))
+
+    if os.path.exists(fixture):
+        return fixture
+
+    # event_indexing.scrapers.<category>.<module> -> tests.scrapers.<category>
+    category = cls.__module__.split('.')[2]
+    package = import_module('tests.scrapers.{}'.format(category))
+
+    return package.get_data_path(fixture)
+
+
+def load_fixture(path):
+    '''
+    Returns recorded response body and the recorded document (None for raw HTML/XML fixtures).
+    '''
+    with open(path) as f:
+        content = f.read()
+
+    if not path.endswith('.json'):
+        return content, None
+
+    document = loads(content)
+
+    if isinstance(document, dict) and 'response' in document:
+        return dumps(document['response']), document
+
+    return content, None
+
+
+class FixtureTiles(object):
+    '''
+    Serves the recorded fixture for every tile of an IFSC source (instead of base_ifsc_scraper.request).
+    '''
+
+    def __init__(self, body):
+        self.body = body
+
+    def __call__(self, data, pool_size=None, pending=None):
+        return loads(self.body), data['meta']
+
+    def __enter__(self):
+        self._request = base_ifsc_scraper.request
+        base_ifsc_scraper.request = self
+
+    def __exit__(self, *exc_info):
+        base_ifsc_scraper.request = self._request
+
+
+def get_fixture_scraper(cls, body, document):
+    scraper = get_scraper(cls, body)
+
+    if isinstance(scraper, base_ifsc_scraper.IFSCScraper):
+        # recorded tiles, no directory/service area requests
+        scraper._indexes = [dict(data, conditional=False) for data in document['indexes']]
+        scraper.rate_limit = sys.maxint
+
+    return scraper
+
+
+def get_live_scraper(cls, url):
+    scraper = cls(None, None, None)
+    scraper.get_url = lambda **kwargs: url
+
+    return scraper
+
+
+def get_package_dirs(names):
+    '''
+    Returns directories of the packages/modules called names, frames under them are excluded.
+    '''
+    directories = []
+
+    for name in names:
+        module = import_module(name)
+        path = os.path.realpath(module.__file__)
+
+        if os.path.splitext(os.path.basename(path))[0] == '__init__':
+            directories.append(os.path.dirname(path) + os.sep)
+        else:
+            directories.append(os.path.splitext(path)[0])
+
+    return tuple(directories)
+
+
+def is_excluded(filename, excluded):
+    if not excluded:
+        return False
+
+    path = _realpaths.get(filename)
+
+    if path is None:
+        path = _realpaths[filename] = os.path.realpath(filename)
+
+    return path.startswith(excluded)
+
+
+def get_label(code):
+    filename = code.co_filename
+
+    if filename.startswith(ROOT):
+        filename = os.path.relpath(filename, ROOT)
+    else:
+        filename = os.path.basename(filename)
+
+    return '{}:{}:{}'.format(filename, code.co_name, code.co_firstlineno)
+
+
+class SamplingProfiler(object):
+    '''
+    Samples stacks of the profiled thread (all threads with all_threads) every interval seconds
+    from a background thread, counts them as collapsed stacks (root;...;leaf).
+    '''
+
+    def __init__(self, interval=INTERVAL, all_threads=False, excluded=()):
+        self.interval = interval
+        self.all_threads = all_threads
+        self.excluded = excluded
+        self.stacks = Counter()
+
+        self._thread_id = None
+        self._running = False
+        self._thread = None
+
+    def enable(self):
+        self._thread_id = threading.current_thread().ident
+        self._running = True
+
+        self._thread = threading.Thread(target=self._run, name='SamplingProfiler')
+        self._thread.daemon = True
+        self._thread.start()
+
+    def disable(self):
+        self._running = False
+        self._thread.join()
+
+    def _run(self):
+        own_id = threading.current_thread().ident
+
+        while self._running:
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id or (not self.all_threads and thread_id != self._thread_id):
+                    continue
+
+                stack = self.get_stack(frame)
+                if stack:
+                    self.stacks[stack] += 1
+
+            time.sleep(self.interval)
+
+    def get_stack(self, frame):
+        labels = []
+
+        while frame is not None:
+            code = frame.f_code
+
+            # time of excluded frames goes to their closest kept caller
+            if not is_excluded(code.co_filename, self.excluded):
+                labels.append(get_label(code))
+
+            frame = frame.f_back
+
+        return ';'.join(reversed(labels))
+
+    def dump(self, path):
+        with open(path, 'w') as f:
+            for stack, count in sorted(self.stacks.items()):
+                f.write('{} {}\n'.format(stack, count))
+
+
+def exclude_stats(stats, excluded):
+    '''
+    Drops functions under excluded from pstats (and from callers of the rest).
+    '''
+    if not excluded:
+        return stats
+
+    kept = {}
+
+    for function, (cc, nc, tt, ct, callers) in stats.stats.items():
+        if is_excluded(function[0], excluded):
+            continue
+
+        callers = dict((caller, value) for caller, value in callers.items() if not is_excluded(caller[0], excluded))
+        kept[function] = (cc, nc, tt, ct, callers)
+
+    stats.stats = kept
+    stats.total_tt = sum(tt for _, _, tt, _, _ in kept.values())
+
+    return stats
+
+
+def profile(profiler, get_run_scraper, iterations, context=None):
+    '''
+    Runs iterations runs (fresh scraper every run, same as the scheduler) under profiler.
+    '''
+    publisher = StreamPublisher(stream=open(os.devnull, 'w'))
+    sink = InMemorySink()
+
+    if context is not None:
+        context.__enter__()
+
+    try:
+        for _ in range(iterations):
+            scraper = get_run_scraper()
+            scraper.publisher = publisher
+            scraper.metrics_sink = sink
+
+            profiler.enable()
+            try:
+                scraper.run()
+                publisher.flush()
+            finally:
+                profiler.disable()
+    finally:
+        if context is not None:
+            context.__exit__(None, None, None)
+
+        publisher.close()
+
+    return sink.get_runs()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Profiles runs of one scraper.')
+    parser.add_argument('scraper', help='scraper class or source name')
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument('--fixture', help='recorded fixture (path, or file name under the tests data directory)')
+    source.add_argument('--url', help='live URL to request instead of a fixture')
+    parser.add_argument('--iterations', type=int, default=ITERATIONS)
+    parser.add_argument('--sampling', action='store_true', help='sampling profiler, writes collapsed stacks')
+    parser.add_argument('--interval', type=float, default=INTERVAL, help='seconds between samples')
+    parser.add_argument('--all-threads', action='store_true', help='samples every thread (tile workers)')
+    parser.add_argument('--exclude', action='append', default=[], metavar='PACKAGE',
+                        help='drops frames of a package, eg. requests, bs4, dateutil')
+    parser.add_argument('--output', help='defaults to <scraper>.pstats or <scraper>.collapsed')
+    parser.add_argument('--limit', type=int, default=LIMIT, help='rows of the printed pstats summary')
+    args = parser.parse_args()
+
+    cls = get_scraper_class(args.scraper)
+    excluded = get_package_dirs(args.exclude)
+    context = None
+
+    if args.url:
+        if issubclass(cls, base_ifsc_scraper.IFSCScraper):
+            parser.error('IFSC sources request their own tiles, profile them with --fixture')
+
+        get_run_scraper = lambda: get_live_scraper(cls, args.url)
+    else:
+        body, document = load_fixture(get_fixture_path(cls, args.fixture))
+        get_run_scraper = lambda: get_fixture_scraper(cls, body, document)
+
+        if issubclass(cls, base_ifsc_scraper.IFSCScraper):
+            context = FixtureTiles(body)
+
+    if args.sampling:
+        profiler = SamplingProfiler(args.interval, args.all_threads, excluded)
+    else:
+        profiler = cProfile.Profile()
+
+    runs = profile(profiler, get_run_scraper, args.iterations, context)
+
+    errors = sum(run_metrics.counters.get('errors', 0) for run_metrics in runs)
+    rows = sum(run_metrics.counters.get('rows', 0) for run_metrics in runs)
+    print '{}: {} runs, {} rows, {} errors'.format(cls.name, len(runs), rows, errors)
+
+    if args.sampling:
+        output = args.output or '{}.collapsed'.format(cls.name)
+        profiler.dump(output)
+        print '{} samples written to {}'.format(sum(profiler.stacks.values()), output)
+        return
+
+    output = args.output or '{}.pstats'.format(cls.name)
+    stats = exclude_stats(pstats.Stats(profiler), excluded)
+    stats.dump_stats(output)
+    stats.sort_stats('cumulative').print_stats(args.limit)
+    print 'pstats written to {}'.format(output)
+
+
+if __name__ == '__main__':
+    main()
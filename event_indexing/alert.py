@@ -0,0 +1,175 @@
+'''
+Compact alert records. Scrapers hold and pass these around instead of nested dicts, they read (and write)
+like the dicts they replace and are converted to dicts with to_dict when published or persisted.
+'''
+
+
+class Record(object):
+    '''
+    Record with dict access. Set on class: __slots__, fields (dict keys, in order) and required (keys
+    present even without value). Other fields are left out while None, derived fields go in get_field.
+    Keys set that are not fields are kept aside, so hooks can still add to an alert.
+    '''
+    __slots__ = ('_extra',)
+    fields = ()
+    required = ()
+
+    def get_field(self, key):
+        return getattr(self, key)
+
+    def _get(self, key):
+        if self._extra and key in self._extra:
+            return self._extra[key]
+
+        if key in self.fields:
+            return self.get_field(key)
+
+        return None
+
+    def keys(self):
+        keys = [key for key in self.fields if key in self.required or self._get(key) is not None]
+
+        if self._extra:
+            keys.extend(key for key in self._extra if key not in self.fields)
+
+        return keys
+
+    def items(self):
+        return [(key, self[key]) for key in self.keys()]
+
+    def get(self, key, default=None):
+        if key in self:
+            return self[key]
+
+        return default
+
+    def to_dict(self):
+        return {key: to_dict(value) for key, value in self.items()}
+
+    def __getitem__(self, key):
+        value = self._get(key)
+
+        if value is None and key not in self.required and not (self._extra and key in self._extra):
+            raise KeyError(key)
+
+        return value
+
+    def __setitem__(self, key, value):
+        if key in self.__slots__ and key in self.fields:
+            setattr(self, key, value)
+            return
+
+        if self._extra is None:
+            self._extra = {}
+
+        self._extra[key] = value
+
+    def __contains__(self, key):
+        return key in self.required or self._get(key) is not None or bool(self._extra and key in self._extra)
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self):
+        return len(self.keys())
+
+    def __eq__(self, other):
+        if isinstance(other, (Record, dict)):
+            return self.to_dict() == to_dict(other)
+
+        return NotImplemented
+
+    def __ne__(self, other):
+        equal = self.__eq__(other)
+
+        if equal is NotImplemented:
+            return equal
+
+        return not equal
+
+    __hash__ = None
+
+    def __repr__(self):
+        return '{}({!r})'.format(self.__class__.__name__, self.to_dict())
+
+
+class AlertSource(Record):
+    '''
+    alert['source'], provider is shared by all alerts of a run.
+    '''
+    __slots__ = ('provider', 'text', 'created_at', 'type', 'id', 'latitude', 'longitude')
+    fields = ('provider', 'text', 'created_at', 'type', 'id', 'geo')
+    required = ('provider', 'text', 'created_at', 'type', 'id')
+
+    def __init__(self, provider, text, created_at, type, id, latitude=None, longitude=None):
+        self._extra = None
+        self.provider = provider
+        self.text = text
+        self.created_at = created_at
+        self.type = type
+        self.id = id
+        self.latitude = latitude
+        self.longitude = longitude
+
+    def get_field(self, key):
+        if key == 'geo':
+            if self.latitude is None or self.longitude is None:
+                return None
+
+            return {
+                'type': 'Point',
+                'coordinates': [
+                    self.longitude,
+                    self.latitude
+                ]
+            }
+
+        return getattr(self, key)
+
+
+class Alert(Record):
+    '''
+    Parsed incident, see IncidentScraper.parse.
+    '''
+    __slots__ = ('detected_at', 'incident', 'source', 'details', 'address', 'city', 'locality', 'latitude',
+                 'longitude', 'category', 'prediction')
+    fields = ('detected_at', 'incident', 'source', 'details', 'address', 'city', 'locality', 'coordinates',
+              'category', 'prediction')
+    required = ('detected_at', 'incident', 'source')
+
+    def __init__(self, detected_at, incident, source, details=None, address=None, city=None, locality=None,
+                 latitude=None, longitude=None, category=None, prediction=None):
+        self._extra = None
+        self.detected_at = detected_at
+        self.incident = incident
+        self.source = source
+        self.details = details
+        self.address = address
+        self.city = city
+        self.locality = locality
+        self.latitude = latitude
+        self.longitude = longitude
+        self.category = category
+        self.prediction = prediction
+
+    def get_field(self, key):
+        if key == 'coordinates':
+            if self.latitude is None or self.longitude is None:
+                return None
+
+            return {
+                'lat': self.latitude,
+                'long': self.longitude
+            }
+
+        return getattr(self, key)
+
+
+def to_dict(value):
+    '''
+    Returns dict of a record, anything else as is.
+    '''
+    if isinstance(value, Record):
+        return value.to_dict()
+
+    return value
@@ -0,0 +1,297 @@
+import os
+import resource
+import threading
+from collections import deque
+from contextlib import contextmanager
+from time import time
+
+'''
+Per run instrumentation of scrapers. A run records wall and cpu time of its stages and counts rows,
+then writes itself to a metrics sink (in memory by default, Prometheus text file with METRICS_FILE set).
+
+Stage times are exclusive: while a nested stage runs (eg. scrape pulling rows from get_incidents),
+its parent is paused, so stages add up to the run. Cpu time is the running thread's where the
+platform has it (Linux), process cpu otherwise.
+'''
+
+METRICS_FILE = os.environ.get('EVENT_INDEXING_METRICS_FILE')  # unset keeps metrics in memory only
+MAX_RUNS = 1000  # runs kept by InMemorySink
+
+STAGE_REQUEST = 'request'
+STAGE_DECODE = 'decode'
+STAGE_INCIDENTS = 'get_incidents'
+STAGE_SCRAPE = 'scrape'
+STAGE_PARSE = 'parse'
+STAGE_CHANGES = 'changes'
+STAGE_PUBLISH = 'publish'
+
+COUNTER_ROWS = 'rows'  # source items seen
+COUNTER_REJECTED = 'rejected'  # rejected by is_valid_incident
+COUNTER_FILTERED = 'filtered'  # older than max delay (or in the future)
+COUNTER_PUBLISHED = 'published'
+COUNTER_ERRORS = 'errors'
+
+RUSAGE_THREAD = 1  # Linux only, not exposed by the resource module on Python 2
+
+_lock = threading.Lock()
+_sink = None
+
+
+def _get_rusage_who():
+    try:
+        resource.getrusage(RUSAGE_THREAD)
+        return RUSAGE_THREAD
+    except (ValueError, resource.error):
+        return resource.RUSAGE_SELF
+
+
+_rusage_who = _get_rusage_who()
+
+
+def get_cpu_time():
+    '''
+    Returns user + system cpu seconds of the running thread (process on platforms without thread usage).
+    '''
+    usage = resource.getrusage(_rusage_who)
+
+    return usage.ru_utime + usage.ru_stime
+
+
+class StageClock(object):
+    '''
+    Running stages and their times on one thread.
+    '''
+    __slots__ = ('stack', 'wall', 'cpu', 'walls', 'cpus')
+
+    def __init__(self):
+        self.stack = []
+        self.wall = 0.0
+        self.cpu = 0.0
+        self.walls = {}
+        self.cpus = {}
+
+    def switch(self):
+        '''
+        Charges time since the last switch to the running stage.
+        '''
+        wall = time()
+        cpu = get_cpu_time()
+        stack = self.stack
+
+        if stack:
+            stage = stack[-1]
+            self.walls[stage] = self.walls.get(stage, 0.0) + wall - self.wall
+            self.cpus[stage] = self.cpus.get(stage, 0.0) + cpu - self.cpu
+
+        self.wall = wall
+        self.cpu = cpu
+
+
+class RunMetrics(object):
+    '''
+    Stage times and counters of one run of a source. Safe to record from worker threads.
+    '''
+
+    def __init__(self, source):
+        self.source = source
+        self.counters = {}
+
+        self._clocks = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def incr(self, counter, value=1):
+        with self._lock:
+            self.counters[counter] = self.counters.get(counter, 0) + value
+
+    @contextmanager
+    def stage(self, name):
+        '''
+        Charges time spent in the block to stage name (minus nested stages).
+        '''
+        clock = self.get_clock()
+
+        clock.switch()
+        clock.stack.append(name)
+
+        try:
+            yield
+        finally:
+            clock.switch()
+            clock.stack.pop()
+
+    def iterate(self, name, iterable):
+        '''
+        Yields items of iterable, time spent producing them is charged to stage name.
+        '''
+        iterator = iter(iterable)
+        clock = self.get_clock()
+        stack = clock.stack
+
+        while True:
+            clock.switch()
+            stack.append(name)
+
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            finally:
+                clock.switch()
+                stack.pop()
+
+            yield item
+
+    def get_clock(self):
+        '''
+        Returns stage clock of the running thread.
+        '''
+        clock = getattr(self._local, 'clock', None)
+
+        if clock is None:
+            clock = self._local.clock = StageClock()
+
+            with self._lock:
+                self._clocks.append(clock)
+
+        return clock
+
+    def get_stages(self):
+        '''
+        Returns stage -> {'wall', 'cpu'} seconds, summed over threads.
+        '''
+        stages = {}
+
+        with self._lock:
+            clocks = list(self._clocks)
+
+        for clock in clocks:
+            for stage, wall in clock.walls.items():
+                times = stages.setdefault(stage, {'wall': 0.0, 'cpu': 0.0})
+                times['wall'] += wall
+                times['cpu'] += clock.cpus.get(stage, 0.0)
+
+        return stages
+
+
+class MetricsSink(object):
+    '''
+    Receives metrics of every finished run. Override write on every sink.
+    '''
+
+    def write(self, metrics):
+        raise NotImplementedError
+
+
+class InMemorySink(MetricsSink):
+    '''
+    Keeps the last max_runs runs in memory.
+    '''
+
+    def __init__(self, max_runs=MAX_RUNS):
+        self.runs = deque(maxlen=max_runs)
+        self._lock = threading.Lock()
+
+    def write(self, metrics):
+        with self._lock:
+            self.runs.append(metrics)
+
+    def get_runs(self, source=None):
+        with self._lock:
+            return [metrics for metrics in self.runs if source is None or metrics.source == source]
+
+
+class PrometheusFileSink(MetricsSink):
+    '''
+    Keeps totals per source and rewrites them to path in Prometheus text format after every run
+    (for node_exporter's textfile collector). The file is replaced atomically.
+    '''
+
+    def __init__(self, path, prefix='event_indexing'):
+        self.path = path
+        self.prefix = prefix
+
+        self._runs = {}
+        self._stages = {}
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    def write(self, metrics):
+        stages = metrics.get_stages()
+
+        with self._lock:
+            source = metrics.source
+            self._runs[source] = self._runs.get(source, 0) + 1
+
+            for stage, times in stages.items():
+                totals = self._stages.setdefault((source, stage), {'wall': 0.0, 'cpu': 0.0})
+                totals['wall'] += times['wall']
+                totals['cpu'] += times['cpu']
+
+            for counter, value in metrics.counters.items():
+                key = (source, counter)
+                self._counters[key] = self._counters.get(key, 0) + value
+
+            self.save()
+
+    def save(self):
+        tmp_path = '{}.tmp'.format(self.path)
+
+        with open(tmp_path, 'w') as f:
+            f.write(self.format())
+
+        os.rename(tmp_path, self.path)
+
+    def format(self):
+        lines = []
+
+        self._add_metric(lines, 'runs_total', 'Finished runs.',
+                         [({'source': source}, value) for source, value in sorted(self._runs.items())])
+
+        for kind in ('wall', 'cpu'):
+            self._add_metric(lines, 'stage_{}_seconds_total'.format(kind), '{} time spent in a stage.'.format(
+                kind.capitalize()), [({'source': source, 'stage': stage}, times[kind]) for (source, stage), times in
+                                     sorted(self._stages.items())])
+
+        counters = sorted(set(counter for _, counter in self._counters))
+
+        for counter in counters:
+            self._add_metric(lines, '{}_total'.format(counter), 'Rows counted as {}.'.format(counter),
+                             [({'source': source}, value) for (source, name), value in sorted(self._counters.items())
+                              if name == counter])
+
+        return ''.join('{}\n'.format(line) for line in lines)
+
+    def _add_metric(self, lines, name, description, samples):
+        name = '{}_{}'.format(self.prefix, name)
+
+        lines.append('# HELP {} {}'.format(name, description))
+        lines.append('# TYPE {} counter'.format(name))
+
+        for labels, value in samples:
+            labels = ','.join('{}="{}"'.format(key, labels[key]) for key in sorted(labels))
+            lines.append('{}{{{}}} {}'.format(name, labels, repr(float(value))))
+
+
+def get_metrics_sink():
+    '''
+    Returns process wide metrics sink, Prometheus file sink with METRICS_FILE set, in memory sink otherwise.
+    '''
+    global _sink
+
+    if _sink is None:
+        with _lock:
+            if _sink is None:
+                _sink = PrometheusFileSink(METRICS_FILE) if METRICS_FILE else InMemorySink()
+
+    return _sink
+
+
+def set_metrics_sink(sink):
+    '''
+    Replaces process wide metrics sink, None goes back to the default.
+    '''
+    global _sink
+
+    with _lock:
+        _sink = sink
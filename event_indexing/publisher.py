@@ -0,0 +1,283 @@
+import atexit
+import logging
+import sys
+import threading
+import time
+from Queue import Queue, Empty
+
+from event_indexing.alert import to_dict
+from event_indexing.scrapers.session import send_request
+from event_indexing.util.json_utils import dumps
+
+BATCH_SIZE = 50  # incidents per batch
+BATCH_BYTES = 512 * 1024  # serialized bytes per batch
+FLUSH_INTERVAL = 1.0  # seconds a partial batch may wait
+QUEUE_SIZE = 10000  # incidents waiting to be written before publish() blocks (backpressure)
+RETRIES = 3  # further attempts at a failed batch
+RETRY_BACKOFF = 1.0  # seconds before the first retry, doubled on every next one
+
+logger = logging.getLogger(__name__)
+
+_FLUSH = object()
+_CLOSE = object()
+
+_lock = threading.Lock()
+_publishers = {}
+
+
+class PublishError(Exception):
+    pass
+
+
+class Delivery(object):
+    '''
+    Incidents of one publish call, done once the background thread has written (or given up on) all of them.
+    '''
+
+    def __init__(self, count):
+        self.pending = count
+        self.failed = 0
+        self.error = None
+
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+
+        if not count:
+            self._done.set()
+
+    def done(self, count, error=None):
+        with self._lock:
+            self.pending -= count
+
+            if error is not None:
+                self.failed += count
+                self.error = error
+
+            if self.pending <= 0:
+                self._done.set()
+
+    def wait(self, timeout=None):
+        '''
+        Blocks until every incident is written, raises PublishError if some were dropped.
+        '''
+        self._done.wait(timeout)
+
+        if self.failed:
+            raise PublishError('Failed to publish {} incidents ({})'.format(self.failed, self.error))
+
+
+class Publisher(object):
+    '''
+    Serializes incidents in the caller and hands them to a background thread that writes them in batches
+    (by count, bytes or FLUSH_INTERVAL). publish() blocks when QUEUE_SIZE incidents are waiting, so a slow
+    sink slows scrapers down instead of growing memory. A failed batch is retried RETRIES times with
+    backoff before it is dropped, callers learn about it from the Delivery publish() returns.
+    Override write on every sink.
+    '''
+
+    def __init__(self, batch_size=BATCH_SIZE, batch_bytes=BATCH_BYTES, flush_interval=FLUSH_INTERVAL,
+                 queue_size=QUEUE_SIZE, retries=RETRIES, retry_backoff=RETRY_BACKOFF):
+        self.batch_size = batch_size
+        self.batch_bytes = batch_bytes
+        self.flush_interval = flush_interval
+        self.retries = retries
+        self.retry_backoff = retry_backoff
+
+        self._queue = Queue(queue_size)
+        self._thread = None
+        self._thread_lock = threading.Lock()
+
+    def publish(self, incidents):
+        '''
+        Queues a list of formatted incidents, returns their Delivery.
+        '''
+        self.start()
+        delivery = Delivery(len(incidents))
+
+        for incident in incidents:
+            self._queue.put((self.serialize(incident), delivery))
+
+        return delivery
+
+    def serialize(self, incident):
+        return dumps(to_dict(incident))
+
+    def write(self, batch):
+        '''
+        Writes a list of serialized incidents.
+        '''
+        raise NotImplementedError
+
+    def start(self):
+        if self._thread is not None:
+            return
+
+        with self._thread_lock:
+            if self._thread is None:
+                thread = threading.Thread(target=self._run, name='{}-flush'.format(self.__class__.__name__))
+                thread.daemon = True
+                thread.start()
+
+                self._thread = thread
+
+    def flush(self, wait=True):
+        '''
+        Writes queued incidents without waiting out flush_interval. Blocks until they are written unless wait is False.
+        '''
+        if self._thread is None:
+            return
+
+        self._queue.put(_FLUSH)
+
+        if wait:
+            self._queue.join()
+
+    def close(self):
+        '''
+        Writes queued incidents and stops background thread.
+        '''
+        if self._thread is None:
+            return
+
+        self._queue.put(_CLOSE)
+        self._thread.join()
+        self._thread = None
+
+    def _run(self):
+        batch = []
+        size = 0
+        deadline = None
+
+        while True:
+            try:
+                if batch:
+                    item = self._queue.get(timeout=max(deadline - time.time(), 0))
+                else:
+                    item = self._queue.get()
+            except Empty:
+                item = _FLUSH
+            else:
+                # markers are acknowledged right away, incidents once written
+                if item is _FLUSH or item is _CLOSE:
+                    self._queue.task_done()
+
+            if item is not _FLUSH and item is not _CLOSE:
+                if not batch:
+                    deadline = time.time() + self.flush_interval
+
+                batch.append(item)
+                size += len(item[0])
+
+            if batch and (item is _FLUSH or item is _CLOSE or len(batch) >= self.batch_size or
+                          size >= self.batch_bytes):
+                self._write(batch)
+                batch = []
+                size = 0
+
+            if item is _CLOSE:
+                return
+
+    def _write(self, batch):
+        name = self.__class__.__name__
+        error = None
+
+        for attempt in range(self.retries + 1):
+            if attempt:
+                time.sleep(self.retry_backoff * 2 ** (attempt - 1))
+
+            try:
+                self.write([incident for incident, _ in batch])
+            except Exception as e:
+                error = e
+
+                if attempt < self.retries:
+                    logger.warning('Publisher %s: Failed to publish %d incidents, retrying (%s)', name, len(batch), e)
+                else:
+                    logger.exception('Publisher %s: Failed to publish %d incidents', name, len(batch))
+            else:
+                error = None
+                break
+
+        deliveries = {}
+
+        for _, delivery in batch:
+            deliveries[delivery] = deliveries.get(delivery, 0) + 1
+
+        for delivery, count in deliveries.items():
+            delivery.done(count, error)
+
+        for _ in batch:
+            self._queue.task_done()
+
+
+class StreamPublisher(Publisher):
+    '''
+    Writes newline delimited JSON to a file object (stdout by default).
+    '''
+
+    def __init__(self, stream=None, **kwargs):
+        super(StreamPublisher, self).__init__(**kwargs)
+        self.stream = stream
+
+    def write(self, batch):
+        stream = self.stream or sys.stdout
+
+        stream.write('\n'.join(batch))
+        stream.write('\n')
+        stream.flush()
+
+
+class RelayPublisher(Publisher):
+    '''
+    POSTs every batch as a JSON array to relay_host_api, authenticated with relay_auth.
+    '''
+
+    def __init__(self, relay_host_api, relay_auth, **kwargs):
+        super(RelayPublisher, self).__init__(**kwargs)
+        self.relay_host_api = relay_host_api
+        self.relay_auth = relay_auth
+
+    def write(self, batch):
+        data = '[{}]'.format(','.join(batch))
+
+        r = send_request('POST', url=self.relay_host_api, data=data, auth=self.relay_auth,
+                         headers={'Content-Type': 'application/json'})
+        r.raise_for_status()
+
+
+def get_publisher(relay_host_api=None, relay_auth=None):
+    '''
+    Returns process wide publisher, relay publisher if relay_host_api is set, stdout otherwise.
+    Shared by all scrapers so every sink has one flush thread.
+    '''
+    key = (relay_host_api, tuple(relay_auth) if relay_auth else None)
+    publisher = _publishers.get(key)
+
+    if publisher is None:
+        with _lock:
+            publisher = _publishers.get(key)
+
+            if publisher is None:
+                if relay_host_api:
+                    publisher = RelayPublisher(relay_host_api, relay_auth)
+                else:
+                    publisher = StreamPublisher()
+
+                _publishers[key] = publisher
+
+    return publisher
+
+
+def close_publishers():
+    '''
+    Flushes and stops all shared publishers. Runs at exit.
+    '''
+    with _lock:
+        publishers = _publishers.values()
+        _publishers.clear()
+
+    for publisher in publishers:
+        publisher.close()
+
+
+atexit.register(close_publishers)
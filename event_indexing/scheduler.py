@@ -0,0 +1,245 @@
+import argparse
+import inspect
+import logging
+import pkgutil
+import time
+from importlib import import_module
+
+import event_indexing.scrapers
+from event_indexing.metrics import PrometheusFileSink, set_metrics_sink
+from event_indexing.scrapers.base import IncidentScraper
+from event_indexing.scrapers.category_maps import INCIDENT_CATEGORY_MAP
+from event_indexing.scrapers.registry import get_scraper_class, get_scraper_names
+from event_indexing.util.time_utils import now_seconds, preload_tz
+
+logger = logging.getLogger(__name__)
+
+STATUS_OK = 'ok'
+STATUS_ERROR = 'error'
+STATUS_TIMEOUT = 'timeout'
+STATUS_RUNNING = 'running'  # previous run has not finished yet, source is skipped this cycle
+
+
+def discover_scrapers(package=event_indexing.scrapers):
+    '''
+    Imports every module under package and returns all scraper classes registered in INCIDENT_CATEGORY_MAP,
+    sorted by name. Base classes (name is None) and helpers such as IFSCDirectory are left out.
+    Slow (imports everything), workers use load_scrapers.
+    '''
+    scrapers = {}
+    prefix = '{}.'.format(package.__name__)
+
+    for _, module_name, _ in pkgutil.walk_packages(package.__path__, prefix):
+        try:
+            module = import_module(module_name)
+        except ImportError as e:
+            logger.warning('Scheduler: Failed to import %s (%s)', module_name, e)
+            continue
+
+        for _, cls in inspect.getmembers(module, inspect.isclass):
+            if issubclass(cls, IncidentScraper) and cls.name in INCIDENT_CATEGORY_MAP:
+                scrapers[cls.name] = cls
+
+    return [scrapers[name] for name in sorted(scrapers)]
+
+
+def load_scrapers(names=None):
+    '''
+    Returns scraper classes of names (all registered sources if not set) sorted by name, only their modules
+    are imported (see registry.py). Unknown sources and sources failing to import are left out.
+    '''
+    scrapers = []
+
+    for name in sorted(names or get_scraper_names()):
+        try:
+            scrapers.append(get_scraper_class(name))
+        except KeyError:
+            logger.warning('Scheduler: Unknown source %s', name)
+        except ImportError:
+            logger.exception('Scheduler: Failed to import %s', name)
+
+    return scrapers
+
+
+def run_scraper(scraper):
+    '''
+    Runs a single indexing job, never raises. Returns status and wall time of the run.
+    '''
+    started_at = now_seconds()
+
+    try:
+        scraper.run()
+        status = STATUS_OK
+    except Exception:
+        logger.exception('Parser %s: Failed to run source', scraper.name)
+        status = STATUS_ERROR
+
+    return {
+        'status': status,
+        'wall_time': now_seconds() - started_at,
+    }
+
+
+class Scheduler(object):
+    '''
+    Runs many scraper classes concurrently in one process. Every source is polled on its own
+    poll_interval and the scheduler waits at most run_timeout for it, so a cycle takes as long
+    as the slowest due source instead of the sum of all of them.
+
+    A new scraper instance is created for every run, same as running scraper.run() by hand.
+    '''
+
+    def __init__(self, scrapers, relay_host_api, relay_auth, proxy_host, concurrency=None, incremental=False):
+        self.scrapers = scrapers
+        self.incremental = incremental
+        self._relay_host_api = relay_host_api
+        self._relay_auth = relay_auth
+        self.proxy_host = proxy_host
+
+        self.concurrency = concurrency or len(scrapers) or 1
+        # multiprocessing is only loaded by processes that schedule, not by single source workers
+        from multiprocessing.pool import ThreadPool
+
+        self._pool = ThreadPool(self.concurrency)
+        self._next_runs = dict((scraper.name, 0) for scraper in scrapers)
+        self._pending = {}
+
+        preload_tz(scraper.tz_name for scraper in scrapers)
+
+    def get_scraper(self, cls):
+        '''
+        Creates scraper instance for a run. Override if sources need extra arguments.
+        '''
+        scraper = cls(self._relay_host_api, self._relay_auth, self.proxy_host)
+
+        if self.incremental:
+            scraper.incremental = True
+
+        return scraper
+
+    def get_due_scrapers(self, now):
+        '''
+        Returns scraper classes whose poll interval has elapsed.
+        '''
+        return [cls for cls in self.scrapers if self._next_runs[cls.name] <= now]
+
+    def get_sleep_time(self, now):
+        '''
+        Seconds until next source is due.
+        '''
+        if not self._next_runs:
+            return 0
+
+        return max(min(self._next_runs.values()) - now, 0)
+
+    def run_cycle(self):
+        '''
+        Starts all due sources, waits for them (each within its own run_timeout) and returns a cycle report.
+        '''
+        started_at = now_seconds()
+        sources = {}
+        jobs = []
+
+        for cls in self.get_due_scrapers(started_at):
+            pending = self._pending.get(cls.name)
+
+            # Timed out last cycle and still running, don't stack runs of the same source
+            if pending is not None and not pending.ready():
+                sources[cls.name] = {
+                    'status': STATUS_RUNNING,
+                    'wall_time': None,
+                }
+                continue
+
+            self._next_runs[cls.name] = started_at + cls.poll_interval
+
+            job = self._pool.apply_async(run_scraper, (self.get_scraper(cls),))
+            self._pending[cls.name] = job
+            jobs.append((cls, job))
+
+        for cls, job in jobs:
+            remaining = started_at + cls.run_timeout - now_seconds()
+            job.wait(max(remaining, 0))
+
+            if job.ready():
+                sources[cls.name] = job.get()
+            else:
+                sources[cls.name] = {
+                    'status': STATUS_TIMEOUT,
+                    'wall_time': now_seconds() - started_at,
+                }
+
+        return {
+            'started_at': started_at,
+            'wall_time': now_seconds() - started_at,
+            'sources': sources,
+        }
+
+    def run(self, cycles=None):
+        '''
+        Runs cycles until stopped (or for given number of cycles), sleeping until next source is due.
+        '''
+        cycle = 0
+
+        while cycles is None or cycle < cycles:
+            report = self.run_cycle()
+            self.report(report)
+            cycle += 1
+
+            if cycles is None or cycle < cycles:
+                time.sleep(self.get_sleep_time(now_seconds()))
+
+    def report(self, report):
+        '''
+        Prints one line per cycle. Override to ship cycle reports elsewhere.
+        '''
+        sources = report['sources']
+
+        if not sources:
+            return
+
+        statuses = [source['status'] for source in sources.values()]
+        timed = [(source['wall_time'], name) for name, source in sources.items() if source['wall_time'] is not None]
+        slowest = max(timed) if timed else (0, None)
+
+        print 'Scheduler: ran {} sources in {:.3f}s (slowest {} {:.3f}s, {} timeouts, {} errors, {} still running)'.format(
+            len(sources), report['wall_time'], slowest[1], slowest[0], statuses.count(STATUS_TIMEOUT),
+            statuses.count(STATUS_ERROR), statuses.count(STATUS_RUNNING))
+
+    def close(self):
+        self._pool.terminate()
+        self._pool.join()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Runs all registered scrapers concurrently.')
+    parser.add_argument('--relay-host-api', default=None)
+    parser.add_argument('--relay-auth', default=None, help='user:password')
+    parser.add_argument('--proxy-host', default=None)
+    parser.add_argument('--concurrency', type=int, default=None)
+    parser.add_argument('--cycles', type=int, default=None)
+    parser.add_argument('--incremental', action='store_true', help='publish only new or changed incidents')
+    parser.add_argument('--metrics-file', default=None, help='writes run metrics in Prometheus text format')
+    parser.add_argument('sources', nargs='*', help='scraper names to run, defaults to all')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(name)s: %(message)s')
+
+    if args.metrics_file:
+        set_metrics_sink(PrometheusFileSink(args.metrics_file))
+
+    relay_auth = tuple(args.relay_auth.split(':', 1)) if args.relay_auth else None
+
+    scrapers = load_scrapers(args.sources)
+
+    scheduler = Scheduler(scrapers, args.relay_host_api, relay_auth, args.proxy_host, args.concurrency,
+                          args.incremental)
+
+    try:
+        scheduler.run(args.cycles)
+    finally:
+        scheduler.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -1,20 +1,27 @@
 import hashlib
-import json
+import logging
 import random
+import warnings
 from urlparse import urljoin
 
-import requests
-from dateutil.tz import gettz
-from requests.packages.urllib3.exceptions import InsecureRequestWarning
-
-from event_indexing.scrapers.category_maps import INCIDENT_CATEGORY_MAP
+from event_indexing.alert import Alert, AlertSource
+from event_indexing.metrics import RunMetrics, get_metrics_sink, STAGE_REQUEST, STAGE_DECODE, STAGE_INCIDENTS, \
+    STAGE_SCRAPE, STAGE_PARSE, STAGE_CHANGES, STAGE_PUBLISH, COUNTER_ROWS, COUNTER_REJECTED, COUNTER_FILTERED, \
+    COUNTER_PUBLISHED, COUNTER_ERRORS
+from event_indexing.publisher import get_publisher
+from event_indexing.scrapers.category_classifier import get_classifier
+from event_indexing.scrapers.session import send_request, send_conditional_request, save_validators, \
+    CACHE_BUSTER_PARAMS
+from event_indexing.scrapers.state import get_state_store
 from event_indexing.source import TYPE_CAD_API
-from event_indexing.util.time_utils import now_seconds, parse_timestamp
-
-requests.packages.urllib3.disable_warnings(InsecureRequestWarning)
+from event_indexing.util.time_utils import now_seconds, get_timestamp_parser, get_tz
 
 CHUNK_SIZE = 50
 MAX_DELAY = 60 * 60  # 1 hour delay
+POLL_INTERVAL = 60  # 1 min polling
+RUN_TIMEOUT = 50  # seconds a single run may take before the scheduler stops waiting on it
+
+logger = logging.getLogger(__name__)
 
 USER_AGENTS = [
     "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_10_0) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/38.0.2125.111 Safari/537.36",
@@ -27,7 +34,24 @@ class IncidentScraper(object):
     name = None
     tz_name = None
     use_proxy = False
-    _category_map = None
+    poll_interval = POLL_INTERVAL
+    run_timeout = RUN_TIMEOUT
+    request_timeout = None
+    pool_size = None
+    conditional = False
+    cache_buster_params = CACHE_BUSTER_PARAMS
+    incremental = False
+    snapshot = True
+    publish_resolved = False
+    fingerprint_ignore = ()  # alert keys that change every poll without the incident changing, see state.py
+    publisher = None
+    metrics_sink = None
+    streaming = False
+    time_formats = ()  # strptime formats of the source's time strings, learned when not set
+    _provider = None
+    _metrics = None
+    _pending_validators = None
+    _deliveries = None
 
     def __init__(self, relay_host_api, relay_auth, proxy_host):
         self._relay_host_api = relay_host_api
@@ -36,12 +60,32 @@ class IncidentScraper(object):
 
     def request(self):
         '''
-        Loads a page and returns the raw text
+        Loads a page and returns the raw text, None if page did not change since last poll
         '''
         request_args = self.get_request_args()
-        r = requests.get(**request_args)
+        r = self.send_request('GET', **request_args)
+        if r is None:
+            return None
         r.raise_for_status()
-        return r.text
+
+        with self.metrics.stage(STAGE_DECODE):
+            return r.text
+
+    def send_request(self, method, **request_args):
+        '''
+        Sends request through the shared pooled session (keep-alive, per host pool size, timeouts).
+        Set request_timeout (seconds or (connect, read)) and pool_size on class as needed.
+
+        Set conditional on class for static feeds, unchanged responses (304 or same body) return None.
+        cache_buster_params lists the params (eg. now_milliseconds()) that don't identify the resource.
+        Validators of the response are only saved by commit, a run that fails gets the full response next poll.
+        '''
+        if self.conditional:
+            return send_conditional_request(method, ignore_params=self.cache_buster_params,
+                                            timeout=self.request_timeout, pool_size=self.pool_size,
+                                            pending=self.pending_validators, **request_args)
+
+        return send_request(method, timeout=self.request_timeout, pool_size=self.pool_size, **request_args)
 
     def get_request_args(self):
         '''
@@ -145,6 +189,16 @@ class IncidentScraper(object):
         '''
         raise NotImplementedError
 
+    @property
+    def provider(self):
+        '''
+        Returns provider shared by all alerts of a run. No need to override, override get_provider instead.
+        '''
+        if self._provider is None:
+            self._provider = self.get_provider()
+
+        return self._provider
+
     def get_max_delay(self):
         '''
         Limits indexing to last 1 hour. Do not override.
@@ -153,115 +207,269 @@ class IncidentScraper(object):
 
     def scrape(self, content, **kwargs):
         '''
-        Takes in content (text/json), sends to class through get_incidents
+        Takes in content (text/json), sends to class through iter_incidents
         and yields raw_incidents (formatted through get_incident, see
         clark_county_fd_cad.py for example). No need to override.
         '''
+        metrics = self.metrics
+        raw_incidents = metrics.iterate(STAGE_INCIDENTS, self.iter_incidents(content))
+
+        return metrics.iterate(STAGE_SCRAPE, self.get_recent_incidents(raw_incidents))
+
+    def get_recent_incidents(self, raw_incidents):
+        '''
+        Yields raw_incidents created within max delay.
+        '''
         now = now_seconds()
         max_delay = self.get_max_delay()
-        incidents = self.get_incidents(content)
+        metrics = self.metrics
 
-        for raw_incident in incidents:
+        for raw_incident in raw_incidents:
             created_at = raw_incident['created_at']
 
             if now - created_at > max_delay or created_at > now:
+                metrics.incr(COUNTER_FILTERED)
                 continue
 
             yield raw_incident
 
     def parse(self, raw_incident, **kwargs):
         '''
-        Parses raw_incident into formatted object. No need to override.
+        Parses raw_incident into formatted object (Alert, reads like a dict). No need to override.
         '''
-        provider = self.get_provider()
-
         incident = raw_incident['incident']
         created_at = raw_incident['created_at']
         incident_id = raw_incident['id']
 
-        alert = {
-            'detected_at': created_at,
-            'incident': incident,
-            'source': {
-                'provider': provider,
-                'text': incident,
-                'created_at': created_at,
-                'type': TYPE_CAD_API,
-                'id': incident_id,
-            }
-        }
-
-        # Details
-        details = raw_incident.get('details')
-        if details:
-            alert['details'] = details
-
-        # Address
-        address = raw_incident.get('address')
-        if address:
-            alert['address'] = address
-
-        # City
-        city = raw_incident.get('city')
-        if city:
-            alert['city'] = city
-
-        # Locality
-        locality = raw_incident.get('locality')
-        if locality:
-            alert['locality'] = locality
-
         # Coordinates
         latitude = raw_incident.get('latitude')
         longitude = raw_incident.get('longitude')
-        if latitude and longitude:
-            alert['coordinates'] = {
-                'lat': latitude,
-                'long': longitude
-            }
-
-            alert['source']['geo'] = {
-                'type': 'Point',
-                'coordinates': [
-                    longitude,
-                    latitude
-                ]
-            }
+        if not (latitude and longitude):
+            latitude = longitude = None
 
         # Category
-        category = self.category_map.get(incident)
-        if category:
-            alert['category'] = category
-            alert['prediction'] = 1.0
+        category = self.category_classifier.classify(incident)
+        prediction = 1.0 if category else None
+
+        source = AlertSource(self.provider, incident, created_at, TYPE_CAD_API, incident_id, latitude, longitude)
 
-        return alert
+        return Alert(created_at, incident, source,
+                     details=raw_incident.get('details') or None,
+                     address=raw_incident.get('address') or None,
+                     city=raw_incident.get('city') or None,
+                     locality=raw_incident.get('locality') or None,
+                     latitude=latitude,
+                     longitude=longitude,
+                     category=category or None,
+                     prediction=prediction)
 
     def run(self):
         '''
         Runs an indexing job.
         '''
-        content = self.request()
-        incidents = []
+        metrics = self.metrics
 
         try:
-            for raw_incident in self.scrape(content):
-                incidents.append(self.parse(raw_incident))
-            self.publish(incidents)
-        except:
-            print 'Parser {}: Failed to index source'.format(self.name)
+            with metrics.stage(STAGE_REQUEST):
+                content = self.request()
+        except Exception:
+            metrics.incr(COUNTER_ERRORS)
+            self.write_metrics()
+            raise
+
+        try:
+            # Not modified since last poll, nothing to index
+            if content is None:
+                return
+
+            alerts = (self.parse(raw_incident) for raw_incident in self.scrape(content))
+            self.publish_alerts(metrics.iterate(STAGE_PARSE, alerts))
+            # batches are written in background, state is only recorded once they are out
+            self.wait_published()
+            self.commit()
+        except Exception:
+            metrics.incr(COUNTER_ERRORS)
+            logger.exception('Parser %s: Failed to index source', self.name)
+        finally:
+            self.write_metrics()
+
+    @property
+    def pending_validators(self):
+        '''
+        Validators of conditional requests of this run, saved by commit. No need to override.
+        '''
+        if self._pending_validators is None:
+            self._pending_validators = {}
+
+        return self._pending_validators
+
+    def commit(self):
+        '''
+        Records the run as indexed: saves validators of its conditional requests, so next poll skips an
+        unchanged feed, and with incremental the state of published incidents. run calls this once alerts
+        are published, call it after request outside of run.
+        '''
+        if self.incremental:
+            get_state_store(self.name).commit()
+
+        if self._pending_validators:
+            save_validators(self._pending_validators)
+
+        self._pending_validators = None
+
+    @property
+    def metrics(self):
+        '''
+        Returns metrics of the current run (stage times and row counters, see metrics.py). No need to override.
+        '''
+        if self._metrics is None:
+            self._metrics = RunMetrics(self.name)
+
+        return self._metrics
+
+    def write_metrics(self):
+        '''
+        Hands metrics of the finished run to metrics_sink set on class, or the process wide sink.
+        '''
+        sink = self.metrics_sink or get_metrics_sink()
+        sink.write(self.metrics)
+
+        self._metrics = None
+
+    def publish_alerts(self, alerts):
+        '''
+        Publishes parsed alerts once all are parsed. With streaming set on class, alerts are published
+        in chunks of CHUNK_SIZE while the rest is still being requested/parsed, so only a chunk is held in memory.
+        '''
+        alerts = self.iter_changes(alerts)
+
+        if not self.streaming:
+            self.publish(list(alerts))
+            return
+
+        chunk = []
+
+        for alert in alerts:
+            chunk.append(alert)
+
+            if len(chunk) >= CHUNK_SIZE:
+                self.publish(chunk)
+                chunk = []
+
+        if chunk:
+            self.publish(chunk)
+
+    def get_changes(self, incidents):
+        '''
+        With incremental set on class, returns only incidents that are new or changed since last run
+        (plus resolved ones with publish_resolved). Set snapshot to False if a run doesn't see the whole feed.
+        '''
+        if not self.incremental:
+            return incidents
+
+        return list(self.iter_changes(incidents))
+
+    def iter_changes(self, incidents):
+        '''
+        Lazy version of get_changes.
+        '''
+        if not self.incremental:
+            return iter(incidents)
+
+        store = get_state_store(self.name)
+        changes = store.iter_changes(incidents, self.get_max_delay(), snapshot=self.snapshot,
+                                     resolved=self.publish_resolved, ignore=self.fingerprint_ignore)
+
+        return self.metrics.iterate(STAGE_CHANGES, changes)
 
     def publish(self, incidents):
         '''
-        Publishes formatted incidents (for this purpose, will only print incidents)
+        Publishes formatted incidents. Incidents are batched and written in background, see get_publisher.
         '''
-        for incident in incidents:
-            print json.dumps(incident)
+        if not incidents:
+            return
+
+        with self.metrics.stage(STAGE_PUBLISH):
+            delivery = self.get_publisher().publish(incidents)
+
+        if self._deliveries is None:
+            self._deliveries = []
+
+        self._deliveries.append(delivery)
+        self.metrics.incr(COUNTER_PUBLISHED, len(incidents))
+
+    def wait_published(self):
+        '''
+        Blocks until incidents published by this run are written, raises PublishError if the publisher
+        dropped some of them. No need to override.
+        '''
+        self.get_publisher().flush(wait=False)
+
+        deliveries = self._deliveries or ()
+        self._deliveries = None
+
+        for delivery in deliveries:
+            delivery.wait()
+
+    def get_publisher(self):
+        '''
+        Returns publisher set on class, otherwise shared relay publisher (relay_host_api) or stdout publisher.
+        '''
+        if self.publisher is not None:
+            return self.publisher
+
+        return get_publisher(self._relay_host_api, self._relay_auth)
 
     def get_incidents(self, content, **kwargs):
         '''
+        Returns list of raw_incidents. Override get_raw_incidents on every class (see clark_county_fd_cad.py),
+        or override this if source items can't be converted one by one (see cea_power_outages.py)
+        '''
+        raw_incidents = self.get_raw_incidents(content)
+
+        if raw_incidents is None:
+            raise NotImplementedError
+
+        return list(self.get_valid_incidents(raw_incidents))
+
+    def iter_incidents(self, content, **kwargs):
+        '''
+        Lazy version of get_incidents, raw_incidents are converted as they are consumed. No need to override.
+        '''
+        raw_incidents = self.get_raw_incidents(content)
+
+        if raw_incidents is None:
+            return iter(self.get_incidents(content))
+
+        return self.get_valid_incidents(raw_incidents)
+
+    def get_valid_incidents(self, raw_incidents):
+        '''
+        Yields source items accepted by is_valid_incident, converted through get_incident. No need to override.
+        '''
+        metrics = self.metrics
+
+        for raw_incident in raw_incidents:
+            metrics.incr(COUNTER_ROWS)
+
+            if not self.is_valid_incident(raw_incident):
+                metrics.incr(COUNTER_REJECTED)
+                continue
+
+            yield self.get_incident(raw_incident)
+
+    def get_raw_incidents(self, content, **kwargs):
+        '''
+        Returns iterable of source items (rows, json objects), each converted through get_incident.
         Override on every class, see clark_county_fd_cad.py for example
         '''
-        raise NotImplementedError
+        return None
+
+    def is_valid_incident(self, raw_incident):
+        '''
+        Rejects source items before they are converted. Override as needed, see fayetteville_911_cad.py
+        '''
+        return True
 
     def get_incident(self, raw_incident, **kwargs):
         '''
@@ -281,25 +489,41 @@ class IncidentScraper(object):
         '''
         Converts a time string into a epoch timestamp. See clark_county_fd_cad.py for example
         '''
-        return parse_timestamp(time_string, self.get_tz_info())
+        return self.timestamp_parser.parse(time_string, self.get_tz_info())
+
+    @property
+    def timestamp_parser(self):
+        '''
+        Returns parser shared by all instances of the class. No need to override, set time_formats instead.
+        '''
+        return get_timestamp_parser(self.name, self.time_formats)
 
     def get_tz_info(self):
         '''
         Returns tzinfo object from string. See clark_county_fd_cad.py tz_name
         '''
         if self.tz_name:
-            return gettz(self.tz_name)
+            return get_tz(self.tz_name)
 
         return None
 
     @property
     def category_map(self):
         '''
-        Returns category map. No need to override.
+        Deprecated, parse classifies with category_classifier. Returns the source's category map
+        (as in INCIDENT_CATEGORY_MAP).
+        '''
+        warnings.warn('IncidentScraper.category_map is deprecated, use category_classifier', DeprecationWarning,
+                      stacklevel=2)
+
+        return self.category_classifier.category_map
+
+    @property
+    def category_classifier(self):
+        '''
+        Returns compiled category map of the source (see category_classifier.py). No need to override.
         '''
-        if self._category_map is None:
-            self._category_map = INCIDENT_CATEGORY_MAP.get(self.name, {})
-        return self._category_map
+        return get_classifier(self.name)
 
 
 class ScraperException(Exception):
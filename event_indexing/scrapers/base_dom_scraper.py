@@ -1,16 +1,39 @@
 import re
 
 from bs4 import BeautifulSoup
+from bs4.builder import builder_registry
 
 from event_indexing.scrapers.base import IncidentScraper
 
+PARSER_HTML = 'html.parser'  # pure python, always available
+PARSER_LXML = 'lxml'  # C backed, needs lxml installed
+
+
+def get_parser_backend(parser_backend=None):
+    '''
+    Returns parser_backend if BeautifulSoup has a tree builder for it, html.parser otherwise.
+    '''
+    if parser_backend and builder_registry.lookup(parser_backend) is not None:
+        return parser_backend
+
+    return PARSER_HTML
+
+
+def get_soup(content, parser_backend=None):
+    '''
+    Returns BeautifulSoup object built with parser_backend (see get_parser_backend).
+    '''
+    return BeautifulSoup(content, get_parser_backend(parser_backend))
+
 
 class IncidentDomScraper(IncidentScraper):
+    parser_backend = PARSER_LXML
+
     def get_soup(self, content):
         '''
-        Returns BeautifulSoup object. No need to override.
+        Returns BeautifulSoup object. No need to override, set parser_backend on class instead.
         '''
-        return BeautifulSoup(content, 'html.parser')
+        return get_soup(content, self.parser_backend)
 
     def get_text(self, item):
         '''
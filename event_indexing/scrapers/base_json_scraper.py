@@ -1,25 +1,169 @@
-import requests
-from requests.packages.urllib3.exceptions import InsecureRequestWarning
-
-requests.packages.urllib3.disable_warnings(InsecureRequestWarning)
+from decimal import Decimal
+from itertools import chain
 
+from event_indexing.metrics import STAGE_DECODE
 from event_indexing.scrapers.base import IncidentScraper
+from event_indexing.util.json_utils import loads_body, loads_response, get_encoding, iter_utf8
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+# Streaming costs CPU (~6x json decoding: 1.49s against 0.24s for a 6MB feed of 50k items), it only pays off
+# where holding the whole decoded document would take a lot of memory.
+STREAM_MIN_BYTES = 8 * 1024 * 1024  # decoded body size from which items at json_path are streamed
+CHUNK_BYTES = 64 * 1024
+
+
+def get_json_items(content, json_path):
+    '''
+    Returns array at json_path (dot separated keys) of a decoded document, empty list if missing.
+    '''
+    for key in json_path.split('.'):
+        if not isinstance(content, dict) or key not in content:
+            return []
+
+        content = content[key]
+
+    return content
+
+
+def get_native(value):
+    '''
+    Converts Decimal numbers decoded by ijson to floats, the way json decodes them.
+    '''
+    if isinstance(value, Decimal):
+        return float(value)
+
+    if isinstance(value, dict):
+        return {key: get_native(item) for key, item in value.iteritems()}
+
+    if isinstance(value, list):
+        return [get_native(item) for item in value]
+
+    return value
+
+
+class ChunkReader(object):
+    '''
+    File like object over an iterator of byte chunks, for ijson.
+    '''
+
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        self._buffer = b''
+
+    def read(self, size=-1):
+        while size < 0 or len(self._buffer) < size:
+            chunk = next(self._chunks, None)
+
+            if chunk is None:
+                break
+
+            self._buffer += chunk
+
+        if size < 0:
+            size = len(self._buffer)
+
+        data, self._buffer = self._buffer[:size], self._buffer[size:]
+
+        return data
+
+
+def iter_json_items(f, json_path):
+    '''
+    Streams items of array at json_path from file like object, only one item is decoded at a time.
+    '''
+    for item in ijson.items(f, '{}.item'.format(json_path)):
+        yield get_native(item)
 
 
 class IncidentJsonScraper(IncidentScraper):
     '''
     Default method is GET, you can change this on class to POST (or what ever you need)
+
+    Set json_path on class (eg. 'outages') to the incident array of large feeds. Bodies of stream_min_bytes
+    or more are then streamed one item at a time instead of decoded at once (needs ijson, decodes it all otherwise).
     '''
     method = 'GET'
+    json_path = None
+    stream_min_bytes = STREAM_MIN_BYTES
 
     def request(self):
         '''
-        Returns JSON object.
+        Returns JSON object, None if response did not change since last poll.
+        Returns iterator over items at json_path if streaming.
         '''
         request_args = self.get_request_args()
-        r = requests.request(**request_args)
+
+        if self.json_path and ijson is not None:
+            r = self.send_request(stream=True, **request_args)
+            if r is None:
+                return None
+            r.raise_for_status()
+
+            head, chunks = self.read_head(r)
+
+            if chunks is not None:
+                # ijson only reads UTF-8
+                encoding = get_encoding(head[0], r.encoding)
+                return self.iter_response_items(r, iter_utf8(chain(head, chunks), encoding))
+
+            with self.metrics.stage(STAGE_DECODE):
+                return loads_body(b''.join(head), r.encoding)
+
+        r = self.send_request(**request_args)
+        if r is None:
+            return None
         r.raise_for_status()
-        return r.json()
+
+        with self.metrics.stage(STAGE_DECODE):
+            return loads_response(r)
+
+    def read_head(self, r):
+        '''
+        Reads (decompressed) body chunks up to stream_min_bytes. Returns (chunks, None) if that was the whole
+        body, otherwise (chunks read, iterator over the rest). No need to override.
+        '''
+        # conditional requests already read the body to compare it with last poll, chunks are slices of it then
+        chunks = r.iter_content(CHUNK_BYTES)
+        head = []
+        size = 0
+
+        for chunk in chunks:
+            head.append(chunk)
+            size += len(chunk)
+
+            if size >= self.stream_min_bytes:
+                return head, chunks
+
+        r.close()
+
+        return head, None
+
+    def iter_response_items(self, r, chunks):
+        '''
+        Streams items at json_path from response body chunks. No need to override.
+        '''
+        try:
+            for item in iter_json_items(ChunkReader(chunks), self.json_path):
+                yield item
+        finally:
+            r.close()
+
+    def get_raw_incidents(self, content, **kwargs):
+        '''
+        Returns items at json_path, content is either the decoded document or already streamed items.
+        Override if json_path is not set.
+        '''
+        if self.json_path is None:
+            return None
+
+        if isinstance(content, dict):
+            return get_json_items(content, self.json_path)
+
+        return content
 
     def get_request_args(self):
         '''
@@ -0,0 +1,184 @@
+import re
+import threading
+from collections import Counter
+
+from event_indexing.scrapers.category_maps import INCIDENT_CATEGORY_MAP, INCIDENT_CATEGORY_PATTERNS
+
+'''
+Compiled category maps. Incident text and map keys are normalised (lower case, runs of punctuation and
+whitespace collapsed) and keys are kept in a token trie: an incident gets the category of the longest key
+its tokens start with, so casing, spacing and trailing codes ('SUSP VEH - 10-37') still match. Regex rules
+(INCIDENT_CATEGORY_PATTERNS) are tried in list order on the normalised text when no key matches.
+
+Cost: a key lookup walks the text's tokens once, whatever the number of keys. The regex fallback is not
+linear, every rule may scan the text (rules x text length) before one matches or all miss. Results are cached
+per distinct text, so sources repeating the same texts pay it once.
+
+Classifiers are compiled once at import, one per source.
+'''
+
+TOKEN_PATTERN = re.compile(r'[^\W_]+', re.UNICODE)
+PATTERNS_PER_REGEX = 50  # named groups per combined regex (Python 2 allows at most 100 groups)
+MAX_MISSED = 1000  # distinct missed texts kept for stats
+MAX_CACHED = 10000  # distinct incident texts whose result is cached, sources repeat the same few texts
+
+_CATEGORY = None  # trie key of the category of a key ending at a node
+
+
+def normalize(text):
+    '''
+    Returns text lower cased with runs of punctuation and whitespace replaced by a single space.
+    '''
+    return ' '.join(get_tokens(text))
+
+
+def get_tokens(text):
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+class CategoryClassifier(object):
+    '''
+    Classifies incident text of one source, see module docstring. Counts hits per key/pattern and misses
+    per normalised text, so category maps can be grown from what sources actually send.
+    '''
+
+    def __init__(self, category_map, patterns=()):
+        self.category_map = category_map
+        self._trie = {}
+        self._regexes = []
+
+        for key, category in category_map.items():
+            self.add_key(key, category)
+
+        self.add_patterns(patterns)
+
+        self._cache = {}
+        self.hits = Counter()
+        self.missed = Counter()
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def add_key(self, key, category):
+        node = self._trie
+        tokens = get_tokens(key)
+
+        for token in tokens:
+            node = node.setdefault(token, {})
+
+        node[_CATEGORY] = (' '.join(tokens), category)
+
+    def add_patterns(self, patterns):
+        '''
+        Compiles (pattern, category) rules into combined regexes, earlier rules win. Every rule is a lookahead
+        anchored at the start of the text: a plain alternation would pick the rule matching leftmost in the text.
+        '''
+        patterns = list(patterns)
+
+        for start in range(0, len(patterns), PATTERNS_PER_REGEX):
+            chunk = patterns[start:start + PATTERNS_PER_REGEX]
+            groups = []
+            rules = {}
+
+            for index, (pattern, category) in enumerate(chunk, start):
+                group = '_{}'.format(index)
+                groups.append('(?=.*?(?P<{}>{}))'.format(group, pattern))
+                rules[group] = (pattern, category)
+
+            self._regexes.append((re.compile('|'.join(groups), re.UNICODE), rules))
+
+    def match(self, text):
+        '''
+        Returns (matched key or pattern, category), (None, None) if nothing matches.
+        '''
+        tokens = get_tokens(text)
+        node = self._trie
+        matched = node.get(_CATEGORY)
+
+        for token in tokens:
+            node = node.get(token)
+
+            if node is None:
+                break
+
+            matched = node.get(_CATEGORY, matched)
+
+        if matched is not None:
+            return matched
+
+        if self._regexes:
+            normalized = ' '.join(tokens)
+
+            for regex, rules in self._regexes:
+                match = regex.match(normalized)
+
+                if match is not None:
+                    return rules[match.lastgroup]
+
+        return None, None
+
+    def classify(self, text):
+        '''
+        Returns category of incident text, None if it is not mapped.
+        '''
+        if not text:
+            return None
+
+        result = self._cache.get(text)
+
+        if result is None:
+            rule, category = self.match(text)
+
+            # misses are counted by normalised text
+            result = (rule if category is not None else normalize(text)), category
+
+            if len(self._cache) < MAX_CACHED:
+                self._cache[text] = result
+
+        key, category = result
+
+        with self._lock:
+            if category is None:
+                self.misses += 1
+
+                if key in self.missed or len(self.missed) < MAX_MISSED:
+                    self.missed[key] += 1
+            else:
+                self.hits[key] += 1
+
+        return category
+
+    def get_stats(self):
+        '''
+        Returns hit count per key/pattern, total misses and the most missed texts.
+        '''
+        with self._lock:
+            return {
+                'hits': dict(self.hits),
+                'misses': self.misses,
+                'missed': self.missed.most_common(),
+            }
+
+    def reset_stats(self):
+        with self._lock:
+            self.hits.clear()
+            self.missed.clear()
+            self.misses = 0
+
+
+_classifiers = dict((name, CategoryClassifier(category_map, INCIDENT_CATEGORY_PATTERNS.get(name, ())))
+                    for name, category_map in INCIDENT_CATEGORY_MAP.items())
+_empty = CategoryClassifier({})
+
+
+def get_classifier(name):
+    '''
+    Returns compiled classifier of source name (classifies nothing for sources without a category map).
+    '''
+    return _classifiers.get(name, _empty)
+
+
+def get_classifier_stats():
+    '''
+    Returns source name -> classifier stats, see CategoryClassifier.get_stats.
+    '''
+    return dict((name, classifier.get_stats()) for name, classifier in _classifiers.items())
@@ -231,3 +231,11 @@ INCIDENT_CATEGORY_MAP = {
     'SUPowerOutages': SU_POWER_OUTAGES_INCIDENT_CATEGORY_MAP,
     'LUPowerOutages': LU_POWER_OUTAGES_INCIDENT_CATEGORY_MAP,
 }
+
+'''
+Regex rules per source, tried (in order) on the normalised incident text (lower case, single spaces) when no
+key of its category map matches, see category_classifier.py. Use (?:...) instead of capturing groups.
+'''
+INCIDENT_CATEGORY_PATTERNS = {
+    # 'ClarkCountyFDCad': [(r'^medical aid\b', CATEGORY_MEDICAL)],
+}
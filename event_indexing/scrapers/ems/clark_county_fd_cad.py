@@ -37,16 +37,16 @@ class ClarkCountyFDCad(IncidentDomScraper):
 
         return urljoin(host, provider['api_route'])
 
-    def get_incidents(self, content, **kwargs):
+    def get_raw_incidents(self, content, **kwargs):
         '''
-        Convert content to BeautifulSoup object (for DOM scraper). Find elements
-        and convert them into raw_incidents.
+        Convert content to BeautifulSoup object (for DOM scraper). Find elements,
+        each is converted into a raw_incident through get_incident.
         '''
         soup = self.get_soup(content)
         table = soup.find(id='grdData')
         rows = table.find_all('tr')[1:]
 
-        return [self.get_incident(row) for row in rows]
+        return rows
 
     def get_incident(self, row, **kwargs):
         '''
@@ -1,13 +1,27 @@
-import json
 import re
+from HTMLParser import HTMLParser
 from urlparse import urljoin
 
-from event_indexing.scrapers.base_dom_scraper import IncidentDomScraper
+from event_indexing.scrapers.base_dom_scraper import IncidentDomScraper, PARSER_HTML
+from event_indexing.util.json_utils import loads
+
+INCIDENTS_PATTERN = re.compile(r'new\sArray\((?P<incidents>.+)\)\;', re.IGNORECASE)
+DATE_TIME_PATTERN = re.compile(r'Received\:(?P<date_time>.+)Dispatched\:', re.IGNORECASE)
+# label and value cells of a WindowInfo row, e.g. <td align=right>Incident #:</td><td align=left>ECSO16CAD276495
+FIELD_PATTERN = re.compile(r'<td[^>]*>(?P<label>[^<:]+):</td>\s*<td[^>]*>(?P<value>[^<]*)', re.IGNORECASE)
+SPACES_PATTERN = re.compile(' +')
+
+INCIDENT_ID_FIELD = 'Incident #'
+DATE_TIME_FIELD = 'Received'
+DESCRIPTION_FIELD = 'Incident Type'
+
+_html_parser = HTMLParser()
 
 
 class EscambiaCountySOCad(IncidentDomScraper):
     name = 'EscambiaCountySOCad'
     tz_name = 'US/Central'
+    parser_backend = PARSER_HTML  # lxml nests the WindowInfo tables differently
 
     def get_url(self, **kwargs):
         provider = self.get_provider()
@@ -24,30 +38,31 @@ class EscambiaCountySOCad(IncidentDomScraper):
             'url': 'http://www.escambiaso.com/index.php/crime-prevention/dispatched-calls/'
         }
 
-    def get_incidents(self, content, **kwargs):
-        pattern = re.compile(r'new\sArray\((?P<incidents>.+)\)\;', re.IGNORECASE)
-        match = pattern.search(content)
+    def get_raw_incidents(self, content, **kwargs):
+        match = INCIDENTS_PATTERN.search(content)
         components = match.groupdict()
 
-        raw_incidents = json.loads(components['incidents'])
-
-        return [self.get_incident(raw_incident) for raw_incident in raw_incidents]
+        return loads(components['incidents'])
 
     def get_incident(self, raw_incident, **kwargs):
         latitude = raw_incident['Latitude']
         longitude = raw_incident['Longitude']
         window_info = raw_incident['WindowInfo']
 
-        soup = self.get_soup(window_info)
-        items = soup.find_all('tr')
+        fields = self.get_fields(window_info)
 
-        incident_id = items[0]
-        date_time = items[1]
-        incident = items[4]
+        if INCIDENT_ID_FIELD in fields and DATE_TIME_FIELD in fields and DESCRIPTION_FIELD in fields:
+            incident_id = fields[INCIDENT_ID_FIELD]
+            date_time = self.format_date_time(fields[DATE_TIME_FIELD])
+            incident = fields[DESCRIPTION_FIELD]
+        else:
+            # unexpected markup, go through the DOM
+            soup = self.get_soup(window_info)
+            items = soup.find_all('tr')
 
-        incident_id = self.get_incident_id(incident_id)
-        date_time = self.get_date_time(date_time)
-        incident = self.get_description(incident)
+            incident_id = self.get_incident_id(items[0])
+            date_time = self.get_date_time(items[1])
+            incident = self.get_description(items[4])
 
         created_at = self.get_created_at(date_time)
 
@@ -60,6 +75,18 @@ class EscambiaCountySOCad(IncidentDomScraper):
             'created_at': created_at,
         }
 
+    def get_fields(self, window_info):
+        '''
+        Returns WindowInfo values by label, read with FIELD_PATTERN instead of building a soup for every incident.
+        '''
+        fields = {}
+
+        for match in FIELD_PATTERN.finditer(window_info):
+            value = _html_parser.unescape(match.group('value')).strip()
+            fields[match.group('label').strip()] = SPACES_PATTERN.sub(' ', value)
+
+        return fields
+
     def get_incident_id(self, item):
         items = item.find_all('td')
 
@@ -67,11 +94,12 @@ class EscambiaCountySOCad(IncidentDomScraper):
 
     def get_date_time(self, item):
         date_time = self.get_text(item)
-        pattern = re.compile(r'Received\:(?P<date_time>.+)Dispatched\:', re.IGNORECASE)
-        match = pattern.search(date_time)
+        match = DATE_TIME_PATTERN.search(date_time)
         components = match.groupdict()
-        date_time = components['date_time']
 
+        return self.format_date_time(components['date_time'])
+
+    def format_date_time(self, date_time):
         splits = date_time.split(' ')
         meridiem = splits.pop()
         date_time = ' '.join(splits)
@@ -68,8 +68,8 @@ class Fayetteville911Cad(IncidentJsonScraper):
 
         return True
 
-    def get_incidents(self, content, **kwargs):
-        return [self.get_incident(incident) for incident in content if self.is_valid_incident(incident)]
+    def get_raw_incidents(self, content, **kwargs):
+        return content
 
     def get_incident(self, raw_incident, **kwargs):
         incident = self.get_description(raw_incident)
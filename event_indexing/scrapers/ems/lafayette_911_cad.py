@@ -1,7 +1,6 @@
 import re
 
-from bs4 import BeautifulSoup
-
+from event_indexing.scrapers.base_dom_scraper import get_soup, PARSER_LXML
 from event_indexing.scrapers.base_json_scraper import IncidentJsonScraper
 
 
@@ -9,6 +8,7 @@ class Lafayette911Cad(IncidentJsonScraper):
     name = 'Lafayette911Cad'
     tz_name = 'US/Central'
     method = 'POST'
+    parser_backend = PARSER_LXML
 
     def get_provider(self, **kwargs):
         return {
@@ -19,16 +19,16 @@ class Lafayette911Cad(IncidentJsonScraper):
             'url': 'http://apps.lafayettela.gov/L911/Service2.svc/getTrafficIncidents'
         }
 
-    def get_incidents(self, content, **kwargs):
+    def get_raw_incidents(self, content, **kwargs):
         incidents = content.get('d', [])
 
-        soup = BeautifulSoup(incidents, "html.parser")
+        soup = get_soup(incidents, self.parser_backend)
         rows = soup.find_all('tr')
 
         if rows:
             rows = rows[1:]
 
-        return [self.get_incident(row) for row in rows]
+        return rows
 
     def get_incident(self, row, **kwargs):
         items = row.find_all('td')
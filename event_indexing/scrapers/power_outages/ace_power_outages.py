@@ -1,7 +1,7 @@
 from urlparse import urljoin
 
 from event_indexing.scrapers.power_outages.base_ifsc_scraper import IFSCScraper, MINIMUM_CUSTOMERS_AFFECTED
-from event_indexing.scrapers.power_outages.ifsc_util import decode_line
+from event_indexing.scrapers.power_outages.ifsc_util import decode_first_point
 from event_indexing.util.time_utils import now_milliseconds, get_tz_now
 
 INVALID_INCIDENTS = {'Planned Maintenance', }
@@ -95,8 +95,7 @@ class ACEPowerOutages(IFSCScraper):
         if not coordinate:
             return None, None
 
-        coordinate = decode_line(coordinate)
-        coordinate = coordinate[0]
+        coordinate = decode_first_point(coordinate)
 
         latitude = coordinate[0]
         longitude = coordinate[1]
@@ -1,13 +1,12 @@
-import json
-
-from bs4 import BeautifulSoup
-
 from event_indexing.scrapers.base import IncidentScraper
+from event_indexing.scrapers.base_dom_scraper import get_soup, PARSER_LXML
+from event_indexing.util.json_utils import loads
 from event_indexing.util.time_utils import now_milliseconds
 
 
 class IFSCDirectory(IncidentScraper):
     use_proxy = False
+    parser_backend = PARSER_LXML
     url = None
     _directory = None
 
@@ -38,12 +37,12 @@ class IFSCDirectory(IncidentScraper):
     def scrape(self, content, **kwargs):
         # JSON response
         if self.is_json_response():
-            content = json.loads(content)
+            content = loads(content)
 
             return content['directory']
 
         # XML response
-        soup = BeautifulSoup(content, 'html.parser')
+        soup = get_soup(content, self.parser_backend)
         directory = soup.find('directory')
 
         return directory.get_text().strip()
@@ -1,16 +1,26 @@
+import logging
 import math
-import multiprocessing
-from multiprocessing.pool import Pool
+import os
+import sys
+import threading
+import time
+from Queue import Queue
+from itertools import islice
 from urlparse import urljoin
 
-import requests
-
+from event_indexing.metrics import STAGE_REQUEST, STAGE_INCIDENTS, STAGE_SCRAPE, STAGE_PARSE, COUNTER_ERRORS
 from event_indexing.scrapers.base_json_scraper import IncidentJsonScraper
 from event_indexing.scrapers.power_outages.base_ifsc_directory import IFSCDirectory
 from event_indexing.scrapers.power_outages.base_ifsc_service_area import IFSCServiceAreas
-from event_indexing.scrapers.power_outages.ifsc_util import decode_line, get_map_spatial_indexes
+from event_indexing.scrapers.power_outages.ifsc_plan import get_plan_cache, COVERAGE_POLYGON
+from event_indexing.scrapers.power_outages.ifsc_schedule import get_tile_history
+from event_indexing.scrapers.power_outages.ifsc_util import decode_first_point
+from event_indexing.scrapers.session import send_request, send_conditional_request, get_host_prefix
+from event_indexing.util.json_utils import loads_response
 from event_indexing.util.time_utils import get_tz_now
 
+logger = logging.getLogger(__name__)
+
 INVALID_INCIDENTS = {'Planned Maintenance', }
 VALID_INCIDENTS = {'Under Evaluation', 'Unknown'}
 MINIMUM_CUSTOMERS_AFFECTED = 10
@@ -19,44 +29,228 @@ TIME_OFFSET = 3  # 3 min polling
 
 ZOOM_LEVEL = 11
 
-PROCESSES = multiprocessing.cpu_count() * 3
+CONCURRENCY = 16  # tiles fetched at once
+WINDOW_PER_WORKER = 2  # tiles submitted to the pool and not yet consumed, per worker
+RATE_LIMIT = 20  # tile requests per second per host
+
+_lock = threading.Lock()
+_pools = {}
+_pools_pid = None
+_rate_limiters = {}
 
 '''
 See Christian for details
 '''
 
 
-def request(data):
+def request(data, pool_size=None, pending=None):
     url = data['url']
     headers = data['headers']
     params = data['params']
     meta = data['meta']
 
-    r = requests.get(url=url, headers=headers, params=params, verify=False)
+    # all workers share keep-alive connections to the tile host
+    if data.get('conditional'):
+        r = send_conditional_request('GET', url=url, headers=headers, params=params, verify=False,
+                                     pool_size=pool_size, pending=pending)
+
+        # tile did not change since last poll
+        if r is None:
+            return None, meta
+    else:
+        r = send_request('GET', url=url, headers=headers, params=params, verify=False, pool_size=pool_size)
+
     # source returns 403 or 404 for "successful" response
     if r.status_code != 404 and r.status_code != 403:
         r.raise_for_status()
     elif r.status_code == 404 or r.status_code == 403:
         return {}, meta
 
-    return r.json(), meta
+    return loads_response(r), meta
+
+
+class RateLimiter(object):
+    '''
+    Token bucket, acquire() blocks so callers go through at rate per second on average (bursts up to burst).
+    '''
+
+    def __init__(self, rate, burst=None):
+        self.rate = float(rate)
+        self.burst = burst or rate
+        self._tokens = float(self.burst)
+        self._updated_at = time.time()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.time()
+                self._tokens = min(self.burst, self._tokens + max(now - self._updated_at, 0) * self.rate)
+                self._updated_at = now
+
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+
+                wait = (1 - self._tokens) / self.rate
+
+            time.sleep(wait)
+
+
+def get_tile_pool(concurrency):
+    '''
+    Returns process wide thread pool with given number of workers. Tile fetching is network bound,
+    threads are reused across runs instead of forking worker processes every poll. The pool is never
+    terminated, it lives as long as the process and is shared by every IFSC source with the same concurrency,
+    each run keeps only a window of tiles in it (see imap_window).
+    '''
+    global _pools_pid
+
+    pid = os.getpid()
+
+    with _lock:
+        # threads don't survive fork
+        if _pools_pid != pid:
+            _pools.clear()
+            _pools_pid = pid
+
+        pool = _pools.get(concurrency)
+
+        if pool is None:
+            # multiprocessing is only loaded by sources fetching tiles
+            from multiprocessing.pool import ThreadPool
+
+            pool = ThreadPool(concurrency)
+            _pools[concurrency] = pool
+
+    return pool
+
+
+def imap_window(pool, func, items, window):
+    '''
+    Like pool.imap_unordered, but at most window items are submitted and not yet consumed: imap_unordered
+    hands every item to the pool at once, and results of a slow consumer pile up without limit.
+    The next item is only submitted once the consumer asks for the next result.
+    '''
+    results = Queue()
+    items = iter(items)
+    pending = 0
+
+    def call(item):
+        try:
+            return True, func(item)
+        except Exception:
+            return False, sys.exc_info()
+
+    def submit(count):
+        submitted = 0
+
+        for item in islice(items, count):
+            pool.apply_async(call, (item,), callback=results.put)
+            submitted += 1
+
+        return submitted
+
+    pending += submit(window)
+
+    while pending:
+        ok, value = results.get()
+        pending -= 1
+
+        if not ok:
+            raise value[0], value[1], value[2]
+
+        yield value
+
+        pending += submit(1)
+
+
+def get_rate_limiter(url, rate):
+    '''
+    Returns rate limiter shared by all scrapers requesting tiles from url's host.
+    '''
+    host = get_host_prefix(url)
+
+    with _lock:
+        limiter = _rate_limiters.get(host)
+
+        if limiter is None:
+            limiter = RateLimiter(rate)
+            _rate_limiters[host] = limiter
+
+    return limiter
 
 
 class IFSCScraper(IncidentJsonScraper):
+    conditional = True
+    snapshot = False  # only a part of the segments (and changed tiles) is fetched per run
+    streaming = True  # publish alerts while later tiles are still downloading
+    concurrency = CONCURRENCY
+    rate_limit = RATE_LIMIT
+    coverage = COVERAGE_POLYGON
+    adaptive = False  # poll tiles by outage history (see ifsc_schedule.py) instead of a third of the segments
+    request_budget = None  # tiles per adaptive run, defaults to what segment rotation would poll
     _indexes = None
     _directory = None
+    _tile_providers = None
 
     def run(self):
-        incidents = []
-        p = Pool(PROCESSES)
-
         try:
-            for raw_incidents, meta in p.imap_unordered(request, self.indexes):
-                for raw_incident in self.scrape(raw_incidents):
-                    incidents.append(self.parse(raw_incident, meta=meta))
-            self.publish(incidents)
-        except:
-            print 'Parser {}: Failed to index source'.format(self.name)
+            self.publish_alerts(self.iter_alerts())
+            # batches are written in background, state is only recorded once they are out
+            self.wait_published()
+            self.commit()
+        except Exception:
+            self.metrics.incr(COUNTER_ERRORS)
+            logger.exception('Parser %s: Failed to index source', self.name)
+        finally:
+            self.write_metrics()
+
+    def iter_alerts(self):
+        '''
+        Yields parsed alerts as tiles come back from the workers, tiles are not kept around once parsed.
+        '''
+        metrics = self.metrics
+        pool = get_tile_pool(self.concurrency)
+
+        # workers add validators of changed tiles, created here so they all share one
+        self.pending_validators
+
+        with metrics.stage(STAGE_REQUEST):
+            indexes = self.indexes
+
+        # waiting on workers counts as request, workers record get_incidents themselves
+        window = self.concurrency * WINDOW_PER_WORKER
+        tiles = metrics.iterate(STAGE_REQUEST, imap_window(pool, self.fetch_tile, indexes, window))
+
+        for raw_incidents, meta in tiles:
+            if raw_incidents is None:
+                continue
+
+            for raw_incident in metrics.iterate(STAGE_SCRAPE, self.get_recent_incidents(raw_incidents)):
+                with metrics.stage(STAGE_PARSE):
+                    alert = self.parse(raw_incident, meta=meta)
+
+                yield alert
+
+    def fetch_tile(self, data):
+        '''
+        Runs in a worker, requests a tile and returns its valid raw_incidents (None if tile did not change).
+        '''
+        get_rate_limiter(data['url'], self.rate_limit).acquire()
+
+        content, meta = request(data, pool_size=self.concurrency, pending=self.pending_validators)
+
+        if self.adaptive:
+            # None: not modified, {}: empty tile (403/404)
+            outages = None if content is None else bool(self.get_raw_incidents(content))
+            get_tile_history(self.name).record(meta['index'], outages, bool(content))
+
+        if content is None:
+            return None, meta
+
+        with self.metrics.stage(STAGE_INCIDENTS):
+            return self.get_incidents(content), meta
 
     def get_url(self, **kwargs):
         directory = kwargs['directory']
@@ -74,12 +268,28 @@ class IFSCScraper(IncidentJsonScraper):
         directory = meta['directory']
 
         alert = super(IFSCScraper, self).parse(raw_incident, **kwargs)
-        provider = self.get_provider(directory=directory, index=index)
+        provider = self.get_tile_provider(directory, index)
 
         alert['source']['provider'] = provider
 
         return alert
 
+    def get_tile_provider(self, directory, index):
+        '''
+        Returns provider shared by all alerts of a tile.
+        '''
+        if self._tile_providers is None:
+            self._tile_providers = {}
+
+        key = (directory, index)
+        provider = self._tile_providers.get(key)
+
+        if provider is None:
+            provider = self.get_provider(directory=directory, index=index)
+            self._tile_providers[key] = provider
+
+        return provider
+
     def is_valid_incident(self, raw_incident):
         description = raw_incident['desc']
         cluster = description['cluster']
@@ -96,10 +306,8 @@ class IFSCScraper(IncidentJsonScraper):
 
         return affected >= MINIMUM_CUSTOMERS_AFFECTED
 
-    def get_incidents(self, content, **kwargs):
-        incidents = content.get('file_data', [])
-
-        return [self.get_incident(incident) for incident in incidents if self.is_valid_incident(incident)]
+    def get_raw_incidents(self, content, **kwargs):
+        return content.get('file_data', [])
 
     def get_incident(self, raw_incident, **kwargs):
         description = raw_incident['desc']
@@ -136,8 +344,7 @@ class IFSCScraper(IncidentJsonScraper):
         geometry = raw_incident['geom']
         coordinate = geometry['p'][0]
 
-        coordinate = decode_line(coordinate)
-        coordinate = coordinate[0]
+        coordinate = decode_first_point(coordinate)
 
         latitude = coordinate[0]
         longitude = coordinate[1]
@@ -168,34 +375,49 @@ class IFSCScraper(IncidentJsonScraper):
             scraper = IFSCServiceAreas(None, None, self.proxy_host, url, bounds)
             self._indexes = []
 
-            segments = scraper.segments
+            # quadkeys per segment, recomputed only when service areas change
+            segments = get_plan_cache(self.name, ZOOM_LEVEL).get_segments(scraper, self.coverage)
             size = len(segments)
 
-            now = get_tz_now()
-            limit = int(math.ceil(size / float(TIME_OFFSET)))
-            index = (now.minute % TIME_OFFSET) * limit
+            if self.adaptive:
+                quadkeys = []
+                for indexes in segments:
+                    quadkeys.extend(indexes)
+
+                budget = self.request_budget
+                if budget is None:
+                    # same number of requests as polling a third of the segments
+                    budget = int(math.ceil(len(quadkeys) / float(TIME_OFFSET)))
+
+                indexes = get_tile_history(self.name).get_due(quadkeys, budget)
+            else:
+                now = get_tz_now()
+                limit = int(math.ceil(size / float(TIME_OFFSET)))
+                index = (now.minute % TIME_OFFSET) * limit
+
+                # limiting the calls by doing 3 segments per scrape
+                indexes = []
+                for segment_indexes in segments[index:(index + limit)]:
+                    indexes.extend(segment_indexes)
 
             # directory
             directory = self.directory
 
-            # limiting the calls by doing 3 segments per scrape
-            for segment in segments[index:(index + limit)]:
-                indexes = get_map_spatial_indexes(segment, ZOOM_LEVEL)
-
-                for index in indexes:
-                    url = self.get_url(directory=directory, index=index)
-                    headers = self.get_headers()
-                    params = self.get_params()
-
-                    self._indexes.append({
-                        'url': url,
-                        'headers': headers,
-                        'params': params,
-                        'meta': {
-                            'index': index,
-                            'directory': directory
-                        }
-                    })
+            for index in indexes:
+                url = self.get_url(directory=directory, index=index)
+                headers = self.get_headers()
+                params = self.get_params()
+
+                self._indexes.append({
+                    'url': url,
+                    'headers': headers,
+                    'params': params,
+                    'conditional': self.conditional,
+                    'meta': {
+                        'index': index,
+                        'directory': directory
+                    }
+                })
 
         return self._indexes
 
@@ -1,5 +1,5 @@
 from event_indexing.scrapers.base_json_scraper import IncidentJsonScraper
-from event_indexing.scrapers.power_outages.ifsc_util import decode_line, merge_service_areas, get_service_area_segments, \
+from event_indexing.scrapers.power_outages.ifsc_util import decode_lines, merge_service_areas, get_service_area_segments, \
     get_bounds_segments
 from event_indexing.util.time_utils import now_milliseconds
 
@@ -32,28 +32,48 @@ class IFSCServiceAreas(IncidentJsonScraper):
         return self.url
 
     def scrape(self, content, **kwargs):
+        lines = []
         for service_area in content.get('file_data', []):
             geometry = service_area['geom']
-            lines = geometry['l']
+            lines.append(geometry['l'][0])
 
-            yield decode_line(lines[0])
+        # all service areas decoded at once
+        for coordinates in decode_lines(lines):
+            yield coordinates
 
     @property
     def segments(self):
-        '''
-         Get all service areas, merge them, extract total area bounds, split bounds into a 3x3 grid
-        '''
         if self._segments is None:
+            content = None
+
             if self.bounds is None:
                 content = self.request()
 
-                service_areas = []
-                for service_area in self.scrape(content):
-                    service_areas.append(service_area)
-
-                merged_service_areas = merge_service_areas(service_areas)
-                self._segments = get_service_area_segments(merged_service_areas, LATITUDE_SEGMENTS, LONGITUDE_SEGMENTS)
-            else:
-                self._segments = get_bounds_segments(self.bounds, LATITUDE_SEGMENTS, LONGITUDE_SEGMENTS)
+            self._segments = self.get_segments(content)
 
         return self._segments
+
+    def get_segments(self, content, service_area=None):
+        '''
+         Get all service areas, merge them, extract total area bounds, split bounds into a 3x3 grid
+        '''
+        if self.bounds is not None:
+            return get_bounds_segments(self.bounds, LATITUDE_SEGMENTS, LONGITUDE_SEGMENTS)
+
+        if service_area is None:
+            service_area = self.get_service_area(content)
+
+        return get_service_area_segments(service_area, LATITUDE_SEGMENTS, LONGITUDE_SEGMENTS)
+
+    def get_service_area(self, content):
+        '''
+        Returns merged service areas, None when only bounds are known.
+        '''
+        if self.bounds is not None:
+            return None
+
+        service_areas = []
+        for service_area in self.scrape(content):
+            service_areas.append(service_area)
+
+        return merge_service_areas(service_areas)
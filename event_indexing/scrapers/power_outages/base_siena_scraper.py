@@ -0,0 +1,83 @@
+from datetime import timedelta
+from io import BytesIO
+from urlparse import urljoin
+
+from lxml import etree
+
+from event_indexing.scrapers.base_dom_scraper import IncidentDomScraper
+from event_indexing.util.time_utils import get_tz_now
+
+MINIMUM_CUSTOMERS_AFFECTED = 10
+
+
+def iter_outages(content, minimum_affected=0):
+    '''
+    Streams Siena outages.xml, yields attributes of <outage> elements with at least minimum_affected customers.
+    Elements are dropped as soon as they are read, the document tree is never built.
+    '''
+    if isinstance(content, unicode):
+        content = content.encode('utf-8')
+        encoding = 'utf-8'
+    else:
+        encoding = None
+
+    for _, element in etree.iterparse(BytesIO(content), tag='outage', encoding=encoding):
+        if int(element.get('affected', 0)) >= minimum_affected:
+            yield dict(element.attrib)
+
+        element.clear()
+
+        while element.getprevious() is not None:
+            del element.getparent()[0]
+
+
+class IncidentSienaScraper(IncidentDomScraper):
+    '''
+    Base for utilities on Siena outage maps (*.maps.sienatech.com), set name, tz_name and get_provider.
+    '''
+    time_formats = ('%Y-%m-%d %H:%M:%S',)
+    conditional = True
+    fingerprint_ignore = ('detected_at', 'created_at')  # now - duration, moves every poll
+    now = None
+
+    def get_url(self, **kwargs):
+        provider = self.get_provider()
+        host = 'http://{}'.format(provider['api_host'])
+
+        return urljoin(host, provider['api_route'])
+
+    def get_raw_incidents(self, content, **kwargs):
+        # outage durations are relative to the document, not to the row
+        self.now = get_tz_now(self.get_tz_info())
+
+        return iter_outages(content, MINIMUM_CUSTOMERS_AFFECTED)
+
+    def is_valid_incident(self, raw_incident):
+        affected = int(raw_incident['affected'])
+
+        return affected >= MINIMUM_CUSTOMERS_AFFECTED
+
+    def get_incident(self, raw_incident, **kwargs):
+        incident = 'Power Outage'
+        incident_id = raw_incident['id']
+        latitude = float(raw_incident['lat'])
+        longitude = float(raw_incident['lng'])
+        date_time = self.get_date_time(raw_incident)
+        created_at = self.get_created_at(date_time)
+
+        return {
+            'incident': incident,
+            'id': incident_id,
+            'latitude': latitude,
+            'longitude': longitude,
+            'created_at': created_at
+        }
+
+    def get_date_time(self, raw_incident):
+        duration = int(raw_incident['duration'])
+        now = self.now or get_tz_now(self.get_tz_info())
+
+        date_time = now - timedelta(seconds=duration)
+        date_time = date_time.strftime('%Y-%m-%d %H:%M:%S')
+
+        return date_time
@@ -6,6 +6,8 @@ from event_indexing.util.time_utils import now_milliseconds
 MINIMUM_CUSTOMERS_AFFECTED = 10
 
 class WOVScraper(IncidentJsonScraper):
+    json_path = 'Outages'
+
     def get_params(self, **kwargs):
         now = now_milliseconds()
 
@@ -24,11 +26,6 @@ class WOVScraper(IncidentJsonScraper):
 
         return urljoin(host, provider['api_route'])
 
-    def get_incidents(self, content, **kwargs):
-        raw_incidents = content['Outages']
-
-        return [self.get_incident(raw_incident) for raw_incident in raw_incidents if self.is_valid_incident(raw_incident)]
-
     def is_valid_incident(self, raw_incident):
         affected = raw_incident['CustomersOutNow']
 
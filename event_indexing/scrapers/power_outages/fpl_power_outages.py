@@ -8,6 +8,8 @@ MINIMUM_CUSTOMERS_AFFECTED = 10
 class FPLPowerOutages(IncidentJsonScraper):
     name = 'FPLPowerOutages'
     tz_name = 'US/Eastern'
+    conditional = True
+    json_path = 'outages'
 
     def get_provider(self, **kwargs):
         return {
@@ -24,11 +26,6 @@ class FPLPowerOutages(IncidentJsonScraper):
 
         return urljoin(host, provider['api_route'])
 
-    def get_incidents(self, content, **kwargs):
-        outages = content.get('outages', [])
-
-        return [self.get_incident(raw_incident) for raw_incident in outages if self.is_valid_incident(raw_incident)]
-
     def is_valid_incident(self, raw_incident):
         affected = int(raw_incident['customersAffected'])
 
@@ -0,0 +1,160 @@
+import errno
+import hashlib
+import os
+import threading
+
+from event_indexing.scrapers.power_outages.ifsc_util import get_map_spatial_indexes, get_service_area_spatial_indexes
+from event_indexing.scrapers.state import STATE_DIR
+from event_indexing.util.json_utils import dumps, load, dump
+
+PLAN_VERSION = 2  # bump when the way quadkeys are computed changes, older plans are recomputed
+
+COVERAGE_BOUNDS = 'bounds'  # every tile of a segment's bounding box
+COVERAGE_POLYGON = 'polygon'  # tiles that intersect the merged service areas, once (bounds when only bounds are known)
+
+_lock = threading.Lock()
+_plans = {}
+
+'''
+An IFSC plan is the list of tile quadkeys to poll for every service area segment of a utility at a zoom level.
+Computing it means fetching the service areas, merging the polygons and sweeping every segment, while the
+service areas hardly ever change. Plans are kept in memory and under STATE_DIR (when set) and only recomputed
+when the service area file (or configured bounds) change.
+'''
+
+
+def get_digest(content):
+    return hashlib.md5(dumps(content, sort_keys=True)).hexdigest()
+
+
+class IFSCPlanCache(object):
+    '''
+    Plan of one utility at one zoom level. Not meant to be shared by concurrent runs of the same source.
+    '''
+
+    def __init__(self, name, zoom, path=None):
+        self.name = name
+        self.zoom = zoom
+        self.path = path
+        self._plan = None
+
+    def load(self):
+        if self.path is None:
+            return None
+
+        try:
+            with open(self.path) as f:
+                plan = load(f)
+        except IOError as e:
+            if e.errno != errno.ENOENT:
+                raise
+            return None
+        except ValueError:
+            # Corrupt plan file, recompute
+            return None
+
+        if plan.get('version') != PLAN_VERSION or plan.get('zoom') != self.zoom:
+            return None
+
+        return plan
+
+    def save(self, plan):
+        if self.path is None:
+            return
+
+        tmp_path = '{}.tmp'.format(self.path)
+
+        with open(tmp_path, 'w') as f:
+            dump(plan, f)
+
+        os.rename(tmp_path, self.path)
+
+    def get_segments(self, service_areas, coverage=COVERAGE_POLYGON):
+        '''
+        Returns list of quadkey lists, one per segment of service_areas (IFSCServiceAreas).
+        '''
+        content = None
+
+        if service_areas.bounds is None:
+            # with a plan on hand an unchanged service area file is not downloaded again
+            service_areas.conditional = self._plan is not None
+            content = service_areas.request()
+
+            if content is None:
+                return self._plan['segments']
+
+            digest = get_digest(content)
+        else:
+            digest = get_digest(service_areas.bounds)
+
+        plan = self._plan or self.load()
+
+        if plan is None or plan['digest'] != digest or plan['coverage'] != coverage:
+            plan = {
+                'version': PLAN_VERSION,
+                'zoom': self.zoom,
+                'coverage': coverage,
+                'digest': digest,
+                'segments': self.get_indexes(service_areas, content, coverage),
+            }
+
+            self.save(plan)
+
+        # service area file is only skipped next time once its plan is saved
+        service_areas.commit()
+
+        self._plan = plan
+
+        return plan['segments']
+
+    def get_indexes(self, service_areas, content, coverage):
+        service_area = None
+
+        if coverage == COVERAGE_POLYGON:
+            service_area = service_areas.get_service_area(content)
+
+        segments = service_areas.get_segments(content, service_area)
+
+        if service_area is None:
+            return [sorted(get_map_spatial_indexes(segment, self.zoom)) for segment in segments]
+
+        # tiles on segment edges are only polled with the first segment
+        seen = set()
+        result = []
+
+        for segment in segments:
+            indexes = get_service_area_spatial_indexes(service_area, segment, self.zoom) - seen
+            seen.update(indexes)
+            result.append(sorted(indexes))
+
+        return result
+
+
+def get_plan_cache(name, zoom):
+    '''
+    Returns process wide plan cache for a utility.
+    '''
+    key = (name, zoom)
+    cache = _plans.get(key)
+
+    if cache is None:
+        with _lock:
+            cache = _plans.get(key)
+
+            if cache is None:
+                path = None
+                if STATE_DIR:
+                    path = os.path.join(STATE_DIR, '{}.plan.{}.json'.format(name, zoom))
+
+                cache = IFSCPlanCache(name, zoom, path)
+                _plans[key] = cache
+
+    return cache
+
+
+def clear_plan_caches():
+    '''
+    Forgets in memory plans of all utilities (files under STATE_DIR are kept).
+    '''
+    with _lock:
+        _plans.clear()
@@ -0,0 +1,97 @@
+import threading
+
+MAX_INTERVAL = 16  # cycles a cold tile may go without a poll
+
+_lock = threading.Lock()
+_histories = {}
+
+'''
+Adaptive tile polling. Tiles that returned outages (hot) are polled every cycle, tiles that came back
+empty or unchanged (cold) are polled every 2, 4, 8... cycles up to MAX_INTERVAL. A changed payload
+resets the back off. Every cycle polls at most request budget tiles, hot and most overdue first.
+'''
+
+
+class TileHistory(object):
+    '''
+    Poll history of one utility's tiles, keyed by quadkey. Safe to record from tile fetching workers.
+    '''
+
+    def __init__(self, max_interval=MAX_INTERVAL):
+        self.max_interval = max_interval
+        self.cycle = 0
+        self._tiles = {}
+        self._lock = threading.Lock()
+
+    def get_due(self, quadkeys, budget=None):
+        '''
+        Starts a cycle, returns quadkeys to poll in it.
+        '''
+        with self._lock:
+            self.cycle += 1
+
+            due = []
+
+            for quadkey in quadkeys:
+                tile = self._tiles.get(quadkey)
+
+                # never polled
+                if tile is None:
+                    due.append((1, 0, quadkey))
+                elif tile['next_cycle'] <= self.cycle:
+                    due.append((0 if tile['outages'] else 1, tile['next_cycle'], quadkey))
+
+        due.sort()
+
+        if budget is not None:
+            due = due[:budget]
+
+        return [quadkey for _, _, quadkey in due]
+
+    def record(self, quadkey, outages, changed):
+        '''
+        outages: tile returned outages, None if unknown (not modified since last poll)
+        changed: tile payload changed since last poll
+        '''
+        with self._lock:
+            tile = self._tiles.get(quadkey)
+
+            if tile is None:
+                tile = {
+                    'outages': False,
+                    'misses': 0,
+                    'next_cycle': 0,
+                }
+                self._tiles[quadkey] = tile
+
+            if outages is not None:
+                tile['outages'] = outages
+
+            if tile['outages'] or changed:
+                tile['misses'] = 0
+            else:
+                tile['misses'] += 1
+
+            tile['next_cycle'] = self.cycle + min(2 ** tile['misses'], self.max_interval)
+
+
+def get_tile_history(name):
+    '''
+    Returns process wide tile history for a utility.
+    '''
+    history = _histories.get(name)
+
+    if history is None:
+        with _lock:
+            history = _histories.get(name)
+
+            if history is None:
+                history = TileHistory()
+                _histories[name] = history
+
+    return history
+
+
+def clear_tile_histories():
+    with _lock:
+        _histories.clear()
@@ -1,7 +1,7 @@
-from math import ceil, sin, pi, log, floor
+from math import ceil, sin, pi, log, floor, atan, sinh, degrees
 
-from shapely.geometry import Polygon
-from shapely.ops import cascaded_union
+# numpy and shapely are imported where used: parsing tiles (decode_first_point) needs neither,
+# they are only loaded when service areas are decoded or the tile plan is computed
 
 
 def decode_line(line):
@@ -58,6 +58,80 @@ def decode_line(line):
     return coordinates
 
 
+def decode_lines(lines):
+    '''
+    Decodes many encoded lines at once, same result as decode_line for each of them but as (n, 2) numpy arrays
+    of latitude, longitude. Chunks of every value are found and combined with array operations on all lines together.
+    '''
+    import numpy
+
+    sizes = numpy.array([len(line) for line in lines], dtype=numpy.int64)
+    chars = numpy.frombuffer(''.join(lines).encode('ascii'), dtype=numpy.uint8).astype(numpy.int64) - 63
+
+    if not len(chars):
+        return [numpy.zeros((0, 2)) for _ in lines]
+
+    # last chunk of a value has no continuation bit, a line always ends a value
+    ends = chars < 32
+    ends[numpy.cumsum(sizes)[sizes > 0] - 1] = True
+
+    end_indexes = numpy.flatnonzero(ends)
+    value_indexes = numpy.cumsum(ends) - ends
+    starts = numpy.concatenate(([0], end_indexes[:-1] + 1))
+    positions = numpy.arange(len(chars)) - starts[value_indexes]
+
+    # chunks of a value don't overlap, summing them is the same as or-ing them (exact in float64 below 2 ** 53)
+    chunks = (chars & 31) << (5 * positions)
+    values = numpy.bincount(value_indexes, weights=chunks, minlength=len(end_indexes)).astype(numpy.int64)
+
+    shifts = numpy.where(values & 1, ~(values >> 1), values >> 1)
+
+    # values alternate latitude, longitude, coordinates are running sums within a line
+    coordinates = shifts.reshape(-1, 2)
+    line_indexes = numpy.searchsorted(numpy.cumsum(sizes), end_indexes[1::2], side='right')
+    counts = numpy.bincount(line_indexes, minlength=len(lines))
+
+    totals = numpy.cumsum(coordinates, axis=0)
+    line_starts = numpy.cumsum(counts) - counts
+    offsets = numpy.zeros((len(lines), 2), dtype=numpy.int64)
+    offsets[counts > 0] = (totals - coordinates)[line_starts[counts > 0]]
+
+    coordinates = (totals - numpy.repeat(offsets, counts, axis=0)) / 1e5
+
+    return numpy.split(coordinates, numpy.cumsum(counts)[:-1])
+
+
+def decode_first_point(line):
+    '''
+    Returns first coordinate of an encoded line, rest of the line is not decoded.
+    '''
+    coordinate = []
+    size = len(line)
+    index = 0
+
+    while len(coordinate) < 2:
+        i = 0
+        j = 0
+
+        while True:
+            char_index = ord(line[index]) - 63
+            j |= (31 & char_index) << i
+            i += 5
+            index += 1
+
+            if char_index < 32 or index >= size:
+                break
+
+        if 1 & j:
+            shift = ~(j >> 1)
+        else:
+            shift = j >> 1
+
+        coordinate.append(shift / 1e5)
+
+    return coordinate
+
+
 def get_map_spatial_indexes(bounds, zoom):
     indexes = set()
     tile_size = 256
@@ -105,6 +179,57 @@ def get_map_spatial_indexes(bounds, zoom):
     return indexes
 
 
+def get_service_area_spatial_indexes(service_area, bounds, zoom):
+    '''
+    Returns keys of tiles within bounds that intersect service_area (merge_service_areas geometry),
+    at the same corrected zoom as get_map_spatial_indexes. Tiles over water or neighbouring territory are left out.
+    '''
+    from shapely.prepared import prep
+
+    indexes = set()
+    tile_size = 256
+    corrected_zoom = zoom - 1
+
+    bound_coordinates = get_bound_coordinates(bounds)
+
+    # y grows southwards
+    min_x, min_y = get_spatial_index_tile(bound_coordinates[2], bound_coordinates[1], corrected_zoom, tile_size)
+    max_x, max_y = get_spatial_index_tile(bound_coordinates[0], bound_coordinates[3], corrected_zoom, tile_size)
+
+    prepared_service_area = prep(service_area)
+
+    for x in range(min_x, max_x + 1):
+        for y in range(min_y, max_y + 1):
+            if prepared_service_area.intersects(get_tile_polygon(x, y, corrected_zoom)):
+                indexes.add(get_index_key(x, y, corrected_zoom))
+
+    return indexes
+
+
+def get_tile_polygon(x, y, zoom):
+    '''
+    Returns tile area as a (longitude, latitude) polygon, same axis order as merge_service_areas.
+    '''
+    from shapely.geometry import box
+
+    west, north = convert_tile_to_coordinates(x, y, zoom)
+    east, south = convert_tile_to_coordinates(x + 1, y + 1, zoom)
+
+    return box(west, south, east, north)
+
+
+def convert_tile_to_coordinates(x, y, zoom):
+    '''
+    Returns longitude, latitude of tile's north west corner.
+    '''
+    size = float(1 << zoom)
+
+    longitude = x / size * 360 - 180
+    latitude = degrees(atan(sinh(pi * (1 - 2 * y / size))))
+
+    return longitude, latitude
+
+
 def get_corrected_bounds(bounds, zoom_multiplier):
     if zoom_multiplier == 1:
         return bounds
@@ -206,9 +331,14 @@ def clamp(value, min_value, max_value):
 
 
 def merge_service_areas(service_areas):
+    import numpy
+    from shapely.geometry import Polygon
+    from shapely.ops import cascaded_union
+
     polygons = []
     for service_area in service_areas:
-        coordinates = [(coordinate[1], coordinate[0]) for coordinate in service_area]
+        # latitude, longitude to x, y
+        coordinates = numpy.asarray(service_area)[:, ::-1]
         polygon = Polygon(coordinates)
         polygons.append(polygon)
 
@@ -10,6 +10,7 @@ class LUPowerOutages(IncidentJsonScraper):
     name = 'LUPowerOutages'
     tz_name = 'US/Eastern'
     method = 'GET'
+    json_path = 'markers'
 
     def get_provider(self, **kwargs):
         return {
@@ -46,11 +47,6 @@ class LUPowerOutages(IncidentJsonScraper):
 
         return affected >= MINIMUM_CUSTOMERS_AFFECTED
 
-    def get_incidents(self, content, **kwargs):
-        incidents = content.get('markers', [])
-
-        return [self.get_incident(incident) for incident in incidents if self.is_valid_incident(incident)]
-
     def get_incident(self, raw_incident, **kwargs):
         incident = 'Power Outage'
         start_date = raw_incident['start_date']
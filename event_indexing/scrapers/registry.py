@@ -0,0 +1,70 @@
+import threading
+from importlib import import_module
+
+'''
+Source name (as in INCIDENT_CATEGORY_MAP) -> scraper class path. A scraper module is imported the first time
+its class is asked for, so a worker polling one JSON feed doesn't load bs4, lxml or multiprocessing for sources
+it never runs. Add every new source here, registry_tests checks it against discover_scrapers.
+'''
+
+SCRAPERS = {
+    'ACEPowerOutages': 'event_indexing.scrapers.power_outages.ace_power_outages.ACEPowerOutages',
+    'APPowerOutages': 'event_indexing.scrapers.power_outages.ap_power_outages.APPowerOutages',
+    'AUPowerOutages': 'event_indexing.scrapers.power_outages.au_power_outages.AUPowerOutages',
+    'ClarkCountyFDCad': 'event_indexing.scrapers.ems.clark_county_fd_cad.ClarkCountyFDCad',
+    'EscambiaCountySOCad': 'event_indexing.scrapers.ems.escambia_county_so_cad.EscambiaCountySOCad',
+    'FPLPowerOutages': 'event_indexing.scrapers.power_outages.fpl_power_outages.FPLPowerOutages',
+    'Fayetteville911Cad': 'event_indexing.scrapers.ems.fayetteville_911_cad.Fayetteville911Cad',
+    'IREAPowerOutages': 'event_indexing.scrapers.power_outages.irea_power_outages.IREAPowerOutages',
+    'LUPowerOutages': 'event_indexing.scrapers.power_outages.lu_power_outages.LUPowerOutages',
+    'Lafayette911Cad': 'event_indexing.scrapers.ems.lafayette_911_cad.Lafayette911Cad',
+}
+
+_lock = threading.Lock()
+_classes = {}
+
+
+def get_scraper_names():
+    '''
+    Returns names of all registered sources, sorted. Imports nothing.
+    '''
+    return sorted(SCRAPERS)
+
+
+def get_scraper_class(name):
+    '''
+    Returns scraper class of source name, importing its module on first use. Raises KeyError for unknown
+    sources, ImportError if the module (or a dependency of it) can't be imported.
+    '''
+    cls = _classes.get(name)
+
+    if cls is None:
+        path = SCRAPERS[name]
+
+        with _lock:
+            cls = _classes.get(name)
+
+            if cls is None:
+                module_name, class_name = path.rsplit('.', 1)
+                cls = getattr(import_module(module_name), class_name)
+                _classes[name] = cls
+
+    return cls
+
+
+def get_scraper_classes(names=None):
+    '''
+    Returns scraper classes of names (all registered sources if not set), in the same order.
+    '''
+    if names is None:
+        names = get_scraper_names()
+
+    return [get_scraper_class(name) for name in names]
+
+
+def clear_scraper_classes():
+    '''
+    Forgets imported classes (modules stay in sys.modules). For tests.
+    '''
+    with _lock:
+        _classes.clear()
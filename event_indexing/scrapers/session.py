@@ -0,0 +1,207 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from urllib import urlencode
+from urlparse import urlparse, parse_qsl
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.packages.urllib3.exceptions import InsecureRequestWarning
+
+requests.packages.urllib3.disable_warnings(InsecureRequestWarning)
+
+POOL_CONNECTIONS = 50  # hosts to keep a connection pool for
+POOL_MAXSIZE = 4  # keep-alive connections per host, override per host with pool_size
+TIMEOUT = (5, 30)  # connect, read seconds
+CACHE_BUSTER_PARAMS = ('_', 't', 'timestamp')  # now_milliseconds() params, ignored when matching validators
+# resources validators are kept for, least recently used are dropped first. IFSC tile URLs carry the
+# interval directory, so every interval brings new ones
+MAX_VALIDATORS = 20000
+
+_lock = threading.RLock()
+_session = None
+_session_pid = None
+_hosts = {}
+_validators = OrderedDict()
+
+'''
+One requests.Session is shared by every scraper in the process so polls reuse TCP/TLS connections
+instead of paying a new handshake every time. Sources that fan out to one host (IFSC tiles) ask
+for a bigger pool for that host through pool_size.
+'''
+
+
+def get_session():
+    '''
+    Returns the process wide session. A forked child gets its own session, sockets are never shared across processes.
+    '''
+    global _session, _session_pid
+
+    pid = os.getpid()
+
+    if _session is None or _session_pid != pid:
+        with _lock:
+            if _session is None or _session_pid != pid:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE)
+                session.mount('http://', adapter)
+                session.mount('https://', adapter)
+
+                _hosts.clear()
+                _session = session
+                _session_pid = pid
+
+    return _session
+
+
+def get_host_prefix(url):
+    '''
+    Returns scheme://host[:port] prefix used to mount per host adapters.
+    '''
+    parsed = urlparse(url)
+
+    return '{}://{}'.format(parsed.scheme, parsed.netloc)
+
+
+def configure_host(url, pool_size):
+    '''
+    Mounts an adapter keeping pool_size connections alive for url's host. Only grows, never shrinks a pool.
+    '''
+    session = get_session()
+    prefix = get_host_prefix(url)
+
+    if _hosts.get(prefix, 0) >= pool_size:
+        return
+
+    with _lock:
+        if _hosts.get(prefix, 0) < pool_size:
+            session.mount(prefix, HTTPAdapter(pool_connections=1, pool_maxsize=pool_size))
+            _hosts[prefix] = pool_size
+
+
+def send_request(method, url, timeout=None, pool_size=None, **kwargs):
+    '''
+    Sends request through shared session, same arguments as requests.request.
+    '''
+    session = get_session()
+
+    if pool_size:
+        configure_host(url, pool_size)
+
+    if timeout is None:
+        timeout = TIMEOUT
+
+    return session.request(method, url, timeout=timeout, **kwargs)
+
+
+def get_validator_key(url, params=None, ignore_params=CACHE_BUSTER_PARAMS):
+    '''
+    Returns url with query and params merged and sorted, without cache buster params, so
+    polls of the same resource share validators.
+    '''
+    parsed = urlparse(url)
+    query = [(key, value) for key, value in parse_qsl(parsed.query, keep_blank_values=True) if
+             key not in ignore_params]
+
+    if params:
+        query.extend((key, value) for key, value in params.items() if key not in ignore_params)
+
+    return '{}://{}{}?{}'.format(parsed.scheme, parsed.netloc, parsed.path, urlencode(sorted(query)))
+
+
+def send_conditional_request(method, url, params=None, headers=None, ignore_params=CACHE_BUSTER_PARAMS, pending=None,
+                             **kwargs):
+    '''
+    Sends request with If-None-Match/If-Modified-Since from the last response for same resource.
+    Returns None if resource is not modified (304, or 200 with the same body), response otherwise.
+
+    Validators of a changed response are saved right away, or with pending (dict) set, added to it for the
+    caller to save (save_validators) once the response is indexed. Until then polls get the full response.
+    '''
+    key = get_validator_key(url, params, ignore_params)
+    validators = get_validators(key)
+    headers = dict(headers or {})
+
+    if validators:
+        if validators['etag']:
+            headers['If-None-Match'] = validators['etag']
+
+        if validators['last_modified']:
+            headers['If-Modified-Since'] = validators['last_modified']
+
+    r = send_request(method, url, params=params, headers=headers, **kwargs)
+
+    if r.status_code == 304:
+        return None
+
+    if not r.ok:
+        return r
+
+    # Servers without ETag/Last-Modified (or ignoring them) still return same body
+    digest = hashlib.md5(r.content).hexdigest()
+
+    if validators and validators['digest'] == digest:
+        return None
+
+    validators = {
+        'etag': r.headers.get('ETag'),
+        'last_modified': r.headers.get('Last-Modified'),
+        'digest': digest,
+    }
+
+    if pending is None:
+        save_validators({key: validators})
+    else:
+        pending[key] = validators
+
+    return r
+
+
+def get_validators(key):
+    '''
+    Returns saved validators of resource key, marks them as recently used.
+    '''
+    with _lock:
+        validators = _validators.pop(key, None)
+
+        if validators is not None:
+            _validators[key] = validators
+
+        return validators
+
+
+def save_validators(pending):
+    '''
+    Saves validators collected by send_conditional_request with pending, drops least recently used ones
+    over MAX_VALIDATORS.
+    '''
+    with _lock:
+        for key, validators in pending.items():
+            _validators.pop(key, None)
+            _validators[key] = validators
+
+        while len(_validators) > MAX_VALIDATORS:
+            _validators.popitem(last=False)
+
+
+def clear_validators():
+    '''
+    Forgets all validators, next conditional request for every resource is a full one.
+    '''
+    with _lock:
+        _validators.clear()
+
+
+def close_session():
+    '''
+    Closes all pooled connections.
+    '''
+    global _session
+
+    with _lock:
+        if _session is not None:
+            _session.close()
+
+        _session = None
+        _hosts.clear()
@@ -0,0 +1,191 @@
+import errno
+import hashlib
+import os
+import threading
+
+from event_indexing.alert import to_dict
+from event_indexing.util.json_utils import dumps, load, dump
+from event_indexing.util.time_utils import now_seconds
+
+STATE_DIR = os.environ.get('EVENT_INDEXING_STATE_DIR')  # unset keeps state in memory only
+
+_lock = threading.Lock()
+_stores = {}
+
+'''
+Every source keeps the fingerprint of each incident it published, keyed by incident id (see get_incident_id).
+A run then only publishes incidents that are new or changed since the previous run, and optionally
+the ones that disappeared from the feed (resolved).
+'''
+
+
+def get_fingerprint(alert, ignore=()):
+    '''
+    Content hash of a parsed alert. Provider is left out, IFSC providers carry the directory of the
+    current interval and would mark every alert as changed. Keys in ignore are left out of the alert
+    and its source (eg. times a source derives from the poll time).
+    '''
+    source = dict(alert['source'])
+    source.pop('provider', None)
+
+    content = dict(alert)
+    content['source'] = source
+
+    for key in ignore:
+        content.pop(key, None)
+        source.pop(key, None)
+
+    return hashlib.md5(dumps(content, sort_keys=True)).hexdigest()
+
+
+def get_resolved_alert(alert, resolved_at):
+    '''
+    Last published alert flagged as resolved.
+    '''
+    alert = dict(alert)
+    alert['resolved'] = True
+    alert['resolved_at'] = resolved_at
+
+    return alert
+
+
+class IncidentStateStore(object):
+    '''
+    Incident state for one source. Persisted as json under STATE_DIR when set, so short
+    lived workers keep state between runs. Not meant to be shared by concurrent runs of the same source.
+    '''
+
+    def __init__(self, name, path=None):
+        self.name = name
+        self.path = path
+        self._incidents = None
+        self._pending = None
+
+    @property
+    def incidents(self):
+        '''
+        incident id -> {'fingerprint', 'created_at'} (+ 'alert' when tracking resolved incidents)
+        '''
+        if self._incidents is None:
+            self._incidents = self.load()
+        return self._incidents
+
+    def load(self):
+        if self.path is None:
+            return {}
+
+        try:
+            with open(self.path) as f:
+                return load(f)
+        except IOError as e:
+            if e.errno != errno.ENOENT:
+                raise
+        except ValueError:
+            # Corrupt state file, start over (everything is published once)
+            pass
+
+        return {}
+
+    def save(self):
+        if self.path is None:
+            return
+
+        tmp_path = '{}.tmp'.format(self.path)
+
+        with open(tmp_path, 'w') as f:
+            dump(self.incidents, f)
+
+        os.rename(tmp_path, self.path)
+
+    def get_changes(self, alerts, max_delay, snapshot=True, resolved=False, ignore=()):
+        '''
+        Returns new and changed alerts and records them as current state.
+
+        snapshot: alerts are the whole feed. Incidents missing from it are dropped from state and,
+        with resolved, returned as resolved alerts unless they just aged out of max_delay.
+        Sources that only fetch part of the feed per run (IFSC) keep incidents until they age out.
+        ignore: keys left out of fingerprints, see get_fingerprint.
+        '''
+        changes = list(self.iter_changes(alerts, max_delay, snapshot, resolved, ignore))
+        self.commit()
+
+        return changes
+
+    def iter_changes(self, alerts, max_delay, snapshot=True, resolved=False, ignore=()):
+        '''
+        Lazy version of get_changes. State is only recorded by commit, once the changes are published,
+        so changes of a run that failed to publish come up again next run.
+        '''
+        now = now_seconds()
+        previous = self.incidents
+        current = {} if snapshot else dict(previous)
+
+        for alert in alerts:
+            incident_id = alert['source']['id']
+            fingerprint = get_fingerprint(alert, ignore)
+            entry = previous.get(incident_id)
+
+            current[incident_id] = {
+                'fingerprint': fingerprint,
+                'created_at': alert['detected_at'],
+            }
+
+            if resolved:
+                current[incident_id]['alert'] = to_dict(alert)
+
+            if entry is None or entry['fingerprint'] != fingerprint:
+                yield alert
+
+        for incident_id, entry in previous.items():
+            if snapshot and incident_id in current:
+                continue
+
+            expired = now - entry['created_at'] > max_delay
+
+            if snapshot:
+                if resolved and not expired and 'alert' in entry:
+                    yield get_resolved_alert(entry['alert'], now)
+            elif expired and current[incident_id] is entry:
+                del current[incident_id]
+
+        self._pending = current
+
+    def commit(self):
+        '''
+        Records state of the last iter_changes as current and saves it.
+        '''
+        if self._pending is None:
+            return
+
+        self._incidents = self._pending
+        self._pending = None
+        self.save()
+
+
+def get_state_store(name):
+    '''
+    Returns process wide state store for a source.
+    '''
+    store = _stores.get(name)
+
+    if store is None:
+        with _lock:
+            store = _stores.get(name)
+
+            if store is None:
+                path = None
+                if STATE_DIR:
+                    path = os.path.join(STATE_DIR, '{}.json'.format(name))
+
+                store = IncidentStateStore(name, path)
+                _stores[name] = store
+
+    return store
+
+
+def clear_state_stores():
+    '''
+    Forgets in memory state of all sources (files under STATE_DIR are kept).
+    '''
+    with _lock:
+        _stores.clear()
@@ -1,14 +1,42 @@
-from pyproj import Proj, transform
+import threading
+
+# numpy and pyproj are imported where used, most scrapers only need is_valid_coordinate
 
 COORDINATES_PRECISION = 8
+LAT_LON_PROJECTION = 'epsg:4326'
+
+_local = threading.local()
+
+
+def get_projection(projection, preserve_units=False):
+    '''
+    Returns Proj for a projection, one per thread (pyproj 1.9 Proj is not documented thread safe, IFSC tiles
+    are projected on pool threads). Setting one up reads the projection database, so it's done once per thread.
+    '''
+    projections = getattr(_local, 'projections', None)
+
+    if projections is None:
+        projections = _local.projections = {}
+
+    key = (projection, preserve_units)
+    proj = projections.get(key)
+
+    if proj is None:
+        from pyproj import Proj
+
+        proj = projections[key] = Proj(init=projection, preserve_units=preserve_units)
+
+    return proj
 
 
 def project_coordinates(projection, x, y):
     '''
     Converts a projected coordinate to a lat/lon.
     '''
-    inProj = Proj(init=projection, preserve_units=True)
-    outProj = Proj(init='epsg:4326')
+    from pyproj import transform
+
+    inProj = get_projection(projection, preserve_units=True)
+    outProj = get_projection(LAT_LON_PROJECTION)
     lon, lat = transform(inProj, outProj, x, y)
 
     lat = round(lat, COORDINATES_PRECISION)
@@ -17,6 +45,23 @@ def project_coordinates(projection, x, y):
     return lat, lon
 
 
+def project_coordinates_batch(projection, x, y):
+    '''
+    Converts arrays of projected coordinates to lat/lon arrays in one call, see project_coordinates.
+    '''
+    import numpy
+    from pyproj import transform
+
+    inProj = get_projection(projection, preserve_units=True)
+    outProj = get_projection(LAT_LON_PROJECTION)
+    lon, lat = transform(inProj, outProj, numpy.asarray(x, dtype=numpy.float64), numpy.asarray(y, dtype=numpy.float64))
+
+    lat = numpy.round(lat, COORDINATES_PRECISION)
+    lon = numpy.round(lon, COORDINATES_PRECISION)
+
+    return lat, lon
+
+
 def is_valid_coordinate(latitude, longitude):
     '''
     Checks if coordinate is valide
@@ -0,0 +1,123 @@
+import codecs
+import json
+
+from requests.utils import guess_json_utf
+
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+'''
+JSON decode and encode for scraper I/O, state and publish. Decodes with ujson (C) when installed, standard
+library json otherwise, both return unicode strings and floats. Encodes with standard library json only:
+published alerts and fingerprints must not change with the backend (ujson formats floats differently).
+'''
+
+UTF_8 = 'utf-8'
+
+
+def loads(s):
+    '''
+    Decodes JSON string (str or unicode), raises ValueError if it's not valid JSON.
+    '''
+    if ujson is not None:
+        try:
+            # default fast float parsing is not exact
+            return ujson.loads(s, precise_float=True)
+        except ValueError:
+            # ujson rejects some valid JSON (integers over 64 bits, floats out of double range),
+            # the standard library decides, and raises for invalid JSON
+            pass
+
+    return json.loads(s)
+
+
+def get_encoding(content, encoding=None):
+    '''
+    Returns normalised encoding of a JSON body: declared encoding (eg. Response.encoding), otherwise detected
+    from its first bytes like Response.json does.
+    '''
+    encoding = encoding or guess_json_utf(content) or UTF_8
+
+    try:
+        return codecs.lookup(encoding).name
+    except LookupError:
+        return UTF_8
+
+
+def loads_body(content, encoding=None):
+    '''
+    Decodes JSON response body (bytes) in encoding (see get_encoding), a leading BOM is skipped.
+    '''
+    encoding = get_encoding(content, encoding)
+
+    # UTF-8 bytes go to the decoder as they are
+    if encoding == UTF_8 and not content.startswith(codecs.BOM_UTF8):
+        return loads(content)
+
+    text = content.decode(encoding)
+
+    if text.startswith(u'\ufeff'):
+        text = text[1:]
+
+    return loads(text)
+
+
+def loads_response(r):
+    '''
+    Decodes JSON body of a requests response, same as r.json() but with loads.
+    '''
+    return loads_body(r.content, r.encoding)
+
+
+def iter_utf8(chunks, encoding):
+    '''
+    Re-encodes body chunks in encoding (see get_encoding) to UTF-8 without BOM, for parsers that only read UTF-8.
+    '''
+    if encoding == UTF_8:
+        first = True
+
+        for chunk in chunks:
+            if first and chunk:
+                first = False
+
+                if chunk.startswith(codecs.BOM_UTF8):
+                    chunk = chunk[len(codecs.BOM_UTF8):]
+
+            yield chunk
+
+        return
+
+    first = True
+
+    for text in codecs.iterdecode(chunks, encoding):
+        if first and text:
+            first = False
+
+            if text.startswith(u'\ufeff'):
+                text = text[1:]
+
+        yield text.encode(UTF_8)
+
+
+def dumps(obj, sort_keys=False):
+    '''
+    Encodes obj to JSON string.
+    '''
+    return json.dumps(obj, sort_keys=sort_keys)
+
+
+def load(f):
+    return loads(f.read())
+
+
+def dump(obj, f):
+    f.write(dumps(obj))
+
+
+def get_backend():
+    '''
+    Returns name of JSON decode backend in use.
+    '''
+    return 'ujson' if ujson is not None else 'json'
@@ -1,11 +1,40 @@
+import _strptime  # strptime imports it lazily, which isn't thread safe
 import datetime
+import threading
 import time
 
 from dateutil import parser
-from dateutil.tz import tzutc
+from dateutil.tz import tzutc, tzoffset, gettz
 
 EPOCH = datetime.datetime.fromtimestamp(0, tzutc())
 
+# strptime formats tried on a time string dateutil parsed, the one giving the same result is used from then on
+COMMON_TIME_FORMATS = (
+    '%m/%d/%Y %I:%M:%S%p',
+    '%m/%d/%Y %I:%M:%S %p',
+    '%m/%d/%Y %I:%M%p',
+    '%m/%d/%Y %I:%M %p',
+    '%m/%d/%Y %H:%M:%S',
+    '%m/%d/%Y %H:%M',
+    '%m/%d/%Y - %I:%M %p',
+    '%m/%d/%y %I:%M %p',
+    '%m-%d-%Y %H:%M:%S',
+    '%b %d %Y %I:%M%p',
+    '%b %d %Y %I:%M %p',
+    '%Y-%m-%d %H:%M:%S',
+    '%Y-%m-%dT%H:%M:%S',
+    '%Y-%m-%dT%H:%M:%S%z',
+)
+LEARN_ATTEMPTS = 10  # strings a parser tries to learn a format from before it sticks to dateutil
+
+_lock = threading.Lock()
+_parsers = {}
+_tzs = {}
+_tz_stats = {
+    'hits': 0,
+    'misses': 0,
+}
+
 
 def parse_timestamp(time_string, tzinfo=None):
     '''
@@ -16,12 +45,120 @@ def parse_timestamp(time_string, tzinfo=None):
     except:
         return 0  # dateutil parser chokes on leap seconds, return 0 so the alert will be filtered out as an "old alert"
 
+    return get_timestamp(parsed, tzinfo)
+
+
+def get_timestamp(parsed, tzinfo=None):
+    '''
+    Converts a datetime to epoch timestamp, tzinfo replaces the parsed one
+    '''
     if tzinfo:
         parsed = parsed.replace(tzinfo=tzinfo)
 
     return (parsed - EPOCH).total_seconds()
 
 
+def strptime(time_string, time_format):
+    '''
+    datetime.strptime returning None when time string doesn't match. Supports a trailing %z (+HHMM) on python 2.
+    '''
+    try:
+        if time_format.endswith('%z'):
+            offset = time_string[-5:]
+            sign = -1 if offset[0] == '-' else 1
+
+            if offset[0] not in '+-' or not offset[1:].isdigit():
+                return None
+
+            parsed = datetime.datetime.strptime(time_string[:-5], time_format[:-2])
+            seconds = sign * (int(offset[1:3]) * 3600 + int(offset[3:]) * 60)
+
+            return parsed.replace(tzinfo=tzoffset(None, seconds))
+
+        return datetime.datetime.strptime(time_string, time_format)
+    except ValueError:
+        return None
+
+
+def is_same_datetime(a, b):
+    return a.replace(tzinfo=None) == b.replace(tzinfo=None) and a.utcoffset() == b.utcoffset()
+
+
+class TimestampParser(object):
+    '''
+    Converts time strings of one source to epoch timestamps. Sources use one fixed format, so strings are
+    parsed with strptime formats, declared or learned from COMMON_TIME_FORMATS by checking them against dateutil.
+    dateutil is only used (and counted in fallbacks) when no format matches.
+    '''
+
+    def __init__(self, time_formats=(), candidates=COMMON_TIME_FORMATS):
+        self.time_formats = list(time_formats)
+        self.candidates = candidates
+        self.hits = 0
+        self.fallbacks = 0
+        self._learn_attempts = 0
+
+    def parse(self, time_string, tzinfo=None):
+        for time_format in self.time_formats:
+            parsed = strptime(time_string, time_format)
+
+            if parsed is not None:
+                self.hits += 1
+                return get_timestamp(parsed, tzinfo)
+
+        self.fallbacks += 1
+
+        try:
+            parsed = parser.parse(time_string)
+        except:
+            return 0  # see parse_timestamp
+
+        self.learn(time_string, parsed)
+
+        return get_timestamp(parsed, tzinfo)
+
+    def learn(self, time_string, parsed):
+        '''
+        Remembers first candidate format parsing time string the same as dateutil did.
+        '''
+        if self._learn_attempts >= LEARN_ATTEMPTS:
+            return
+
+        self._learn_attempts += 1
+
+        for time_format in self.candidates:
+            if time_format in self.time_formats:
+                continue
+
+            candidate = strptime(time_string, time_format)
+
+            if candidate is not None and is_same_datetime(candidate, parsed):
+                self.time_formats.append(time_format)
+                return
+
+
+def get_timestamp_parser(name, time_formats=()):
+    '''
+    Returns process wide timestamp parser of a source, formats learned in one run are kept for the next.
+    '''
+    timestamp_parser = _parsers.get(name)
+
+    if timestamp_parser is None:
+        with _lock:
+            timestamp_parser = _parsers.get(name)
+
+            if timestamp_parser is None:
+                timestamp_parser = TimestampParser(time_formats)
+                _parsers[name] = timestamp_parser
+
+    return timestamp_parser
+
+
+def clear_timestamp_parsers():
+    with _lock:
+        _parsers.clear()
+
+
 def convert_from_12_to_24_format(time_string, time_format):
     '''
     Converts 12 hour time to 24 hour time.
@@ -58,6 +195,49 @@ def add_time_period(time_string, tzinfo=None):
     return '{:%m/%d/%Y %H:%M:%S}'.format(parsed)
 
 
+def get_tz(name):
+    '''
+    Returns tzinfo for a zone name (None if unknown). gettz reads the zoneinfo file on every call,
+    zones are resolved once per process instead.
+    '''
+    if name in _tzs:
+        _tz_stats['hits'] += 1
+        return _tzs[name]
+
+    with _lock:
+        if name not in _tzs:
+            _tzs[name] = gettz(name)
+            _tz_stats['misses'] += 1
+
+    return _tzs[name]
+
+
+def preload_tz(names):
+    '''
+    Resolves zones ahead of time, so no zoneinfo file is read while indexing.
+    '''
+    for name in set(names):
+        if name:
+            get_tz(name)
+
+
+def get_tz_stats():
+    '''
+    Returns tz registry lookups served from cache (hits), resolved with gettz (misses) and zones resolved.
+    '''
+    stats = dict(_tz_stats)
+    stats['zones'] = len(_tzs)
+
+    return stats
+
+
+def clear_tz():
+    with _lock:
+        _tzs.clear()
+        _tz_stats['hits'] = 0
+        _tz_stats['misses'] = 0
+
+
 def get_tz_now(tzinfo=None):
     '''
     Unix now timestamp for timezone
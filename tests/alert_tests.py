@@ -0,0 +1,102 @@
+import json
+import unittest
+
+from event_indexing.alert import Alert, AlertSource, to_dict
+from event_indexing.scrapers.ems.clark_county_fd_cad import ClarkCountyFDCad
+from event_indexing.scrapers.power_outages.fpl_power_outages import FPLPowerOutages
+from event_indexing.source import TYPE_CAD_API
+from tests.scrapers.power_outages import get_data_path
+
+PROVIDER = {
+    'id': 'fpl_power_outages',
+    'name': 'Florida Power and Light',
+}
+
+
+class AlertTest(unittest.TestCase):
+    def setUp(self):
+        source = AlertSource(PROVIDER, 'Power Outage', 1471567800.0, TYPE_CAD_API, '1', 29.332, -81.061)
+        self.alert = Alert(1471567800.0, 'Power Outage', source, latitude=29.332, longitude=-81.061,
+                           category='power_outage', prediction=1.0)
+
+        self.expected = {
+            'detected_at': 1471567800.0,
+            'incident': 'Power Outage',
+            'coordinates': {
+                'lat': 29.332,
+                'long': -81.061
+            },
+            'category': 'power_outage',
+            'prediction': 1.0,
+            'source': {
+                'provider': PROVIDER,
+                'text': 'Power Outage',
+                'created_at': 1471567800.0,
+                'type': TYPE_CAD_API,
+                'id': '1',
+                'geo': {
+                    'type': 'Point',
+                    'coordinates': [-81.061, 29.332]
+                }
+            }
+        }
+
+    def test_to_dict(self):
+        self.assertEqual(self.alert.to_dict(), self.expected)
+        self.assertEqual(to_dict(self.alert), self.expected)
+        self.assertEqual(to_dict(self.expected), self.expected)
+
+    def test_dict_access(self):
+        self.assertEqual(sorted(self.alert.keys()), sorted(self.expected.keys()))
+        self.assertEqual(self.alert['coordinates'], {'lat': 29.332, 'long': -81.061})
+        self.assertEqual(self.alert['source']['id'], '1')
+        self.assertIsNone(self.alert.get('address'))
+        self.assertNotIn('address', self.alert)
+        self.assertRaises(KeyError, lambda: self.alert['address'])
+        self.assertEqual(dict(self.alert['source'])['provider'], PROVIDER)
+
+    def test_equal(self):
+        self.assertEqual(self.alert, self.expected)
+        self.assertEqual(self.expected, self.alert)
+        self.assertEqual([self.alert], [self.expected])
+        self.assertNotEqual(self.alert, dict(self.expected, incident='Fire'))
+
+    def test_set_item(self):
+        self.alert['source']['provider'] = {'id': 'other'}
+        self.alert['resolved'] = True
+
+        self.assertEqual(self.alert['source']['provider'], {'id': 'other'})
+        self.assertTrue(self.alert['resolved'])
+        self.assertEqual(self.alert.to_dict()['resolved'], True)
+
+    def test_no_coordinates(self):
+        source = AlertSource(PROVIDER, 'Fire', 1471567800.0, TYPE_CAD_API, '2')
+        alert = Alert(1471567800.0, 'Fire', source)
+
+        self.assertEqual(sorted(alert.keys()), ['detected_at', 'incident', 'source'])
+        self.assertNotIn('geo', alert['source'])
+
+
+class ParseTest(unittest.TestCase):
+    def test_parse(self):
+        with open(get_data_path('fpl_power_outages.json')) as f:
+            data = json.load(f)
+
+        scraper = FPLPowerOutages(None, None, None)
+        alert = scraper.parse(data['incident'])
+
+        self.assertIsInstance(alert, Alert)
+        self.assertEqual(alert, data['incidents'][0])
+
+    def test_shared_provider(self):
+        scraper = ClarkCountyFDCad(None, None, None)
+        raw_incident = {
+            'incident': 'Fire',
+            'created_at': 1471567800.0,
+            'id': '1',
+        }
+
+        first = scraper.parse(raw_incident)
+        second = scraper.parse(dict(raw_incident, id='2'))
+
+        self.assertIs(first['source']['provider'], second['source']['provider'])
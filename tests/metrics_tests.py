@@ -0,0 +1,157 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from mock import patch, MagicMock, Mock
+
+from event_indexing import metrics
+from event_indexing.metrics import RunMetrics, InMemorySink, PrometheusFileSink, get_metrics_sink, \
+    set_metrics_sink
+from event_indexing.scrapers.power_outages.fpl_power_outages import FPLPowerOutages
+from tests.scrapers.power_outages import get_data_path
+
+
+class RunMetricsTest(unittest.TestCase):
+    def setUp(self):
+        self.metrics = RunMetrics('Test')
+
+    @patch('event_indexing.metrics.get_cpu_time')
+    @patch('event_indexing.metrics.time')
+    def test_stage(self, mock_time, mock_cpu_time):
+        mock_time.side_effect = [0.0, 1.0, 3.0, 6.0]
+        mock_cpu_time.side_effect = [0.0, 0.5, 1.0, 2.0]
+
+        with self.metrics.stage('scrape'):
+            with self.metrics.stage('parse'):
+                pass
+
+        # nested stage pauses its parent
+        self.assertEqual(self.metrics.get_stages(), {
+            'scrape': {'wall': 4.0, 'cpu': 1.5},
+            'parse': {'wall': 2.0, 'cpu': 0.5},
+        })
+
+    def test_iterate(self):
+        items = self.metrics.iterate('get_incidents', iter([1, 2, 3]))
+
+        self.assertEqual(list(items), [1, 2, 3])
+        self.assertIn('get_incidents', self.metrics.get_stages())
+
+    def test_incr(self):
+        self.metrics.incr('rows')
+        self.metrics.incr('rows', 2)
+
+        self.assertEqual(self.metrics.counters, {'rows': 3})
+
+
+class SinkTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def get_metrics(self, source):
+        run_metrics = RunMetrics(source)
+        clock = run_metrics.get_clock()
+        clock.walls = {'parse': 0.25}
+        clock.cpus = {'parse': 0.125}
+        run_metrics.counters = {'rows': 2, 'published': 1}
+
+        return run_metrics
+
+    def test_in_memory_sink(self):
+        sink = InMemorySink(max_runs=2)
+
+        for source in ('A', 'B', 'A'):
+            sink.write(self.get_metrics(source))
+
+        self.assertEqual([run_metrics.source for run_metrics in sink.get_runs()], ['B', 'A'])
+        self.assertEqual(len(sink.get_runs('A')), 1)
+
+    def test_prometheus_file_sink(self):
+        path = os.path.join(self.directory, 'event_indexing.prom')
+        sink = PrometheusFileSink(path)
+
+        sink.write(self.get_metrics('FPLPowerOutages'))
+        sink.write(self.get_metrics('FPLPowerOutages'))
+
+        with open(path) as f:
+            lines = f.read().splitlines()
+
+        self.assertIn('# TYPE event_indexing_runs_total counter', lines)
+        self.assertIn('event_indexing_runs_total{source="FPLPowerOutages"} 2.0', lines)
+        self.assertIn('event_indexing_stage_wall_seconds_total{source="FPLPowerOutages",stage="parse"} 0.5', lines)
+        self.assertIn('event_indexing_stage_cpu_seconds_total{source="FPLPowerOutages",stage="parse"} 0.25', lines)
+        self.assertIn('event_indexing_rows_total{source="FPLPowerOutages"} 4.0', lines)
+        self.assertIn('event_indexing_published_total{source="FPLPowerOutages"} 2.0', lines)
+        self.assertFalse(os.path.exists('{}.tmp'.format(path)))
+
+    def test_get_metrics_sink(self):
+        self.addCleanup(set_metrics_sink, None)
+
+        with patch.object(metrics, 'METRICS_FILE', None):
+            set_metrics_sink(None)
+            self.assertIsInstance(get_metrics_sink(), InMemorySink)
+            self.assertIs(get_metrics_sink(), get_metrics_sink())
+
+        sink = InMemorySink()
+        set_metrics_sink(sink)
+
+        self.assertIs(get_metrics_sink(), sink)
+
+
+class ScraperMetricsTest(unittest.TestCase):
+    def setUp(self):
+        with open(get_data_path('fpl_power_outages.json')) as f:
+            data = json.load(f)
+
+        self.data = data
+        self.sink = InMemorySink()
+
+        self.scraper = FPLPowerOutages(None, None, None)
+        self.scraper.metrics_sink = self.sink
+        self.scraper.publisher = Mock()
+
+    @patch('time.time', return_value=1471568199)
+    def test_run(self, mock_time):
+        self.scraper.request = MagicMock(return_value=self.data['response'])
+        self.scraper.run()
+
+        run_metrics, = self.sink.get_runs()
+        rows = len(self.data['response']['outages'])
+
+        self.assertEqual(run_metrics.source, 'FPLPowerOutages')
+        self.assertEqual(run_metrics.counters['rows'], rows)
+        self.assertEqual(run_metrics.counters['published'], 1)
+        self.assertEqual(run_metrics.counters['rows'] - run_metrics.counters.get('rejected', 0) -
+                         run_metrics.counters.get('filtered', 0), 1)
+        self.assertNotIn('errors', run_metrics.counters)
+
+        for stage in ('request', 'get_incidents', 'scrape', 'parse', 'publish'):
+            self.assertIn(stage, run_metrics.get_stages())
+
+    @patch('event_indexing.scrapers.base.logger')
+    def test_run_error(self, mock_logger):
+        self.scraper.request = MagicMock(return_value={'outages': [{}]})
+        self.scraper.run()
+
+        run_metrics, = self.sink.get_runs()
+
+        self.assertEqual(run_metrics.counters['errors'], 1)
+        mock_logger.exception.assert_called_once_with('Parser %s: Failed to index source', 'FPLPowerOutages')
+
+    def test_run_request_error(self):
+        self.scraper.request = MagicMock(side_effect=ValueError('failed'))
+
+        self.assertRaises(ValueError, self.scraper.run)
+        self.assertEqual(self.sink.get_runs()[0].counters['errors'], 1)
+
+    def test_run_not_modified(self):
+        self.scraper.request = MagicMock(return_value=None)
+        self.scraper.run()
+
+        run_metrics, = self.sink.get_runs()
+
+        self.assertIn('request', run_metrics.get_stages())
+        self.scraper.publisher.publish.assert_not_called()
@@ -0,0 +1,206 @@
+import json
+import threading
+import time
+import unittest
+from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+from StringIO import StringIO
+
+from mock import patch, Mock
+
+from event_indexing import publisher
+from event_indexing.publisher import Publisher, StreamPublisher, RelayPublisher, PublishError, get_publisher
+from event_indexing.scrapers.power_outages.fpl_power_outages import FPLPowerOutages
+
+
+class RelayHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        size = int(self.headers['Content-Length'])
+        body = self.rfile.read(size)
+
+        self.server.requests.append({
+            'body': json.loads(body),
+            'authorization': self.headers.get('Authorization'),
+            'content_type': self.headers.get('Content-Type'),
+        })
+
+        self.send_response(self.server.status)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+class RecordingPublisher(Publisher):
+    def __init__(self, **kwargs):
+        super(RecordingPublisher, self).__init__(**kwargs)
+        self.batches = []
+
+    def write(self, batch):
+        self.batches.append(batch)
+
+
+class PublisherTest(unittest.TestCase):
+    def test_batch_size(self):
+        sink = RecordingPublisher(batch_size=2, flush_interval=60)
+        sink.publish([{'id': 1}, {'id': 2}, {'id': 3}])
+        sink.flush()
+        sink.close()
+
+        self.assertEqual(sink.batches, [[json.dumps({'id': 1}), json.dumps({'id': 2})], [json.dumps({'id': 3})]])
+
+    def test_batch_bytes(self):
+        sink = RecordingPublisher(batch_bytes=2 * len(json.dumps({'id': 1})), flush_interval=60)
+        sink.publish([{'id': 1}, {'id': 2}, {'id': 3}])
+        sink.close()
+
+        self.assertEqual(sink.batches, [[json.dumps({'id': 1}), json.dumps({'id': 2})], [json.dumps({'id': 3})]])
+
+    def test_flush_interval(self):
+        sink = RecordingPublisher(flush_interval=0.05)
+        sink.publish([{'id': 1}])
+
+        time.sleep(0.5)
+
+        self.assertEqual(sink.batches, [[json.dumps({'id': 1})]])
+        sink.close()
+
+    @patch('time.sleep')
+    def test_write_retry(self, mock_sleep):
+        sink = RecordingPublisher(retries=2)
+        sink.write = Mock(side_effect=[ValueError('failed'), ValueError('failed'), None])
+
+        delivery = sink.publish([{'id': 1}])
+        sink.flush()
+        sink.close()
+
+        delivery.wait(0)
+        self.assertEqual(sink.write.call_count, 3)
+        # time.sleep is patched process wide, other tests' background threads may call it too
+        backoff = [call[0][0] for call in mock_sleep.call_args_list if call[0][0] >= sink.retry_backoff]
+        self.assertEqual(backoff, [1.0, 2.0])
+
+    @patch('time.sleep')
+    def test_write_error(self, mock_sleep):
+        sink = RecordingPublisher(retries=1)
+        sink.write = Mock(side_effect=[ValueError('failed'), ValueError('failed'), None])
+
+        failed = sink.publish([{'id': 1}])
+        sink.flush()
+        published = sink.publish([{'id': 2}])
+        sink.close()
+
+        # dropped after retries, the next batch goes out
+        self.assertEqual(sink.write.call_count, 3)
+        self.assertRaises(PublishError, failed.wait, 0)
+        published.wait(0)
+
+    def test_delivery(self):
+        sink = RecordingPublisher(batch_size=3, flush_interval=60)
+        first = sink.publish([{'id': 1}, {'id': 2}, {'id': 3}])
+        second = sink.publish([{'id': 4}])
+
+        first.wait(1)
+
+        self.assertEqual(first.pending, 0)
+        self.assertEqual(second.pending, 1)
+
+        sink.flush(wait=False)
+        second.wait(1)
+
+        self.assertEqual(second.pending, 0)
+        self.assertEqual(len(sink.batches), 2)
+        sink.close()
+
+    def test_stream_publisher(self):
+        stream = StringIO()
+        sink = StreamPublisher(stream)
+        sink.publish([{'id': 1}, {'id': 2}])
+        sink.close()
+
+        self.assertEqual(stream.getvalue(), '{}\n{}\n'.format(json.dumps({'id': 1}), json.dumps({'id': 2})))
+
+    def test_get_publisher(self):
+        self.addCleanup(publisher.close_publishers)
+
+        stdout = get_publisher()
+        relay = get_publisher('https://relay.host', ('test', 'test'))
+
+        self.assertIsInstance(stdout, StreamPublisher)
+        self.assertIsInstance(relay, RelayPublisher)
+        self.assertIs(stdout, get_publisher())
+        self.assertIs(relay, get_publisher('https://relay.host', ['test', 'test']))
+
+
+class RelayPublisherTest(unittest.TestCase):
+    def setUp(self):
+        self.server = HTTPServer(('127.0.0.1', 0), RelayHandler)
+        self.server.requests = []
+        self.server.status = 200
+
+        thread = threading.Thread(target=self.server.serve_forever, kwargs={'poll_interval': 0.01})
+        thread.daemon = True
+        thread.start()
+
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+
+        self.relay_host_api = 'http://127.0.0.1:{}/v1/relay/'.format(self.server.server_port)
+        self.relay_auth = ('test', 'test')
+
+    def test_write(self):
+        sink = RelayPublisher(self.relay_host_api, self.relay_auth, batch_size=2)
+        sink.publish([{'id': 1}, {'id': 2}, {'id': 3}])
+        sink.close()
+
+        requests = self.server.requests
+
+        self.assertEqual(len(requests), 2)
+        self.assertEqual(requests[0]['body'], [{'id': 1}, {'id': 2}])
+        self.assertEqual(requests[1]['body'], [{'id': 3}])
+        self.assertEqual(requests[0]['authorization'], 'Basic dGVzdDp0ZXN0')
+        self.assertEqual(requests[0]['content_type'], 'application/json')
+
+    def test_write_error(self):
+        self.server.status = 500
+
+        sink = RelayPublisher(self.relay_host_api, self.relay_auth, retries=1, retry_backoff=0)
+        delivery = sink.publish([{'id': 1}])
+        sink.close()
+
+        self.assertEqual(len(self.server.requests), 2)
+        self.assertRaises(PublishError, delivery.wait, 0)
+
+    def test_scraper_publish(self):
+        self.addCleanup(publisher.close_publishers)
+
+        scraper = FPLPowerOutages(self.relay_host_api, self.relay_auth, None)
+        scraper.publish([{'id': 1}])
+        scraper.wait_published()
+
+        self.assertEqual(self.server.requests[0]['body'], [{'id': 1}])
+
+    def test_scraper_run_publish_failed(self):
+        self.server.status = 500
+
+        scraper = FPLPowerOutages(self.relay_host_api, self.relay_auth, None)
+        scraper.publisher = RelayPublisher(self.relay_host_api, self.relay_auth, retries=0)
+        scraper.metrics_sink = Mock()
+        scraper.request = Mock(return_value={})
+        scraper.scrape = Mock(return_value=[{'id': 1}])
+        scraper.parse = Mock(side_effect=lambda incident: incident)
+        scraper.commit = Mock()
+
+        scraper.run()
+        scraper.publisher.close()
+
+        # failure reaches the run: counted as an error, nothing recorded as indexed
+        scraper.commit.assert_not_called()
+        self.assertEqual(scraper.metrics_sink.write.call_args[0][0].counters['errors'], 1)
+
+    @patch('event_indexing.scrapers.base.get_publisher')
+    def test_scraper_publish_no_incidents(self, mock_get_publisher):
+        scraper = FPLPowerOutages(self.relay_host_api, self.relay_auth, None)
+        scraper.publish([])
+
+        mock_get_publisher.assert_not_called()
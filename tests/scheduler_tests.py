@@ -0,0 +1,185 @@
+import threading
+import time
+import unittest
+
+from mock import patch
+
+from event_indexing.scheduler import Scheduler, discover_scrapers, load_scrapers, STATUS_OK, STATUS_ERROR, STATUS_TIMEOUT, \
+    STATUS_RUNNING
+from event_indexing.scrapers.base import IncidentScraper
+from event_indexing.scrapers.ems.clark_county_fd_cad import ClarkCountyFDCad
+from event_indexing.scrapers.power_outages.ace_power_outages import ACEPowerOutages
+
+
+class SleepingScraper(IncidentScraper):
+    name = 'SleepingScraper'
+    poll_interval = 60
+    run_timeout = 5
+    delay = 0.2
+
+    def run(self):
+        time.sleep(self.delay)
+
+
+class FastScraper(SleepingScraper):
+    name = 'FastScraper'
+    delay = 0
+
+
+class BlockedScraper(SleepingScraper):
+    '''
+    Runs until released.
+    '''
+    name = 'BlockedScraper'
+    run_timeout = 1
+    released = threading.Event()
+
+    def run(self):
+        self.released.wait(5)
+
+
+class MeetingScraper(SleepingScraper):
+    '''
+    Waits for the other MeetingScraper to start, only succeeds if both run at the same time.
+    '''
+    name = 'MeetingScraper'
+    other = 'OtherMeetingScraper'
+    started = {}
+
+    def run(self):
+        self.started[self.name].set()
+
+        if not self.started[self.other].wait(5):
+            raise RuntimeError('{} did not run concurrently'.format(self.other))
+
+
+class OtherMeetingScraper(MeetingScraper):
+    name = 'OtherMeetingScraper'
+    other = 'MeetingScraper'
+
+
+class FailingScraper(SleepingScraper):
+    name = 'FailingScraper'
+
+    def run(self):
+        raise ValueError('failed')
+
+
+def get_clock(*values):
+    '''
+    Returns now_seconds replacement returning values in order, then the last one.
+    '''
+    values = list(values)
+
+    def clock():
+        return values.pop(0) if len(values) > 1 else values[0]
+
+    return clock
+
+
+class SchedulerTest(unittest.TestCase):
+    def setUp(self):
+        self.relay_host_api = 'https://relay.host'
+        self.relay_auth = ('test', 'test')
+        self.proxy_host = 'https://proxy.host'
+
+    def get_scheduler(self, scrapers):
+        scheduler = Scheduler(scrapers, self.relay_host_api, self.relay_auth, self.proxy_host)
+        self.addCleanup(scheduler.close)
+
+        return scheduler
+
+    def test_discover_scrapers(self):
+        scrapers = discover_scrapers()
+        names = [scraper.name for scraper in scrapers]
+
+        self.assertIn(ClarkCountyFDCad, scrapers)
+        self.assertIn(ACEPowerOutages, scrapers)
+        self.assertEqual(names, sorted(names))
+        self.assertNotIn(None, names)
+
+    def test_load_scrapers(self):
+        self.assertEqual(load_scrapers(), discover_scrapers())
+
+        with patch('event_indexing.scheduler.logger') as mock_logger:
+            self.assertEqual(load_scrapers(['ClarkCountyFDCad', 'Unknown', 'ACEPowerOutages']),
+                             [ACEPowerOutages, ClarkCountyFDCad])
+
+        mock_logger.warning.assert_called_once_with('Scheduler: Unknown source %s', 'Unknown')
+
+    @patch('event_indexing.scheduler.get_scraper_class', side_effect=ImportError('No module named shapely'))
+    @patch('event_indexing.scheduler.logger')
+    def test_load_scrapers_import_error(self, mock_logger, mock_get_scraper_class):
+        self.assertEqual(load_scrapers(['ACEPowerOutages']), [])
+        mock_logger.exception.assert_called_once_with('Scheduler: Failed to import %s', 'ACEPowerOutages')
+
+    @patch('event_indexing.scheduler.preload_tz')
+    def test_preload_tz(self, mock_preload_tz):
+        self.get_scheduler([ClarkCountyFDCad, ACEPowerOutages])
+
+        self.assertEqual(list(mock_preload_tz.call_args[0][0]), ['US/Pacific', 'US/Eastern'])
+
+    def release_blocked(self):
+        # cleanups run last in first: released before the scheduler's pool is joined
+        BlockedScraper.released.clear()
+        self.addCleanup(BlockedScraper.released.set)
+
+    def test_run_cycle_concurrent(self):
+        MeetingScraper.started.update((name, threading.Event()) for name in ('MeetingScraper', 'OtherMeetingScraper'))
+
+        scheduler = self.get_scheduler([MeetingScraper, OtherMeetingScraper])
+        report = scheduler.run_cycle()
+
+        sources = report['sources']
+
+        # each source waits for the other to start, sequential runs would fail
+        self.assertEqual(sources['MeetingScraper']['status'], STATUS_OK)
+        self.assertEqual(sources['OtherMeetingScraper']['status'], STATUS_OK)
+
+    def test_run_cycle_timeout(self):
+        scheduler = self.get_scheduler([FastScraper, BlockedScraper])
+        self.release_blocked()
+
+        # start, FastScraper waited for within its run_timeout, BlockedScraper's run_timeout is over
+        clock = get_clock(1000.0, 1000.0, 1000.0 + BlockedScraper.run_timeout)
+
+        with patch('event_indexing.scheduler.now_seconds', side_effect=clock):
+            report = scheduler.run_cycle()
+
+        sources = report['sources']
+
+        self.assertEqual(sources['FastScraper']['status'], STATUS_OK)
+        self.assertEqual(sources['BlockedScraper']['status'], STATUS_TIMEOUT)
+        self.assertEqual(sources['BlockedScraper']['wall_time'], BlockedScraper.run_timeout)
+
+    def test_run_cycle_still_running(self):
+        scheduler = self.get_scheduler([BlockedScraper])
+        self.release_blocked()
+
+        with patch('event_indexing.scheduler.now_seconds', side_effect=get_clock(1000.0, 1000.0 + 60)):
+            scheduler.run_cycle()
+
+            with patch.object(scheduler, 'get_due_scrapers', return_value=[BlockedScraper]):
+                report = scheduler.run_cycle()
+
+        self.assertEqual(report['sources']['BlockedScraper']['status'], STATUS_RUNNING)
+
+    @patch('event_indexing.scheduler.logger')
+    def test_run_cycle_error(self, mock_logger):
+        scheduler = self.get_scheduler([FailingScraper])
+        report = scheduler.run_cycle()
+
+        self.assertEqual(report['sources']['FailingScraper']['status'], STATUS_ERROR)
+        mock_logger.exception.assert_called_once_with('Parser %s: Failed to run source', 'FailingScraper')
+
+    @patch('time.time', return_value=1471568199)
+    def test_poll_interval(self, mock_time):
+        scheduler = self.get_scheduler([SleepingScraper])
+        scheduler.run_cycle()
+
+        due = scheduler.get_due_scrapers(1471568199 + 59)
+        sleep_time = scheduler.get_sleep_time(1471568199)
+
+        self.assertEqual(due, [])
+        self.assertEqual(sleep_time, 60)
+        self.assertEqual(scheduler.get_due_scrapers(1471568199 + 60), [SleepingScraper])
@@ -0,0 +1,34 @@
+import unittest
+
+from mock import patch
+
+from event_indexing.scrapers.base_dom_scraper import get_soup, get_parser_backend, PARSER_HTML, PARSER_LXML
+from event_indexing.scrapers.ems.clark_county_fd_cad import ClarkCountyFDCad
+from tests.scrapers.ems import get_data_path
+
+
+class ParserBackendTest(unittest.TestCase):
+    def test_get_parser_backend(self):
+        self.assertEqual(get_parser_backend(PARSER_LXML), PARSER_LXML)
+        self.assertEqual(get_parser_backend(None), PARSER_HTML)
+
+    @patch('event_indexing.scrapers.base_dom_scraper.builder_registry.lookup', return_value=None)
+    def test_get_parser_backend_not_installed(self, mock_lookup):
+        self.assertEqual(get_parser_backend(PARSER_LXML), PARSER_HTML)
+
+    def test_get_incidents(self):
+        with open(get_data_path('clark_county_fd_cad.html')) as f:
+            html = f.read()
+
+        scraper = ClarkCountyFDCad(None, None, None)
+        incidents = scraper.get_incidents(html)
+
+        scraper.parser_backend = PARSER_HTML
+
+        self.assertEqual(incidents, scraper.get_incidents(html))
+
+    def test_get_soup(self):
+        for backend in (PARSER_HTML, PARSER_LXML):
+            soup = get_soup('<table><tr><td> a </td></tr><tr><td>b</td></tr></table>', backend)
+
+            self.assertEqual([row.get_text().strip() for row in soup.find_all('tr')], ['a', 'b'])
@@ -0,0 +1,129 @@
+import codecs
+import json
+import unittest
+from io import BytesIO
+
+from mock import MagicMock, patch
+
+from event_indexing.scrapers import base_json_scraper
+from event_indexing.scrapers.base_json_scraper import get_json_items, iter_json_items, ChunkReader
+from event_indexing.scrapers.power_outages.fpl_power_outages import FPLPowerOutages
+from tests.scrapers.power_outages import get_data_path
+
+
+class JsonItemsTest(unittest.TestCase):
+    def setUp(self):
+        with open(get_data_path('fpl_power_outages.json')) as f:
+            data = json.load(f)
+
+        self.document = {'data': data['response']}
+        self.content = json.dumps(self.document)
+
+    def test_get_json_items(self):
+        self.assertEqual(get_json_items(self.document, 'data.outages'), self.document['data']['outages'])
+        self.assertEqual(get_json_items(self.document, 'data.markers'), [])
+        self.assertEqual(get_json_items(self.document, 'markers'), [])
+
+    def test_iter_json_items(self):
+        items = iter_json_items(BytesIO(self.content), 'data.outages')
+
+        self.assertEqual(list(items), self.document['data']['outages'])
+
+    def test_iter_json_items_chunks(self):
+        chunks = [self.content[start:start + 100] for start in range(0, len(self.content), 100)]
+        items = iter_json_items(ChunkReader(chunks), 'data.outages')
+
+        self.assertEqual(list(items), self.document['data']['outages'])
+
+    def test_chunk_reader(self):
+        reader = ChunkReader(['ab', 'cde', 'f'])
+
+        self.assertEqual(reader.read(3), 'abc')
+        self.assertEqual(reader.read(), 'def')
+        self.assertEqual(reader.read(3), '')
+
+    def test_iter_json_items_floats(self):
+        item = next(iter_json_items(BytesIO(self.content), 'data.outages'))
+
+        self.assertIsInstance(item['lat'], float)
+        self.assertIsInstance(item['customersAffected'], int)
+
+
+class IncidentJsonScraperTest(unittest.TestCase):
+    def setUp(self):
+        with open(get_data_path('fpl_power_outages.json')) as f:
+            data = json.load(f)
+
+        self.data = data
+        self.content = json.dumps(data['response'])
+        self.scraper = FPLPowerOutages(None, None, None)
+
+    def get_response(self):
+        response = MagicMock()
+        response.content = self.content
+        response.encoding = None
+        response.json.return_value = json.loads(self.content)
+        response.iter_content.side_effect = lambda size: iter([response.content[start:start + size]
+                                                               for start in range(0, len(response.content), size)])
+
+        return response
+
+    def test_request_streaming(self):
+        response = self.get_response()
+        self.scraper.send_request = MagicMock(return_value=response)
+        self.scraper.stream_min_bytes = 100
+
+        content = self.scraper.request()
+
+        self.assertNotIsInstance(content, dict)
+        self.assertEqual(self.scraper.get_incidents(content), self.scraper.get_incidents(self.data['response']))
+        self.assertTrue(self.scraper.send_request.call_args[1]['stream'])
+        response.json.assert_not_called()
+        response.close.assert_called_once_with()
+
+    def test_request_streaming_utf_16(self):
+        response = self.get_response()
+        response.content = self.content.decode('utf-8').encode('utf-16')
+        self.scraper.send_request = MagicMock(return_value=response)
+        self.scraper.stream_min_bytes = 100
+
+        content = self.scraper.request()
+
+        self.assertEqual(self.scraper.get_incidents(content), self.scraper.get_incidents(self.data['response']))
+
+    def test_request_bom(self):
+        response = self.get_response()
+        response.content = codecs.BOM_UTF8 + self.content
+        self.scraper.send_request = MagicMock(return_value=response)
+
+        for stream_min_bytes in (100, base_json_scraper.STREAM_MIN_BYTES):
+            self.scraper.stream_min_bytes = stream_min_bytes
+            content = self.scraper.request()
+
+            self.assertEqual(self.scraper.get_incidents(content), self.scraper.get_incidents(self.data['response']))
+
+    def test_request_small(self):
+        response = self.get_response()
+        self.scraper.send_request = MagicMock(return_value=response)
+
+        content = self.scraper.request()
+
+        # below stream_min_bytes the body is decoded at once, streaming costs more CPU than it saves memory
+        self.assertEqual(content, self.data['response'])
+        self.assertTrue(self.scraper.send_request.call_args[1]['stream'])
+        response.close.assert_called_once_with()
+
+    @patch.object(base_json_scraper, 'ijson', None)
+    def test_request_without_ijson(self):
+        response = self.get_response()
+        self.scraper.send_request = MagicMock(return_value=response)
+
+        content = self.scraper.request()
+
+        self.assertEqual(content, self.data['response'])
+        self.assertEqual(self.scraper.get_incidents(content), self.scraper.get_incidents(self.data['response']))
+
+    def test_request_not_modified(self):
+        self.scraper.send_request = MagicMock(return_value=None)
+
+        self.assertIsNone(self.scraper.request())
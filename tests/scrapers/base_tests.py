@@ -0,0 +1,60 @@
+import json
+import types
+import unittest
+
+from mock import MagicMock, patch, Mock
+
+from event_indexing.scrapers import base
+from event_indexing.scrapers.ems.clark_county_fd_cad import ClarkCountyFDCad
+from tests.scrapers.ems import get_data_path
+
+
+class StreamingTest(unittest.TestCase):
+    def setUp(self):
+        with open(get_data_path('clark_county_fd_cad.html')) as f:
+            html = f.read()
+
+        with open(get_data_path('clark_county_fd_cad.json')) as f:
+            data = json.load(f)
+
+        self.html = html
+        self.data = data
+
+        self.scraper = ClarkCountyFDCad(None, None, None)
+        self.scraper.publish = Mock()
+        self.scraper.request = MagicMock(return_value=self.html)
+
+    def test_iter_incidents(self):
+        incidents = self.scraper.iter_incidents(self.html)
+
+        self.assertIsInstance(incidents, types.GeneratorType)
+        self.assertEqual(list(incidents), self.scraper.get_incidents(self.html))
+
+    @patch.object(base, 'CHUNK_SIZE', 2)
+    def test_publish_alerts_streaming(self):
+        published = []
+
+        def get_alerts():
+            for i in range(5):
+                # earlier chunks leave before later alerts are parsed
+                self.assertEqual(len(published), i // 2)
+                yield {'id': i}
+
+        self.scraper.streaming = True
+        self.scraper.publish = Mock(side_effect=published.append)
+        self.scraper.publish_alerts(get_alerts())
+
+        self.assertEqual(published, [[{'id': 0}, {'id': 1}], [{'id': 2}, {'id': 3}], [{'id': 4}]])
+
+    @patch('time.time', return_value=1471568199)
+    def test_run_streaming(self, mock_time):
+        self.scraper.streaming = True
+        self.scraper.run()
+
+        self.scraper.publish.assert_called_once_with(self.data['incidents'])
+
+    @patch('time.time', return_value=1471568199)
+    def test_run_not_streaming(self, mock_time):
+        self.scraper.run()
+
+        self.scraper.publish.assert_called_once_with(self.data['incidents'])
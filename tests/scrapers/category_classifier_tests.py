@@ -0,0 +1,105 @@
+import unittest
+import warnings
+
+from event_indexing.categories import CATEGORY_CRIME, CATEGORY_MEDICAL, CATEGORY_POWER_OUTAGE
+from event_indexing.scrapers.category_classifier import CategoryClassifier, get_classifier, normalize
+from event_indexing.scrapers.category_maps import INCIDENT_CATEGORY_MAP
+from event_indexing.scrapers.ems.clark_county_fd_cad import ClarkCountyFDCad
+
+
+class CategoryClassifierTest(unittest.TestCase):
+    def setUp(self):
+        self.classifier = CategoryClassifier({
+            'SUSP VEH': CATEGORY_CRIME,
+            'Medical Aid': CATEGORY_MEDICAL,
+            'Medical Aid - C Level': CATEGORY_CRIME,
+        }, [
+            (r'\boutage\b', CATEGORY_POWER_OUTAGE),
+            (r'^susp', CATEGORY_MEDICAL),
+        ])
+
+    def test_normalize(self):
+        self.assertEqual(normalize('  Medical Aid -  C_Level (E12) '), 'medical aid c level e12')
+        self.assertEqual(normalize(u'D\xe9j\xe0 Vu'), u'd\xe9j\xe0 vu')
+
+    def test_exact(self):
+        self.assertEqual(self.classifier.classify('SUSP VEH'), CATEGORY_CRIME)
+        self.assertEqual(self.classifier.classify('Medical Aid'), CATEGORY_MEDICAL)
+
+    def test_variants(self):
+        self.assertEqual(self.classifier.classify('susp veh'), CATEGORY_CRIME)
+        self.assertEqual(self.classifier.classify(' SUSP  VEH '), CATEGORY_CRIME)
+        self.assertEqual(self.classifier.classify('SUSP VEH - 10-37'), CATEGORY_CRIME)
+
+    def test_longest_prefix(self):
+        self.assertEqual(self.classifier.classify('Medical Aid - B Level'), CATEGORY_MEDICAL)
+        self.assertEqual(self.classifier.classify('MEDICAL AID C LEVEL E12'), CATEGORY_CRIME)
+
+    def test_whole_tokens(self):
+        # prefix of a token is not a match
+        self.assertEqual(self.classifier.classify('SUSP VEHICLE'), CATEGORY_MEDICAL)
+        self.assertIsNone(self.classifier.classify('Medical'))
+
+    def test_patterns(self):
+        self.assertEqual(self.classifier.classify('Planned Outage'), CATEGORY_POWER_OUTAGE)
+        self.assertEqual(self.classifier.classify('SUSPICIOUS PERSON'), CATEGORY_MEDICAL)
+        self.assertIsNone(self.classifier.classify('Outages'))
+
+    def test_pattern_order(self):
+        # earlier rule wins, wherever in the text the later one matches
+        classifier = CategoryClassifier({}, [('fire', 'hazard'), ('brush', 'other'), (r'(brush|grass) fire', 'wild')])
+
+        self.assertEqual(classifier.classify('BRUSH FIRE'), 'hazard')
+        self.assertEqual(classifier.classify('Brush Clearing'), 'other')
+        self.assertEqual(classifier.get_stats()['hits'], {'fire': 1, 'brush': 1})
+
+    def test_many_patterns(self):
+        patterns = [(r'^code {}$'.format(i), str(i)) for i in range(250)]
+        classifier = CategoryClassifier({}, patterns)
+
+        self.assertEqual(classifier.classify('CODE 0'), '0')
+        self.assertEqual(classifier.classify('Code 249'), '249')
+        self.assertIsNone(classifier.classify('Code 250'))
+
+    def test_stats(self):
+        self.classifier.classify('SUSP VEH')
+        self.classifier.classify('susp veh - 10-37')
+        self.classifier.classify('Planned Outage')
+        self.classifier.classify('Loud Music')
+        self.classifier.classify('LOUD  MUSIC')
+        self.classifier.classify(None)
+
+        stats = self.classifier.get_stats()
+
+        self.assertEqual(stats['hits'], {'susp veh': 2, r'\boutage\b': 1})
+        self.assertEqual(stats['misses'], 2)
+        self.assertEqual(stats['missed'], [('loud music', 2)])
+
+        self.classifier.reset_stats()
+
+        self.assertEqual(self.classifier.get_stats(), {'hits': {}, 'misses': 0, 'missed': []})
+
+    def test_get_classifier(self):
+        self.assertEqual(get_classifier('ClarkCountyFDCad').classify('MEDICAL AID - C LEVEL'), CATEGORY_MEDICAL)
+        self.assertIsNone(get_classifier('Unknown').classify('Medical Aid - C Level'))
+
+    def test_category_map_deprecated(self):
+        scraper = ClarkCountyFDCad(None, None, None)
+
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter('always')
+            category_map = scraper.category_map
+
+        self.assertEqual(category_map, INCIDENT_CATEGORY_MAP['ClarkCountyFDCad'])
+        self.assertEqual(caught[0].category, DeprecationWarning)
+
+    def test_parse(self):
+        scraper = ClarkCountyFDCad(None, None, None)
+        alert = scraper.parse({
+            'incident': 'MEDICAL AID - C LEVEL (E12)',
+            'created_at': 1471567800.0,
+            'id': '1',
+        })
+
+        self.assertEqual(alert['category'], CATEGORY_MEDICAL)
+        self.assertEqual(alert['prediction'], 1.0)
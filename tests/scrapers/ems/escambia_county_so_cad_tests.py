@@ -202,6 +202,38 @@ class EscambiaCountySOCadTest(unittest.TestCase):
         self.assertEqual(incident, 'SUSP VEH')
         self.assertEqual(created_at, 1471567800.0)
 
+    def test_get_incident_fields(self):
+        raw_incidents = self.scraper.get_raw_incidents(self.html)
+
+        for raw_incident in raw_incidents:
+            result = self.scraper.get_incident(raw_incident)
+
+            soup = BeautifulSoup(raw_incident['WindowInfo'], 'html.parser')
+            items = soup.find_all('tr')
+
+            self.assertEqual(result['id'], self.scraper.get_incident_id(items[0]))
+            self.assertEqual(result['date_time'], self.scraper.get_date_time(items[1]))
+            self.assertEqual(result['incident'], self.scraper.get_description(items[4]))
+
+    def test_get_incident_unexpected_markup(self):
+        incident = dict(self.data['raw_incident'])
+        incident['WindowInfo'] = incident['WindowInfo'].replace('Incident #:', 'Incident Number')
+
+        result = self.scraper.get_incident(incident)
+
+        self.assertEqual(result['id'], 'ECSO16CAD276495')
+        self.assertEqual(result['date_time'], '08/18/2016 7:50:00PM')
+        self.assertEqual(result['incident'], 'SUSP VEH')
+
+    def test_get_fields(self):
+        fields = self.scraper.get_fields(self.data['raw_incident']['WindowInfo'])
+
+        self.assertEqual(fields['Incident #'], 'ECSO16CAD276495')
+        self.assertEqual(fields['Received'], '08/18/2016 7:50:00 PM')
+        self.assertEqual(fields['Incident Type'], 'SUSP VEH')
+        self.assertEqual(fields['Arrived'], '')
+        self.assertEqual(self.scraper.get_fields('<td>Remarks:</td><td>A &amp; B</td>'), {'Remarks': 'A & B'})
+
     def test_get_text(self):
         soup = BeautifulSoup(self.data['value'], 'html.parser')
         original = soup.get_text()
@@ -160,16 +160,16 @@ class ACEPowerOutagesTest(unittest.TestCase):
 
     @patch('event_indexing.scrapers.power_outages.ace_power_outages.get_tz_now')
     @patch('time.time', return_value=1471568199)
-    @patch('event_indexing.scrapers.power_outages.base_ifsc_scraper.Pool.imap_unordered')
+    @patch('event_indexing.scrapers.power_outages.base_ifsc_scraper.request')
     def test_run(self, mock_requests, mock_time, mock_get_tz_now):
         mock_get_tz_now.return_value = datetime.datetime(2016, 8, 18, 20, 56, 39, tzinfo=self.scraper.get_tz_info())
         incidents = self.data['response']
         meta = self.data['meta']
 
-        ACEPowerOutages._indexes = [self.data['indexes']]
+        ACEPowerOutages._indexes = self.data['indexes']
         ACEPowerOutages._directory = meta['directory']
 
-        mock_requests.return_value = [(incidents, meta)]
+        mock_requests.return_value = (incidents, meta)
         self.scraper.publish = Mock()
         self.scraper.run()
 
@@ -153,15 +153,15 @@ class APPowerOutagesTest(unittest.TestCase):
                          'http://outagemap.appalachianpower.com.s3.amazonaws.com/external/default.html')
 
     @patch('time.time', return_value=1471568199)
-    @patch('event_indexing.scrapers.power_outages.base_ifsc_scraper.Pool.imap_unordered')
+    @patch('event_indexing.scrapers.power_outages.base_ifsc_scraper.request')
     def test_run(self, mock_requests, mock_time):
         incidents = self.data['response']
         meta = self.data['meta']
 
-        APPowerOutages._indexes = [self.data['indexes']]
+        APPowerOutages._indexes = self.data['indexes']
         APPowerOutages._directory = meta['directory']
 
-        mock_requests.return_value = [(incidents, meta)]
+        mock_requests.return_value = (incidents, meta)
         self.scraper.publish = Mock()
         self.scraper.run()
 
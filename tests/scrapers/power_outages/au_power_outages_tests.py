@@ -152,15 +152,15 @@ class AUPowerOutagesTest(unittest.TestCase):
         self.assertEqual(provider_api_url, 'http://outagemap.myavista.com/external/default.html')
 
     @patch('time.time', return_value=1471568199)
-    @patch('event_indexing.scrapers.power_outages.base_ifsc_scraper.Pool.imap_unordered')
+    @patch('event_indexing.scrapers.power_outages.base_ifsc_scraper.request')
     def test_run(self, mock_requests, mock_time):
         incidents = self.data['response']
         meta = self.data['meta']
 
-        AUPowerOutages._indexes = [self.data['indexes']]
+        AUPowerOutages._indexes = self.data['indexes']
         AUPowerOutages._directory = meta['directory']
 
-        mock_requests.return_value = [(incidents, meta)]
+        mock_requests.return_value = (incidents, meta)
         self.scraper.publish = Mock()
         self.scraper.run()
 
@@ -0,0 +1,147 @@
+import codecs
+import json
+import threading
+import time
+import unittest
+from multiprocessing.pool import ThreadPool
+
+from mock import patch, MagicMock
+
+from event_indexing.scrapers.power_outages import base_ifsc_scraper, ifsc_schedule
+from event_indexing.scrapers.power_outages.ace_power_outages import ACEPowerOutages
+from event_indexing.scrapers.power_outages.base_ifsc_scraper import RateLimiter, get_rate_limiter, get_tile_pool, \
+    imap_window
+from event_indexing.scrapers.power_outages.ifsc_schedule import get_tile_history
+from tests.scrapers.power_outages import get_data_path
+
+
+class RateLimiterTest(unittest.TestCase):
+    @patch('time.sleep')
+    @patch('time.time', return_value=1471568199)
+    def test_acquire(self, mock_time, mock_sleep):
+        limiter = RateLimiter(2)
+
+        limiter.acquire()
+        limiter.acquire()
+
+        mock_sleep.assert_not_called()
+
+        # bucket is empty, next call waits for a token
+        mock_sleep.side_effect = lambda wait: setattr(mock_time, 'return_value', mock_time.return_value + wait)
+        limiter.acquire()
+
+        mock_sleep.assert_called_once_with(0.5)
+
+    def test_get_rate_limiter(self):
+        limiter = get_rate_limiter('http://tiles.host/a/0320012332.json', 20)
+
+        self.assertIs(limiter, get_rate_limiter('http://tiles.host/a/0320012333.json', 20))
+        self.assertIsNot(limiter, get_rate_limiter('http://other.host/a/0320012332.json', 20))
+
+
+class ImapWindowTest(unittest.TestCase):
+    def setUp(self):
+        self.pool = ThreadPool(4)
+        self.addCleanup(self.pool.terminate)
+
+    def test_slow_consumer(self):
+        lock = threading.Lock()
+        started = []
+        outstanding = []
+
+        def fetch(item):
+            with lock:
+                started.append(item)
+
+            return item
+
+        consumed = 0
+
+        for item in imap_window(self.pool, fetch, range(50), 6):
+            # give workers time to run ahead of the consumer
+            time.sleep(0.005)
+            consumed += 1
+
+            with lock:
+                outstanding.append(len(started) - consumed + 1)
+
+        self.assertEqual(consumed, 50)
+        self.assertEqual(sorted(started), range(50))
+        self.assertLessEqual(max(outstanding), 6)
+
+    def test_error(self):
+        def fetch(item):
+            if item == 3:
+                raise ValueError('tile failed')
+
+            return item
+
+        self.assertRaises(ValueError, list, imap_window(self.pool, fetch, range(10), 4))
+
+
+class TileFetcherTest(unittest.TestCase):
+    def setUp(self):
+        with open(get_data_path('ace_power_outages.json')) as f:
+            data = json.load(f)
+
+        self.data = data
+        self.scraper = ACEPowerOutages(None, None, None)
+
+    def test_get_tile_pool(self):
+        self.assertIs(get_tile_pool(2), get_tile_pool(2))
+        self.assertIsNot(get_tile_pool(2), get_tile_pool(3))
+
+    @patch('event_indexing.scrapers.power_outages.base_ifsc_scraper.send_request')
+    def test_request_bom(self, mock_send_request):
+        data = dict(self.data['indexes'][0], conditional=False)
+        response = MagicMock(status_code=200, encoding='utf-8')
+        response.content = codecs.BOM_UTF8 + json.dumps(self.data['response'])
+        mock_send_request.return_value = response
+
+        content, meta = base_ifsc_scraper.request(data)
+
+        self.assertEqual(content, self.data['response'])
+        self.assertEqual(meta, data['meta'])
+
+    @patch('event_indexing.scrapers.power_outages.base_ifsc_scraper.request')
+    def test_fetch_tile(self, mock_request):
+        data = self.data['indexes'][0]
+        mock_request.return_value = (self.data['response'], self.data['meta'])
+
+        raw_incidents, meta = self.scraper.fetch_tile(data)
+
+        mock_request.assert_called_once_with(data, pool_size=base_ifsc_scraper.CONCURRENCY,
+                                             pending=self.scraper.pending_validators)
+        self.assertEqual(raw_incidents, self.scraper.get_incidents(self.data['response']))
+        self.assertEqual(meta, self.data['meta'])
+
+    @patch('event_indexing.scrapers.power_outages.base_ifsc_scraper.request')
+    def test_fetch_tile_not_modified(self, mock_request):
+        mock_request.return_value = (None, self.data['meta'])
+
+        raw_incidents, meta = self.scraper.fetch_tile(self.data['indexes'][0])
+
+        self.assertIsNone(raw_incidents)
+
+    @patch('event_indexing.scrapers.power_outages.base_ifsc_scraper.request')
+    def test_fetch_tile_adaptive(self, mock_request):
+        ifsc_schedule.clear_tile_histories()
+        self.addCleanup(ifsc_schedule.clear_tile_histories)
+
+        meta = self.data['meta']
+        history = get_tile_history(self.scraper.name)
+
+        self.scraper.adaptive = True
+        history.get_due([meta['index']])
+
+        mock_request.return_value = ({}, meta)
+        self.scraper.fetch_tile(self.data['indexes'][0])
+
+        # empty tile backs off
+        self.assertEqual(history.get_due([meta['index']]), [])
+
+        history.get_due([meta['index']])
+        mock_request.return_value = (self.data['response'], meta)
+        self.scraper.fetch_tile(self.data['indexes'][0])
+
+        self.assertEqual(history.get_due([meta['index']]), [meta['index']])
@@ -0,0 +1,83 @@
+import json
+import unittest
+from datetime import datetime
+
+from mock import patch
+
+from event_indexing.scrapers import state
+from event_indexing.scrapers.power_outages.base_siena_scraper import iter_outages
+from event_indexing.scrapers.power_outages.irea_power_outages import IREAPowerOutages
+from tests.scrapers.power_outages import get_data_path
+
+DOCUMENT = u'''<?xml version="1.0" encoding="UTF-8"?>
+<!DOCTYPE data SYSTEM "data.dtd">
+<data>
+  <generated date="Apr 23, 2017 8:20PM" date2="201704232020"/>
+  <outages>
+    {}
+    <outage affected='3' duration='60' id='354737116' lat='39.38' lng='-104.87'></outage>
+    <outage affected='25' duration='1200' id='354737117' lat='39.39' lng='-104.88' towns='Parker'></outage>
+  </outages>
+</data>
+'''
+
+
+class IterOutagesTest(unittest.TestCase):
+    def setUp(self):
+        with open(get_data_path('irea_power_outages.json')) as f:
+            data = json.load(f)
+
+        self.document = DOCUMENT.format(data['raw_incident'])
+
+    def test_iter_outages(self):
+        outages = list(iter_outages(self.document))
+
+        self.assertEqual([outage['id'] for outage in outages], ['354737115', '354737116', '354737117'])
+        self.assertEqual(outages[0]['comment'], 'CPI is moving wire, there is no load on T-34646')
+        self.assertEqual(outages[2]['towns'], 'Parker')
+
+    def test_iter_outages_minimum_affected(self):
+        outages = list(iter_outages(self.document.encode('utf-8'), minimum_affected=10))
+
+        self.assertEqual([outage['id'] for outage in outages], ['354737115', '354737117'])
+
+    def test_iter_outages_empty(self):
+        with open(get_data_path('cec_power_outages.xml')) as f:
+            content = f.read()
+
+        self.assertEqual(list(iter_outages(content)), [])
+
+
+class IncidentSienaScraperTest(unittest.TestCase):
+    def setUp(self):
+        with open(get_data_path('irea_power_outages.json')) as f:
+            data = json.load(f)
+
+        self.document = DOCUMENT.format(data['raw_incident'])
+        self.scraper = IREAPowerOutages(None, None, None)
+
+    @patch('event_indexing.scrapers.power_outages.base_siena_scraper.get_tz_now')
+    def test_get_incidents(self, mock_get_tz_now):
+        mock_get_tz_now.return_value = datetime(2016, 8, 18, 19, 00, 00, tzinfo=self.scraper.get_tz_info())
+
+        incidents = self.scraper.get_incidents(self.document)
+
+        # now is computed once per document
+        mock_get_tz_now.assert_called_once_with(self.scraper.get_tz_info())
+        self.assertEqual([incident['id'] for incident in incidents], ['354737115', '354737117'])
+        self.assertEqual([incident['created_at'] for incident in incidents], [1471567800.0, 1471567200.0])
+
+    @patch('time.time', return_value=1471568199)
+    @patch('event_indexing.scrapers.power_outages.base_siena_scraper.get_tz_now')
+    def test_get_changes_next_poll(self, mock_get_tz_now, mock_time):
+        state.clear_state_stores()
+        self.addCleanup(state.clear_state_stores)
+        self.scraper.incremental = True
+
+        for minute, expected in ((0, 2), (1, 0)):
+            mock_get_tz_now.return_value = datetime(2016, 8, 18, 19, minute, 00, tzinfo=self.scraper.get_tz_info())
+            alerts = [self.scraper.parse(incident) for incident in self.scraper.get_incidents(self.document)]
+
+            # created_at is now - duration, a minute later the same outages must not come up as changed
+            self.assertEqual(len(self.scraper.get_changes(alerts)), expected)
+            self.scraper.commit()
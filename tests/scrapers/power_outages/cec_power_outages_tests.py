@@ -89,7 +89,7 @@ class CECPowerOutagesTest(unittest.TestCase):
     #
     #     self.assertEqual(max_delay, 3600)
     #
-    # @patch('event_indexing.scrapers.power_outages.cec_power_outages.get_tz_now')
+    # @patch('event_indexing.scrapers.power_outages.base_siena_scraper.get_tz_now')
     # @patch('time.time', return_value=1471568199)
     # def test_scrape(self, mock_time, mock_get_tz_now):
     #     mock_get_tz_now.return_value = datetime(2016, 8, 18, 19, 00, 00, tzinfo=self.scraper.get_tz_info())
@@ -107,7 +107,7 @@ class CECPowerOutagesTest(unittest.TestCase):
     #     self.assertEqual(latitude, 39.3804851523661)
     #     self.assertEqual(longitude, -104.875128646716)
     #
-    # @patch('event_indexing.scrapers.power_outages.cec_power_outages.get_tz_now')
+    # @patch('event_indexing.scrapers.power_outages.base_siena_scraper.get_tz_now')
     # @patch('time.time', return_value=1471568199)
     # def test_scrape_delay(self, mock_time, mock_get_tz_now):
     #     mock_get_tz_now.return_value = datetime(2016, 8, 18, 19, 00, 00, tzinfo=self.scraper.get_tz_info())
@@ -172,7 +172,7 @@ class CECPowerOutagesTest(unittest.TestCase):
     #     self.assertEqual(provider_api_id, 'irea_power_outages')
     #     self.assertEqual(provider_api_url, 'http://irea.maps.sienatech.com/')
     #
-    # @patch('event_indexing.scrapers.power_outages.cec_power_outages.get_tz_now')
+    # @patch('event_indexing.scrapers.power_outages.base_siena_scraper.get_tz_now')
     # @patch('time.time', return_value=1471568199)
     # def test_run(self, mock_time, mock_get_tz_now):
     #     mock_get_tz_now.return_value = datetime(2016, 8, 18, 19, 00, 00, tzinfo=self.scraper.get_tz_info())
@@ -195,7 +195,7 @@ class CECPowerOutagesTest(unittest.TestCase):
     #
     #     self.assertEqual(size, 1)
     #
-    # @patch('event_indexing.scrapers.power_outages.cec_power_outages.get_tz_now')
+    # @patch('event_indexing.scrapers.power_outages.base_siena_scraper.get_tz_now')
     # @patch('time.time', return_value=1471568199)
     # def test_get_incident(self, mock_time, mock_get_tz_now):
     #     mock_get_tz_now.return_value = datetime(2016, 8, 18, 19, 00, 00, tzinfo=self.scraper.get_tz_info())
@@ -228,7 +228,7 @@ class CECPowerOutagesTest(unittest.TestCase):
     #     self.assertTrue(is_valid_affected)
     #     self.assertFalse(is_invalid_affected)
     #
-    # @patch('event_indexing.scrapers.power_outages.cec_power_outages.get_tz_now')
+    # @patch('event_indexing.scrapers.power_outages.base_siena_scraper.get_tz_now')
     # def test_get_date_time(self, mock_get_tz_now):
     #     mock_get_tz_now.return_value = datetime(2016, 8, 18, 19, 00, 00, tzinfo=self.scraper.get_tz_info())
     #
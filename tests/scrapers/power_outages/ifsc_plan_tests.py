@@ -0,0 +1,143 @@
+import copy
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from mock import MagicMock, patch
+
+from event_indexing.scrapers.power_outages import ifsc_plan
+from event_indexing.scrapers.power_outages.base_ifsc_service_area import IFSCServiceAreas
+from event_indexing.scrapers.power_outages.ifsc_plan import IFSCPlanCache, get_plan_cache, COVERAGE_BOUNDS, \
+    COVERAGE_POLYGON
+from event_indexing.scrapers.power_outages.ifsc_util import get_map_spatial_indexes, get_tile_polygon
+from tests.scrapers.power_outages import get_data_path
+
+ZOOM_LEVEL = 11
+
+
+def get_index_tile_polygon(index):
+    x = int(''.join(str(int(digit) & 1) for digit in index), 2)
+    y = int(''.join(str(int(digit) >> 1) for digit in index), 2)
+
+    return get_tile_polygon(x, y, len(index))
+
+
+class IFSCPlanCacheTest(unittest.TestCase):
+    def setUp(self):
+        with open(get_data_path('base_ifsc_service_areas.json')) as f:
+            data = json.load(f)
+
+        self.data = data
+
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.path = os.path.join(directory, 'Test.plan.11.json')
+
+        url = 'http://outagemap.aepohio.com.s3.amazonaws.com/resources/datastatic/serviceareas.json'
+        self.service_areas = IFSCServiceAreas(None, None, None, url, None)
+        self.service_areas.request = MagicMock(return_value=self.data['response'])
+        self.service_areas.get_segments = MagicMock(wraps=self.service_areas.get_segments)
+
+    def test_get_segments(self):
+        segments = IFSCPlanCache('Test', ZOOM_LEVEL).get_segments(self.service_areas, COVERAGE_BOUNDS)
+        expected = [sorted(get_map_spatial_indexes(segment, ZOOM_LEVEL)) for segment in
+                    self.service_areas.get_segments(self.data['response'])]
+
+        self.assertEqual(len(segments), 9)
+        self.assertEqual(segments, expected)
+
+    def test_get_segments_polygon(self):
+        bounds_segments = IFSCPlanCache('Test', ZOOM_LEVEL).get_segments(self.service_areas, COVERAGE_BOUNDS)
+        polygon_segments = IFSCPlanCache('Test', ZOOM_LEVEL).get_segments(self.service_areas, COVERAGE_POLYGON)
+
+        bounds_indexes = sum(bounds_segments, [])
+        polygon_indexes = sum(polygon_segments, [])
+
+        service_area = self.service_areas.get_service_area(self.data['response'])
+
+        # bounds sweep requests tiles on segment edges once per segment
+        self.assertEqual(len(polygon_segments), 9)
+        self.assertEqual(len(bounds_indexes), 16)
+        self.assertEqual(len(polygon_indexes), 4)
+        self.assertEqual(sorted(polygon_indexes), sorted(set(bounds_indexes)))
+
+        for index in polygon_indexes:
+            self.assertEqual(len(index), ZOOM_LEVEL - 1)
+            self.assertTrue(service_area.intersects(get_index_tile_polygon(index)))
+
+    def test_get_segments_polygon_shape(self):
+        zoom = 15
+
+        bounds_segments = IFSCPlanCache('Test', zoom).get_segments(self.service_areas, COVERAGE_BOUNDS)
+        polygon_segments = IFSCPlanCache('Test', zoom).get_segments(self.service_areas, COVERAGE_POLYGON)
+
+        bounds_indexes = set(sum(bounds_segments, []))
+        polygon_indexes = set(sum(polygon_segments, []))
+
+        # tiles of the bounding box outside of the service area are left out
+        self.assertEqual(len(bounds_indexes), 72)
+        self.assertEqual(len(polygon_indexes), 59)
+        self.assertTrue(polygon_indexes < bounds_indexes)
+
+    def test_get_segments_coverage_changed(self):
+        cache = IFSCPlanCache('Test', ZOOM_LEVEL)
+        cache.get_segments(self.service_areas, COVERAGE_BOUNDS)
+        cache.get_segments(self.service_areas, COVERAGE_POLYGON)
+
+        self.assertEqual(self.service_areas.get_segments.call_count, 2)
+
+    def test_get_segments_not_modified(self):
+        cache = IFSCPlanCache('Test', ZOOM_LEVEL)
+        segments = cache.get_segments(self.service_areas)
+
+        self.assertFalse(self.service_areas.conditional)
+
+        self.service_areas.request.return_value = None
+
+        self.assertEqual(cache.get_segments(self.service_areas), segments)
+        self.assertTrue(self.service_areas.conditional)
+        self.assertEqual(self.service_areas.get_segments.call_count, 1)
+
+    def test_persistence(self):
+        segments = IFSCPlanCache('Test', ZOOM_LEVEL, self.path).get_segments(self.service_areas)
+
+        # new process, same service area file
+        self.assertEqual(IFSCPlanCache('Test', ZOOM_LEVEL, self.path).get_segments(self.service_areas), segments)
+        self.assertEqual(self.service_areas.get_segments.call_count, 1)
+
+    def test_invalidation(self):
+        IFSCPlanCache('Test', ZOOM_LEVEL, self.path).get_segments(self.service_areas)
+
+        response = copy.deepcopy(self.data['response'])
+        response['file_data'].append(response['file_data'][0])
+        self.service_areas.request.return_value = response
+
+        IFSCPlanCache('Test', ZOOM_LEVEL, self.path).get_segments(self.service_areas)
+
+        self.assertEqual(self.service_areas.get_segments.call_count, 2)
+
+    def test_version(self):
+        IFSCPlanCache('Test', ZOOM_LEVEL, self.path).get_segments(self.service_areas)
+
+        with patch.object(ifsc_plan, 'PLAN_VERSION', ifsc_plan.PLAN_VERSION + 1):
+            IFSCPlanCache('Test', ZOOM_LEVEL, self.path).get_segments(self.service_areas)
+
+        self.assertEqual(self.service_areas.get_segments.call_count, 2)
+
+    def test_bounds(self):
+        service_areas = IFSCServiceAreas(None, None, None, None, self.data['bounds'])
+        service_areas.request = MagicMock()
+
+        segments = IFSCPlanCache('Test', ZOOM_LEVEL).get_segments(service_areas)
+
+        self.assertEqual(len(segments), 9)
+        service_areas.request.assert_not_called()
+
+    def test_get_plan_cache(self):
+        ifsc_plan.clear_plan_caches()
+        self.addCleanup(ifsc_plan.clear_plan_caches)
+
+        self.assertIs(get_plan_cache('Test', ZOOM_LEVEL), get_plan_cache('Test', ZOOM_LEVEL))
+        self.assertIsNot(get_plan_cache('Test', ZOOM_LEVEL), get_plan_cache('Test', ZOOM_LEVEL + 1))
@@ -0,0 +1,69 @@
+import unittest
+
+from event_indexing.scrapers.power_outages import ifsc_schedule
+from event_indexing.scrapers.power_outages.ifsc_schedule import TileHistory, get_tile_history
+
+QUADKEYS = ['0320012330', '0320012331', '0320012332', '0320012333']
+
+
+class TileHistoryTest(unittest.TestCase):
+    def setUp(self):
+        self.history = TileHistory(max_interval=4)
+
+    def poll(self, outages):
+        due = self.history.get_due(QUADKEYS)
+
+        for quadkey in due:
+            self.history.record(quadkey, quadkey in outages, quadkey in outages)
+
+        return due
+
+    def test_get_due(self):
+        self.assertEqual(self.history.get_due(QUADKEYS), QUADKEYS)
+
+    def test_back_off(self):
+        polls = [self.poll(outages={'0320012332'}) for _ in range(9)]
+
+        hot = [due.count('0320012332') for due in polls]
+        cold = [due.count('0320012330') for due in polls]
+
+        # hot tile every cycle, cold tile after 2, 4, 4... cycles
+        self.assertEqual(hot, [1] * 9)
+        self.assertEqual(cold, [1, 0, 1, 0, 0, 0, 1, 0, 0])
+
+    def test_changed(self):
+        self.poll(outages=set())
+        self.history.get_due(QUADKEYS)
+        self.history.record('0320012330', False, True)
+
+        self.assertIn('0320012330', self.history.get_due(QUADKEYS))
+
+    def test_not_modified(self):
+        self.history.get_due(QUADKEYS)
+        self.history.record('0320012330', True, True)
+
+        # unchanged tile keeps its outages
+        self.history.get_due(QUADKEYS)
+        self.history.record('0320012330', None, False)
+
+        self.assertIn('0320012330', self.history.get_due(QUADKEYS))
+
+    def test_budget(self):
+        self.poll(outages={'0320012333'})
+
+        self.assertEqual(self.history.get_due(QUADKEYS, budget=1), ['0320012333'])
+
+    def test_budget_overdue(self):
+        self.history.get_due(QUADKEYS, budget=2)
+        self.history.record('0320012330', False, False)
+        self.history.record('0320012331', False, False)
+
+        # tiles left out by the budget come first next cycle
+        self.assertEqual(self.history.get_due(QUADKEYS, budget=2), ['0320012332', '0320012333'])
+
+    def test_get_tile_history(self):
+        ifsc_schedule.clear_tile_histories()
+        self.addCleanup(ifsc_schedule.clear_tile_histories)
+
+        self.assertIs(get_tile_history('Test'), get_tile_history('Test'))
+        self.assertIsNot(get_tile_history('Test'), get_tile_history('Other'))
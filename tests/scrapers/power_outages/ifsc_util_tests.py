@@ -0,0 +1,33 @@
+import json
+import unittest
+
+from event_indexing.scrapers.power_outages.ifsc_util import decode_line, decode_lines, decode_first_point
+from tests.scrapers.power_outages import get_data_path
+
+
+class DecodeTest(unittest.TestCase):
+    def setUp(self):
+        with open(get_data_path('base_ifsc_service_areas.json')) as f:
+            data = json.load(f)
+
+        self.lines = [service_area['geom']['l'][0] for service_area in data['response']['file_data']]
+        self.lines.extend(['edy~Ery`fN', 'aby~E~y`fNiBXHyA~A~@', '_xjqFjjwjMG??NF??O'])
+
+    def test_decode_lines(self):
+        coordinates = decode_lines(self.lines)
+
+        self.assertEqual(len(coordinates), len(self.lines))
+
+        for line, line_coordinates in zip(self.lines, coordinates):
+            self.assertEqual(line_coordinates.shape, (len(decode_line(line)), 2))
+            self.assertEqual(line_coordinates.tolist(), decode_line(line))
+
+    def test_decode_lines_empty(self):
+        coordinates = decode_lines(['', 'edy~Ery`fN', ''])
+
+        self.assertEqual([c.tolist() for c in coordinates], [[], [[36.67027, -79.79946]], []])
+        self.assertEqual(decode_lines([]), [])
+
+    def test_decode_first_point(self):
+        for line in self.lines:
+            self.assertEqual(decode_first_point(line), decode_line(line)[0])
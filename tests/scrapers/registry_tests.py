@@ -0,0 +1,49 @@
+import subprocess
+import sys
+import unittest
+
+from event_indexing.scheduler import discover_scrapers
+from event_indexing.scrapers import registry
+from event_indexing.scrapers.ems.clark_county_fd_cad import ClarkCountyFDCad
+from event_indexing.scrapers.registry import get_scraper_class, get_scraper_classes, get_scraper_names, \
+    clear_scraper_classes
+
+LAZY_IMPORT_SCRIPT = '''
+import sys
+from event_indexing.scheduler import load_scrapers
+load_scrapers(['Fayetteville911Cad'])
+print ' '.join(sorted(sys.modules))
+'''
+
+
+class RegistryTest(unittest.TestCase):
+    def setUp(self):
+        self.addCleanup(clear_scraper_classes)
+
+    def test_registry_matches_discovery(self):
+        scrapers = dict((cls.name, cls) for cls in discover_scrapers())
+
+        self.assertEqual(get_scraper_names(), sorted(scrapers))
+        self.assertEqual(dict((cls.name, cls) for cls in get_scraper_classes()), scrapers)
+
+    def test_get_scraper_class(self):
+        self.assertIs(get_scraper_class('ClarkCountyFDCad'), ClarkCountyFDCad)
+        self.assertIs(registry._classes['ClarkCountyFDCad'], ClarkCountyFDCad)
+        self.assertRaises(KeyError, get_scraper_class, 'Unknown')
+
+    def test_get_scraper_classes(self):
+        classes = get_scraper_classes(['FPLPowerOutages', 'ClarkCountyFDCad'])
+
+        self.assertEqual([cls.name for cls in classes], ['FPLPowerOutages', 'ClarkCountyFDCad'])
+
+    def test_lazy_import(self):
+        # fresh interpreter, this one has imported every scraper already. Goes through the scheduler,
+        # what a single source worker imports
+        modules = subprocess.check_output([sys.executable, '-c', LAZY_IMPORT_SCRIPT]).split()
+
+        self.assertIn('event_indexing.scrapers.ems.fayetteville_911_cad', modules)
+
+        for module in ('event_indexing.scrapers.ems.clark_county_fd_cad',
+                       'event_indexing.scrapers.power_outages.ace_power_outages', 'bs4', 'shapely', 'pyproj',
+                       'numpy', 'multiprocessing'):
+            self.assertNotIn(module, modules)
@@ -0,0 +1,220 @@
+import unittest
+
+from mock import patch, MagicMock, Mock
+
+from event_indexing.scrapers import session
+from event_indexing.scrapers.ems.clark_county_fd_cad import ClarkCountyFDCad
+from event_indexing.scrapers.power_outages.cec_power_outages import CECPowerOutages
+from event_indexing.scrapers.power_outages.fpl_power_outages import FPLPowerOutages
+
+
+class SessionTest(unittest.TestCase):
+    def setUp(self):
+        session.close_session()
+        self.addCleanup(session.close_session)
+
+        self.relay_host_api = 'https://relay.host'
+        self.relay_auth = ('test', 'test')
+        self.proxy_host = 'https://proxy.host'
+
+    def test_get_session(self):
+        first = session.get_session()
+        second = session.get_session()
+
+        self.assertIs(first, second)
+
+    @patch('os.getpid')
+    def test_get_session_forked(self, mock_getpid):
+        mock_getpid.return_value = 1
+        parent = session.get_session()
+
+        mock_getpid.return_value = 2
+        child = session.get_session()
+
+        self.assertIsNot(parent, child)
+
+    def test_configure_host(self):
+        session.configure_host('http://outagemap.example.com/data/0320010122.json', 24)
+        shared = session.get_session()
+
+        adapter = shared.get_adapter('http://outagemap.example.com/other.json')
+        other_adapter = shared.get_adapter('http://other.example.com/other.json')
+
+        self.assertEqual(adapter._pool_maxsize, 24)
+        self.assertEqual(other_adapter._pool_maxsize, session.POOL_MAXSIZE)
+
+    def test_configure_host_only_grows(self):
+        session.configure_host('http://outagemap.example.com/', 24)
+        session.configure_host('http://outagemap.example.com/', 8)
+
+        adapter = session.get_session().get_adapter('http://outagemap.example.com/')
+
+        self.assertEqual(adapter._pool_maxsize, 24)
+
+    @patch('requests.Session.request')
+    def test_send_request_timeout(self, mock_request):
+        session.send_request('GET', 'http://www.fplmaps.com/')
+
+        mock_request.assert_called_once_with('GET', 'http://www.fplmaps.com/', timeout=session.TIMEOUT)
+
+    @patch('requests.Session.request')
+    def test_scraper_request(self, mock_request):
+        response = MagicMock()
+        response.text = '<html></html>'
+        mock_request.return_value = response
+
+        scraper = ClarkCountyFDCad(self.relay_host_api, self.relay_auth, self.proxy_host)
+        scraper.get_user_agent = MagicMock(return_value='test')
+        scraper.request_timeout = 10
+
+        content = scraper.request()
+
+        self.assertEqual(content, '<html></html>')
+        mock_request.assert_called_once_with('GET', 'http://fire.co.clark.nv.us/Alarm%20OfficeConverted.aspx',
+                                             timeout=10,
+                                             headers={'User-Agent': 'test',
+                                                      'Content-Type': 'text/html; charset=utf-8'})
+
+    @patch('requests.Session.request')
+    def test_json_scraper_request(self, mock_request):
+        response = MagicMock()
+        response.status_code = 200
+        response.content = '{"outages": []}'
+        response.encoding = None
+        response.headers = {}
+        response.json.return_value = {'outages': []}
+        response.iter_content.return_value = iter([response.content])
+        mock_request.return_value = response
+
+        scraper = FPLPowerOutages(self.relay_host_api, self.relay_auth, self.proxy_host)
+        content = scraper.request()
+
+        # FPL sets json_path, so the body is requested as a stream (decoded at once while it is small)
+        self.assertEqual(scraper.get_raw_incidents(content), [])
+        self.assertEqual(mock_request.call_args[0], ('GET', 'http://www.fplmaps.com/customer/outage/StormFeedRestoration.json'))
+        self.assertTrue(mock_request.call_args[1]['stream'])
+
+
+class ConditionalRequestTest(unittest.TestCase):
+    def setUp(self):
+        session.close_session()
+        session.clear_validators()
+        self.addCleanup(session.close_session)
+        self.addCleanup(session.clear_validators)
+
+        self.url = 'http://choptank.maps.sienatech.com/data/outages.xml'
+
+    def get_response(self, status_code=200, content='<outages/>', headers=None):
+        response = MagicMock()
+        response.status_code = status_code
+        response.ok = status_code < 400
+        response.content = content
+        response.headers = headers or {}
+
+        return response
+
+    def test_get_validator_key(self):
+        key = session.get_validator_key(self.url + '?t=1493080877995&b=2', {'_': 1471568199000, 'a': 1})
+        other_key = session.get_validator_key(self.url + '?b=2&t=1', {'a': 1, 'timestamp': 2})
+
+        self.assertEqual(key, 'http://choptank.maps.sienatech.com/data/outages.xml?a=1&b=2')
+        self.assertEqual(key, other_key)
+
+    @patch('requests.Session.request')
+    def test_not_modified(self, mock_request):
+        mock_request.return_value = self.get_response(headers={'ETag': '"abc"', 'Last-Modified': 'yesterday'})
+        first = session.send_conditional_request('GET', self.url, params={'_': 1})
+
+        mock_request.return_value = self.get_response(status_code=304)
+        second = session.send_conditional_request('GET', self.url, params={'_': 2})
+
+        headers = mock_request.call_args[1]['headers']
+
+        self.assertIsNotNone(first)
+        self.assertIsNone(second)
+        self.assertEqual(headers['If-None-Match'], '"abc"')
+        self.assertEqual(headers['If-Modified-Since'], 'yesterday')
+
+    @patch('requests.Session.request')
+    def test_same_body(self, mock_request):
+        mock_request.return_value = self.get_response()
+        first = session.send_conditional_request('GET', self.url)
+        second = session.send_conditional_request('GET', self.url)
+
+        mock_request.return_value = self.get_response(content='<outages><outage/></outages>')
+        third = session.send_conditional_request('GET', self.url)
+
+        self.assertIsNotNone(first)
+        self.assertIsNone(second)
+        self.assertIsNotNone(third)
+        self.assertNotIn('If-None-Match', mock_request.call_args[1]['headers'])
+
+    @patch('requests.Session.request')
+    def test_pending(self, mock_request):
+        mock_request.return_value = self.get_response(headers={'ETag': '"abc"'})
+        pending = {}
+
+        first = session.send_conditional_request('GET', self.url, pending=pending)
+        second = session.send_conditional_request('GET', self.url)
+
+        self.assertIsNotNone(first)
+        self.assertIsNotNone(second)
+        self.assertNotIn('If-None-Match', mock_request.call_args[1]['headers'])
+
+        session.save_validators(pending)
+        session.send_conditional_request('GET', self.url)
+
+        self.assertEqual(mock_request.call_args[1]['headers']['If-None-Match'], '"abc"')
+
+    @patch.object(session, 'MAX_VALIDATORS', 2)
+    def test_eviction(self):
+        session.save_validators({'a': {'digest': 'a'}, 'b': {'digest': 'b'}})
+
+        # a is used, b is the least recently used one when c comes in
+        session.get_validators('a')
+        session.save_validators({'c': {'digest': 'c'}})
+
+        self.assertEqual(session.get_validators('a'), {'digest': 'a'})
+        self.assertIsNone(session.get_validators('b'))
+        self.assertEqual(session.get_validators('c'), {'digest': 'c'})
+        self.assertEqual(len(session._validators), 2)
+
+    @patch('requests.Session.request')
+    def test_error_not_stored(self, mock_request):
+        mock_request.return_value = self.get_response(status_code=500)
+        first = session.send_conditional_request('GET', self.url)
+        second = session.send_conditional_request('GET', self.url)
+
+        self.assertEqual(first.status_code, 500)
+        self.assertEqual(second.status_code, 500)
+
+    @patch('requests.Session.request')
+    def test_run_failed_not_stored(self, mock_request):
+        mock_request.return_value = self.get_response(content='<outages><outage/></outages>')
+
+        def run(publish=None):
+            scraper = CECPowerOutages(None, None, None)
+            scraper.scrape = Mock(return_value=[])
+            scraper.publish = Mock(side_effect=publish)
+            scraper.metrics_sink = Mock()
+            scraper.run()
+
+            return scraper
+
+        run(publish=ValueError('relay down'))
+
+        # same body, but first run failed: indexed again
+        run().scrape.assert_called_once()
+        run().scrape.assert_not_called()
+
+    @patch('requests.Session.request')
+    def test_run_not_modified(self, mock_request):
+        mock_request.return_value = self.get_response(status_code=304)
+
+        scraper = CECPowerOutages(None, None, None)
+        scraper.get_incidents = Mock()
+        scraper.publish = Mock()
+        scraper.run()
+
+        scraper.get_incidents.assert_not_called()
+        scraper.publish.assert_not_called()
@@ -0,0 +1,183 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from mock import MagicMock, patch, Mock
+
+from event_indexing.publisher import PublishError
+from event_indexing.scrapers import state
+from event_indexing.scrapers.ems.clark_county_fd_cad import ClarkCountyFDCad
+from event_indexing.scrapers.state import IncidentStateStore, get_fingerprint, get_state_store
+from tests.scrapers.ems import get_data_path
+
+
+def get_alert(incident_id, incident='Power Outage', created_at=1471567800.0, api_route='/a'):
+    return {
+        'detected_at': created_at,
+        'incident': incident,
+        'source': {
+            'provider': {
+                'id': 'test',
+                'api_route': api_route,
+            },
+            'text': incident,
+            'created_at': created_at,
+            'id': incident_id,
+        }
+    }
+
+
+class IncidentStateStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.store = IncidentStateStore('Test')
+
+    def test_get_fingerprint(self):
+        fingerprint = get_fingerprint(get_alert('1'))
+
+        self.assertEqual(fingerprint, get_fingerprint(get_alert('1', api_route='/b')))
+        self.assertNotEqual(fingerprint, get_fingerprint(get_alert('1', incident='Wires Down')))
+
+    def test_get_fingerprint_ignore(self):
+        ignore = ('detected_at', 'created_at')
+        fingerprint = get_fingerprint(get_alert('1'), ignore)
+
+        self.assertNotEqual(get_fingerprint(get_alert('1')), get_fingerprint(get_alert('1', created_at=1471567860.0)))
+        self.assertEqual(fingerprint, get_fingerprint(get_alert('1', created_at=1471567860.0), ignore))
+        self.assertNotEqual(fingerprint, get_fingerprint(get_alert('1', incident='Wires Down'), ignore))
+
+    @patch('time.time', return_value=1471568199)
+    def test_iter_changes_commit(self, mock_time):
+        changes = list(self.store.iter_changes([get_alert('1')], 3600))
+
+        self.assertEqual(len(changes), 1)
+        self.assertEqual(self.store.incidents, {})
+        self.assertEqual(len(list(self.store.iter_changes([get_alert('1')], 3600))), 1)
+
+        self.store.commit()
+
+        self.assertEqual(self.store.incidents.keys(), ['1'])
+        self.assertEqual(list(self.store.iter_changes([get_alert('1')], 3600)), [])
+
+    @patch('time.time', return_value=1471568199)
+    def test_get_changes(self, mock_time):
+        first = self.store.get_changes([get_alert('1'), get_alert('2')], 3600)
+        second = self.store.get_changes([get_alert('1'), get_alert('2')], 3600)
+        third = self.store.get_changes([get_alert('1'), get_alert('2', incident='Wires Down'), get_alert('3')], 3600)
+
+        self.assertEqual(len(first), 2)
+        self.assertEqual(second, [])
+        self.assertEqual([alert['source']['id'] for alert in third], ['2', '3'])
+
+    @patch('time.time', return_value=1471568199)
+    def test_get_changes_resolved(self, mock_time):
+        self.store.get_changes([get_alert('1'), get_alert('2')], 3600, resolved=True)
+        changes = self.store.get_changes([get_alert('1')], 3600, resolved=True)
+
+        resolved = changes[0]
+
+        self.assertEqual(len(changes), 1)
+        self.assertEqual(resolved['source']['id'], '2')
+        self.assertTrue(resolved['resolved'])
+        self.assertEqual(resolved['resolved_at'], 1471568199)
+        self.assertEqual(self.store.incidents.keys(), ['1'])
+
+    def test_get_changes_resolved_expired(self):
+        with patch('time.time', return_value=1471568199):
+            self.store.get_changes([get_alert('1')], 3600, resolved=True)
+
+        with patch('time.time', return_value=1471568199 + 3600):
+            changes = self.store.get_changes([], 3600, resolved=True)
+
+        self.assertEqual(changes, [])
+
+    def test_get_changes_partial(self):
+        with patch('time.time', return_value=1471568199):
+            self.store.get_changes([get_alert('1'), get_alert('2', created_at=1471568100.0)], 3600, snapshot=False)
+            changes = self.store.get_changes([get_alert('3')], 3600, snapshot=False)
+
+            self.assertEqual(len(changes), 1)
+            self.assertEqual(sorted(self.store.incidents.keys()), ['1', '2', '3'])
+
+        with patch('time.time', return_value=1471567800 + 3601):
+            changes = self.store.get_changes([get_alert('1')], 3600, snapshot=False)
+
+            self.assertEqual(changes, [])
+            self.assertEqual(sorted(self.store.incidents.keys()), ['1', '2'])
+
+    @patch('time.time', return_value=1471568199)
+    def test_persistence(self, mock_time):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        path = os.path.join(directory, 'Test.json')
+
+        IncidentStateStore('Test', path).get_changes([get_alert('1')], 3600)
+        changes = IncidentStateStore('Test', path).get_changes([get_alert('1'), get_alert('2')], 3600)
+
+        with open(path) as f:
+            saved = json.load(f)
+
+        self.assertEqual([alert['source']['id'] for alert in changes], ['2'])
+        self.assertEqual(sorted(saved.keys()), ['1', '2'])
+
+    def test_get_state_store(self):
+        state.clear_state_stores()
+        self.addCleanup(state.clear_state_stores)
+
+        self.assertIs(get_state_store('Test'), get_state_store('Test'))
+        self.assertIsNot(get_state_store('Test'), get_state_store('Other'))
+
+
+class IncrementalRunTest(unittest.TestCase):
+    def setUp(self):
+        with open(get_data_path('clark_county_fd_cad.html')) as f:
+            html = f.read()
+
+        with open(get_data_path('clark_county_fd_cad.json')) as f:
+            data = json.load(f)
+
+        self.html = html
+        self.data = data
+
+        state.clear_state_stores()
+        self.addCleanup(state.clear_state_stores)
+
+    @patch('time.time', return_value=1471568199)
+    def test_run(self, mock_time):
+        scraper = ClarkCountyFDCad(None, None, None)
+        scraper.incremental = True
+        scraper.publish = Mock()
+        scraper.request = MagicMock(return_value=self.html)
+
+        scraper.run()
+        scraper.run()
+
+        self.assertEqual(scraper.publish.call_args_list[0][0][0], self.data['incidents'])
+        self.assertEqual(scraper.publish.call_args_list[1][0][0], [])
+
+    @patch('time.time', return_value=1471568199)
+    def test_run_publish_failed(self, mock_time):
+        scraper = ClarkCountyFDCad(None, None, None)
+        scraper.incremental = True
+        scraper.publisher = Mock()
+        scraper.publisher.publish.return_value.wait.side_effect = [PublishError('relay down'), None]
+        scraper.request = MagicMock(return_value=self.html)
+
+        scraper.run()
+        scraper.run()
+
+        # not written, so not recorded: the second run publishes the same incidents again
+        self.assertEqual(scraper.publisher.publish.call_args_list[0], scraper.publisher.publish.call_args_list[1])
+        self.assertEqual(len(scraper.publisher.publish.call_args_list[1][0][0]), len(self.data['incidents']))
+
+    @patch('time.time', return_value=1471568199)
+    def test_run_not_incremental(self, mock_time):
+        scraper = ClarkCountyFDCad(None, None, None)
+        scraper.publish = Mock()
+        scraper.request = MagicMock(return_value=self.html)
+
+        scraper.run()
+        scraper.run()
+
+        self.assertEqual(scraper.publish.call_args_list[1][0][0], self.data['incidents'])
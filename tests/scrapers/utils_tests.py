@@ -1,6 +1,7 @@
+import threading
 import unittest
 
-from event_indexing.scrapers.util import project_coordinates
+from event_indexing.scrapers.util import project_coordinates, project_coordinates_batch, get_projection
 
 
 class UtilsTests(unittest.TestCase):
@@ -13,3 +14,30 @@ class UtilsTests(unittest.TestCase):
 
         self.assertEqual(lat, 32.33813692)
         self.assertEqual(lon, -95.29096343)
+
+    def test_project_coordinates_batch(self):
+        projection = 'epsg:2276'
+        x = [2959481.00, 2959581.00, 2960481.00]
+        y = [6821096.00, 6821196.00, 6822096.00]
+
+        lat, lon = project_coordinates_batch(projection, x, y)
+
+        self.assertEqual(lat.shape, (3,))
+        self.assertEqual(lat[0], 32.33813692)
+        self.assertEqual(lon[0], -95.29096343)
+
+        for i in range(3):
+            self.assertEqual((lat[i], lon[i]), project_coordinates(projection, x[i], y[i]))
+
+    def test_get_projection(self):
+        self.assertIs(get_projection('epsg:2276', preserve_units=True), get_projection('epsg:2276', preserve_units=True))
+        self.assertIsNot(get_projection('epsg:2276', preserve_units=True), get_projection('epsg:2276'))
+
+    def test_get_projection_per_thread(self):
+        projections = []
+
+        thread = threading.Thread(target=lambda: projections.append(get_projection('epsg:2276')))
+        thread.start()
+        thread.join()
+
+        self.assertIsNot(projections[0], get_projection('epsg:2276'))
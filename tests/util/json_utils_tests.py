@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+import codecs
+import json
+import unittest
+from StringIO import StringIO
+
+from mock import patch, Mock
+
+from event_indexing.util import json_utils
+from event_indexing.util.json_utils import loads, dumps, load, dump, loads_body, loads_response, iter_utf8
+
+INCIDENT = {
+    'incident': u'Power Outage',
+    'id': u'354737115',
+    'latitude': 39.3804851523661,
+    'longitude': -104.875128646716,
+    'created_at': 1471567800.0,
+    'url': 'http://irea.maps.sienatech.com/',
+    'affected': 11,
+}
+
+
+class JsonUtilsTest(unittest.TestCase):
+    def assertBackends(self, test):
+        test()
+
+        with patch.object(json_utils, 'ujson', None):
+            test()
+
+    def test_round_trip(self):
+        def test():
+            self.assertEqual(loads(dumps(INCIDENT)), INCIDENT)
+            self.assertEqual(json.loads(dumps(INCIDENT)), INCIDENT)
+            self.assertEqual(loads(json.dumps(INCIDENT)), INCIDENT)
+
+        self.assertBackends(test)
+
+    def test_sort_keys(self):
+        def test():
+            self.assertEqual(dumps({'b': 1, 'a': 2}, sort_keys=True), dumps({'a': 2, 'b': 1}, sort_keys=True))
+            self.assertLess(dumps({'b': 1, 'a': 2}, sort_keys=True).index('a'),
+                            dumps({'b': 1, 'a': 2}, sort_keys=True).index('b'))
+
+        self.assertBackends(test)
+
+    def test_ujson_rejected(self):
+        # valid JSON ujson can't decode
+        def test():
+            self.assertEqual(loads('{"id": 123456789012345678901234567890}'), {'id': 123456789012345678901234567890})
+            self.assertEqual(loads('[1e400]'), [float('inf')])
+
+        self.assertBackends(test)
+
+    def test_invalid(self):
+        def test():
+            self.assertRaises(ValueError, loads, '{"outages": [')
+
+        self.assertBackends(test)
+
+    def test_load_dump(self):
+        def test():
+            f = StringIO()
+            dump(INCIDENT, f)
+            f.seek(0)
+
+            self.assertEqual(load(f), INCIDENT)
+
+        self.assertBackends(test)
+
+    def test_get_backend(self):
+        with patch.object(json_utils, 'ujson', None):
+            self.assertEqual(json_utils.get_backend(), 'json')
+
+    def test_dumps_standard_library(self):
+        # published alerts and fingerprints stay byte for byte what json.dumps writes
+        document = dict(INCIDENT, large=1e20, text=u'Caf\xe9 / Bar')
+
+        self.assertEqual(dumps(document), json.dumps(document))
+        self.assertEqual(dumps(document, sort_keys=True), json.dumps(document, sort_keys=True))
+        self.assertIn('39.3804851523661,', dumps(INCIDENT))
+
+    def test_loads_body(self):
+        content = json.dumps({'text': u'Caf\xe9'}, ensure_ascii=False).encode('utf-8')
+        expected = {'text': u'Caf\xe9'}
+
+        def test():
+            self.assertEqual(loads_body(content), expected)
+            self.assertEqual(loads_body(codecs.BOM_UTF8 + content), expected)
+            self.assertEqual(loads_body(codecs.BOM_UTF8 + content, 'utf-8'), expected)
+            self.assertEqual(loads_body(content.decode('utf-8').encode('utf-16')), expected)
+            self.assertEqual(loads_body(content.decode('utf-8').encode('utf-16-le')), expected)
+            self.assertEqual(loads_body(content.decode('utf-8').encode('latin-1'), 'ISO-8859-1'), expected)
+
+        self.assertBackends(test)
+
+    def test_loads_response(self):
+        response = Mock(content=codecs.BOM_UTF8 + '{"id": 1}', encoding=None)
+
+        self.assertEqual(loads_response(response), {'id': 1})
+
+    def test_iter_utf8(self):
+        content = u'{"text": "Caf\xe9"}'
+        utf_16 = content.encode('utf-16')
+        chunks = [utf_16[start:start + 3] for start in range(0, len(utf_16), 3)]
+
+        self.assertEqual(''.join(iter_utf8(chunks, 'utf-16')), content.encode('utf-8'))
+        self.assertEqual(''.join(iter_utf8([codecs.BOM_UTF8 + 'ab', 'c'], 'utf-8')), 'abc')
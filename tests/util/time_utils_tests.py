@@ -0,0 +1,102 @@
+import unittest
+
+from dateutil.tz import gettz
+from mock import patch
+
+from event_indexing.util import time_utils
+from event_indexing.util.time_utils import TimestampParser, parse_timestamp, get_timestamp_parser, get_tz, preload_tz, \
+    get_tz_stats
+
+TIME_STRINGS = [
+    '08/16/2016 2:43:11PM',
+    '08-16-2016 18:38:25',
+    '08/18/16 08:50 PM',
+    '08/18/2016 - 07:50 PM',
+    'Aug 16 2016 5:03PM',
+    'Aug 18 2016 8:50 PM',
+    '2016-08-16 20:50:00',
+    '2016-08-16T20:50:00-0400',
+]
+
+
+class TimestampParserTest(unittest.TestCase):
+    def test_parse(self):
+        tzinfo = gettz('US/Eastern')
+
+        for time_string in TIME_STRINGS:
+            timestamp_parser = TimestampParser()
+
+            # first string learns the format, second one is parsed with it
+            self.assertEqual(timestamp_parser.parse(time_string, tzinfo), parse_timestamp(time_string, tzinfo))
+            self.assertEqual(timestamp_parser.parse(time_string, tzinfo), parse_timestamp(time_string, tzinfo))
+
+            self.assertEqual(len(timestamp_parser.time_formats), 1, time_string)
+            self.assertEqual(timestamp_parser.fallbacks, 1)
+            self.assertEqual(timestamp_parser.hits, 1)
+
+    def test_parse_offset(self):
+        timestamp_parser = TimestampParser()
+        time_string = '2016-08-16T20:50:00-0400'
+
+        timestamp_parser.parse(time_string)
+
+        self.assertEqual(timestamp_parser.parse(time_string), parse_timestamp(time_string))
+        self.assertEqual(timestamp_parser.hits, 1)
+
+    def test_parse_declared(self):
+        timestamp_parser = TimestampParser(['%Y-%m-%d %H:%M:%S'])
+        tzinfo = gettz('US/Eastern')
+
+        self.assertEqual(timestamp_parser.parse('2016-08-16 20:50:00', tzinfo),
+                         parse_timestamp('2016-08-16 20:50:00', tzinfo))
+        self.assertEqual(timestamp_parser.fallbacks, 0)
+
+    def test_parse_fallback(self):
+        timestamp_parser = TimestampParser(['%Y-%m-%d %H:%M:%S'])
+        tzinfo = gettz('US/Eastern')
+
+        self.assertEqual(timestamp_parser.parse('08/16/2016 2:43:11PM', tzinfo),
+                         parse_timestamp('08/16/2016 2:43:11PM', tzinfo))
+        self.assertEqual(timestamp_parser.fallbacks, 1)
+
+    def test_parse_not_learned(self):
+        timestamp_parser = TimestampParser()
+
+        # no year, dateutil takes the current one
+        for _ in range(time_utils.LEARN_ATTEMPTS + 1):
+            timestamp_parser.parse('04/24 02:31:01 pm', gettz('US/Eastern'))
+
+        self.assertEqual(timestamp_parser.time_formats, [])
+        self.assertEqual(timestamp_parser.fallbacks, time_utils.LEARN_ATTEMPTS + 1)
+
+    def test_parse_invalid(self):
+        self.assertEqual(TimestampParser().parse('not a date'), 0)
+
+    def test_get_timestamp_parser(self):
+        time_utils.clear_timestamp_parsers()
+        self.addCleanup(time_utils.clear_timestamp_parsers)
+
+        self.assertIs(get_timestamp_parser('Test'), get_timestamp_parser('Test'))
+        self.assertIsNot(get_timestamp_parser('Test'), get_timestamp_parser('Other'))
+
+
+class TzTest(unittest.TestCase):
+    def setUp(self):
+        time_utils.clear_tz()
+        self.addCleanup(time_utils.clear_tz)
+
+    def test_get_tz(self):
+        tzinfo = get_tz('US/Eastern')
+
+        self.assertIs(get_tz('US/Eastern'), tzinfo)
+        self.assertEqual(tzinfo, gettz('US/Eastern'))
+        self.assertIsNone(get_tz('Not/AZone'))
+        self.assertEqual(get_tz_stats(), {'hits': 1, 'misses': 2, 'zones': 2})
+
+    @patch('event_indexing.util.time_utils.gettz')
+    def test_preload_tz(self, mock_gettz):
+        preload_tz(['US/Eastern', 'US/Pacific', 'US/Eastern', None])
+        get_tz('US/Eastern')
+
+        self.assertEqual(mock_gettz.call_count, 2)
+        self.assertEqual(get_tz_stats(), {'hits': 1, 'misses': 2, 'zones': 2})